@@ -4,6 +4,28 @@ Hippocampus Memory System - Core Module
 
 from .v3_event import CONFIG, HHSomaQuick, SynapseCore
 from .v4_event import CONFIG as CONFIG_V4
+from .v4_event import HHSomaQuickPopulation, HHGateTableRegistry, HH_GATE_TABLES
+from .v4_event import SynapseMatrix, STDPRule
+from .v4_event import NeuronLayer, Projection, Network
+from .v4_event import StimulusSchedule, CompiledStimulus
+from .v4_event import TrialRunner, trial_rngs
+from .v4_event import VocabGraph, assign_groups, iter_vocab
+from .v4_event import ThetaReplay
+from .v4_event import SumTree, ReplayScheduler
+from .v4_event import RippleReplay
+from .v4_event import SpikeDecoder, RecallQuery
+from .v4_event import LateralInhibition
+from .v4_event import MyelinatedAxon, MyelinatedAxonBundle
 
-__all__ = ['CONFIG', 'HHSomaQuick', 'SynapseCore', 'CONFIG_V4']
-
+__all__ = ['CONFIG', 'HHSomaQuick', 'SynapseCore', 'CONFIG_V4',
+           'HHSomaQuickPopulation', 'HHGateTableRegistry', 'HH_GATE_TABLES',
+           'SynapseMatrix', 'STDPRule',
+           'NeuronLayer', 'Projection', 'Network',
+           'StimulusSchedule', 'CompiledStimulus',
+           'TrialRunner', 'trial_rngs',
+           'VocabGraph', 'assign_groups', 'iter_vocab',
+           'ThetaReplay',
+           'SumTree', 'ReplayScheduler',
+           'RippleReplay', 'SpikeDecoder', 'RecallQuery',
+           'LateralInhibition',
+           'MyelinatedAxon', 'MyelinatedAxonBundle']
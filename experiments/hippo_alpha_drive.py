@@ -0,0 +1,127 @@
+"""
+================================================================================
+Axon α-Pulse Drive — recursive state vs. per-spike kernel sum (long run)
+================================================================================
+
+MyelinatedAxon 의 α-펄스 구동 I_α(t) = I₀[Σ_k e^(−(t−t_k)/τ_d) − e^(−(t−t_k)/τ_r)]₊
+를 예전 방식 (spike 목록 alpha_ts 를 스텝마다 전부 순회) 과 재귀 상태
+(지수합 두 개) 로 같은 spike train 에 대해 실행.
+
+    1) 소마 spike train (rate Hz, 규칙 간격 + jitter) 을 미리 생성
+    2) KernelSumAxon: 예전 trigger_alpha/_alpha_kernel (목록 누적, 합 재계산)
+    3) MyelinatedAxon: 재귀 α 상태
+    4) 같은 구동으로 T ms 실행, 구간별 스텝당 시간 기록
+
+Usage:
+    python hippo_alpha_drive.py [--T 2000] [--rate 50] [--solver cn]
+
+보고:
+    • 구간별 스텝당 평균 시간 (kernel sum 은 누적 spike 수에 비례해 증가,
+      재귀 상태는 일정)
+    • 두 방식의 I_α 최대 차이, 축삭 막전위 최대 차이, 보관 spike 수
+================================================================================
+"""
+
+import argparse
+import time
+
+import numpy as np
+from v4_event import CONFIG, MyelinatedAxon
+
+ALPHA = {"I0": 50.0, "tau_r": 0.5, "tau_d": 3.0}
+
+
+class KernelSumAxon(MyelinatedAxon):
+    """예전 α-펄스 구현: spike 시각을 모두 보관하고 질의마다 kernel 합"""
+
+    def __init__(self, cfg):
+        super().__init__(cfg)
+        self.alpha_ts = []
+
+    def trigger_alpha(self, t_ms):
+        self.alpha_ts.append(float(t_ms))
+
+    def _alpha_kernel(self, t_ms):
+        if self.alpha_I0 == 0.0 or not self.alpha_ts:
+            return 0.0
+        val = 0.0
+        for t0 in self.alpha_ts:
+            dt = t_ms - t0
+            if dt <= 0.0:
+                continue
+            val += (np.exp(-dt / self.alpha_td) - np.exp(-dt / self.alpha_tr))
+        return max(0.0, val) * self.alpha_I0
+
+
+def make_axon(cls):
+    ax = cls(CONFIG["AXON"])
+    ax.alpha_I0, ax.alpha_tr, ax.alpha_td = ALPHA["I0"], ALPHA["tau_r"], ALPHA["tau_d"]
+    return ax
+
+
+def run(ax, spike_steps, steps, dt, window):
+    """spike train 으로 구동, window 스텝마다 스텝당 평균 시간 [µs] 과 I_α trace"""
+    gain = CONFIG["AXON"]["stim_gain"]
+    soma_V = -65.0
+    per_step, I_alpha = [], np.empty(steps)
+    t_win = time.perf_counter()
+    for k in range(steps):
+        t = k * dt
+        if spike_steps[k]:
+            ax.trigger_alpha(t)
+        ax.step(dt, t_ms=t, I0_from_soma=gain * (soma_V - ax.V[0]), soma_V=soma_V)
+        I_alpha[k] = ax._alpha_kernel(t)
+        if (k + 1) % window == 0:
+            now = time.perf_counter()
+            per_step.append(1e6 * (now - t_win) / window)
+            t_win = now
+    return np.array(per_step), I_alpha
+
+
+# ======================================================================
+# MAIN
+# ======================================================================
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    ap.add_argument("--T", type=float, default=2000.0, help="시뮬레이션 시간 [ms]")
+    ap.add_argument("--rate", type=float, default=50.0, help="소마 발화율 [Hz]")
+    ap.add_argument("--solver", choices=("cfl_euler", "cn"), default="cn",
+                    help="축삭 solver (kernel 합 비용만 비교하려면 cn 이 빠름)")
+    ap.add_argument("--windows", type=int, default=10, help="시간 측정 구간 수")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    print("\n" + "=" * 70)
+    print("⚡ AXON α-PULSE DRIVE: KERNEL SUM vs RECURSIVE STATE")
+    print("=" * 70)
+
+    CONFIG["SOLVER"]["AXON"] = args.solver
+    rng = np.random.default_rng(args.seed)
+    dt = float(CONFIG["RUN"]["dt_elec"])
+    steps = int(round(args.T / dt))
+    window = max(1, steps // args.windows)
+    isi = 1000.0 / args.rate
+    t_spk = np.arange(5.0, args.T, isi) + rng.uniform(-0.2, 0.2) * isi
+    spike_steps = np.zeros(steps, dtype=bool)
+    spike_steps[np.clip(np.round(t_spk / dt).astype(int), 0, steps - 1)] = True
+    print(f"\n✅ T={args.T:g} ms ({steps} steps, dt_elec={dt}), {int(spike_steps.sum())} soma "
+          f"spikes at {args.rate:g} Hz, solver={args.solver}")
+
+    ref_ax = make_axon(KernelSumAxon)
+    t_ref, I_ref = run(ref_ax, spike_steps, steps, dt, window)
+    new_ax = make_axon(MyelinatedAxon)
+    t_new, I_new = run(new_ax, spike_steps, steps, dt, window)
+
+    print("\n" + "=" * 70)
+    print(f"{'window [ms]':>14} {'kernel sum µs/step':>20} {'recursive µs/step':>19}")
+    print("-" * 70)
+    for w in range(len(t_ref)):
+        t0, t1 = w * window * dt, (w + 1) * window * dt
+        print(f"{t0:>6.0f}–{t1:<7.0f} {t_ref[w]:>20.1f} {t_new[w]:>19.1f}")
+
+    print(f"\n   last/first window: kernel sum {t_ref[-1] / t_ref[0]:.2f}x, "
+          f"recursive {t_new[-1] / t_new[0]:.2f}x")
+    print(f"   max |ΔI_α| = {np.abs(I_new - I_ref).max():.3g} (max I_α {np.abs(I_ref).max():.1f}), "
+          f"max |ΔV| = {np.abs(new_ax.V - ref_ax.V).max():.3g} mV")
+    print(f"   stored spikes: kernel sum {len(ref_ax.alpha_ts)}, "
+          f"recursive {len(new_ax.alpha_pending)} pending + 2 accumulators")
@@ -0,0 +1,142 @@
+"""
+================================================================================
+Axon Bundle — vectorized saltatory conduction for a whole DG→CA3 projection
+================================================================================
+
+run_pipeline 의 MyelinatedAxon 은 축삭 하나. DG 세포 A 개의 축삭을 축삭별
+파라미터 (노드 간격, D, gNa, ATP) 로 MyelinatedAxonBundle 에 담아 한 번에
+진행하고, 같은 구동을 MyelinatedAxon A 개 루프와 비교.
+
+    1) DG 소마 A 개 (HHSomaQuickPopulation) 를 축삭별 전류로 구동해
+       V / spike trace 를 먼저 만듦 (두 경로에 같은 입력)
+    2) 기준: MyelinatedAxon A 개를 Python 루프로 step
+    3) MyelinatedAxonBundle 한 개로 같은 trace 를 step
+    4) solver 별 (cfl_euler, cn) 로 반복
+
+Usage:
+    python hippo_axon_bundle.py [--axons 64] [--T 30] [--solvers cfl_euler cn]
+
+보고:
+    • 루프 / 다발 실행 시간과 speed-up
+    • 노드 첫 통과 시각 first_cross_ms 최대 차이, 전도속도 최대 차이
+    • 노드 간격별 평균 전도속도
+================================================================================
+"""
+
+import argparse
+import time
+
+import numpy as np
+from v4_event import CONFIG, HHSomaQuickPopulation, MyelinatedAxon, MyelinatedAxonBundle
+
+ALPHA = {"I0": 50.0, "tau_r": 0.5, "tau_d": 3.0}
+
+
+def soma_drive(A, T, dt, rng):
+    """DG 소마 A 개를 1–20 ms 동안 축삭별 전류로 구동한 V / spike trace"""
+    somas = HHSomaQuickPopulation(CONFIG["HH"], A)
+    I_amp = rng.uniform(8.0, 30.0, A)
+    steps = int(round(T / dt))
+    V = np.empty((steps, A))
+    spikes = np.empty((steps, A), dtype=bool)
+    for k in range(steps):
+        t = k * dt
+        spikes[k] = somas.step(dt, I_amp if 1.0 < t < 20.0 else 0.0)
+        V[k] = somas.V
+    return V, spikes
+
+
+def run_loop(params, V, spikes, dt):
+    """기준 경로: 축삭마다 MyelinatedAxon 한 개"""
+    axons = []
+    for p in params:
+        cfg = dict(CONFIG["AXON"], node_period=p["node_period"], D_node=p["D_node"])
+        ax = MyelinatedAxon(cfg)
+        ax.node_gNa, ax.ATP_level = p["gNa"], p["ATP"]
+        ax.alpha_I0, ax.alpha_tr, ax.alpha_td = ALPHA["I0"], ALPHA["tau_r"], ALPHA["tau_d"]
+        axons.append(ax)
+    gain = CONFIG["AXON"]["stim_gain"]
+    t0 = time.perf_counter()
+    for k in range(V.shape[0]):
+        t = k * dt
+        for a, ax in enumerate(axons):
+            if spikes[k, a]:
+                ax.trigger_alpha(t)
+            ax.step(dt, t_ms=t, I0_from_soma=gain * (V[k, a] - ax.V[0]), soma_V=V[k, a])
+    elapsed = time.perf_counter() - t0
+    cross = [[np.nan if ax.first_cross_ms[i] is None else ax.first_cross_ms[i] for i in ax.NODE_IDX]
+             for ax in axons]
+    return cross, np.array([ax.velocity_last() for ax in axons]), elapsed
+
+
+def run_bundle(params, V, spikes, dt):
+    """다발 경로: MyelinatedAxonBundle 한 개"""
+    bundle = MyelinatedAxonBundle(CONFIG["AXON"], len(params),
+                                  node_period=[p["node_period"] for p in params],
+                                  D_node=[p["D_node"] for p in params],
+                                  node_gNa=[p["gNa"] for p in params],
+                                  ATP_level=[p["ATP"] for p in params],
+                                  alpha=ALPHA)
+    gain = CONFIG["AXON"]["stim_gain"]
+    t0 = time.perf_counter()
+    for k in range(V.shape[0]):
+        t = k * dt
+        fired = np.flatnonzero(spikes[k])
+        if fired.size:
+            bundle.trigger_alpha(t, fired)
+        bundle.step(dt, t, gain * (V[k] - bundle.V[:, 0]), V[k])
+    elapsed = time.perf_counter() - t0
+    return bundle, bundle.velocity(), elapsed
+
+
+# ======================================================================
+# MAIN
+# ======================================================================
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    ap.add_argument("--axons", type=int, default=64)
+    ap.add_argument("--T", type=float, default=30.0, help="시뮬레이션 시간 [ms]")
+    ap.add_argument("--solvers", nargs="+", default=["cfl_euler", "cn"])
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    print("\n" + "=" * 70)
+    print("🧵 AXON BUNDLE: MyelinatedAxon LOOP vs MyelinatedAxonBundle")
+    print("=" * 70)
+
+    rng = np.random.default_rng(args.seed)
+    A, dt = args.axons, float(CONFIG["RUN"]["dt_elec"])
+    # 다발은 가장 큰 D 기준 공통 CFL 서브스텝 → 단일 축삭과 서브스텝 수가
+    # 같도록 D_node 는 기본값의 92–100% 에서만 변화 (dt_elec=0.02: 7 서브스텝)
+    params = [{"node_period": int(rng.choice([4, 5, 6])),
+               "D_node": float(CONFIG["AXON"]["D_node"] * rng.uniform(0.92, 1.0)),
+               "gNa": float(rng.uniform(600.0, 1000.0)),
+               "ATP": float(rng.uniform(60.0, 120.0))} for _ in range(A)]
+    V, spikes = soma_drive(A, args.T, dt, rng)
+    print(f"\n✅ {A} axons × {CONFIG['AXON']['N']} compartments, {V.shape[0]} steps "
+          f"(dt_elec={dt} ms), {int(spikes.sum())} soma spikes")
+
+    for solver in args.solvers:
+        CONFIG["SOLVER"]["AXON"] = solver
+        cross, v_loop, t_loop = run_loop(params, V, spikes, dt)
+        bundle, v_bundle, t_bundle = run_bundle(params, V, spikes, dt)
+
+        d_cross = 0.0
+        for a in range(A):
+            fc = bundle.first_cross_ms[a][bundle.node_valid[a]]
+            ref = np.array(cross[a])
+            if not np.array_equal(np.isnan(fc), np.isnan(ref)):
+                d_cross = np.inf
+            elif np.isfinite(ref).any():
+                d_cross = max(d_cross, float(np.nanmax(np.abs(fc - ref))))
+
+        print("\n" + "-" * 70)
+        print(f"solver = {solver}")
+        print(f"   loop   : {t_loop:8.3f} s")
+        print(f"   bundle : {t_bundle:8.3f} s   ({t_loop / t_bundle:.1f}x)")
+        print(f"   max |Δ first_cross_ms| = {d_cross:.3g} ms, "
+              f"max |Δ velocity| = {np.abs(v_bundle - v_loop).max():.3g} m/s")
+        for period in sorted(set(bundle.node_period.tolist())):
+            sel = bundle.node_period == period
+            print(f"   node_period {period}: mean velocity {v_bundle[sel].mean():.4f} m/s "
+                  f"({int(sel.sum())} axons)")
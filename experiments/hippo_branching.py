@@ -4,14 +4,14 @@ matplotlib.use('Agg')  # 백그라운드 모드 (GUI 팝업 없이)
 import matplotlib.pyplot as plt
 import warnings
 warnings.filterwarnings('ignore')  # matplotlib 경고 억제
-from v4_event import CONFIG, HHSomaQuick, SynapseCore
+from v4_event import CONFIG, HHSomaQuick, SynapseCore, LateralInhibition
 
 # ======================================================================
 # STDP Synapse
 # ======================================================================
 class STDPSynapse(SynapseCore):
-    def __init__(self, pre, post, delay_ms=1.5, Q_max=50.0, tau_ms=2.0):
-        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms)
+    def __init__(self, pre, post, delay_ms=1.5, Q_max=50.0, tau_ms=2.0, kernel="sum"):
+        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms, kernel=kernel)
         self.pre_neuron = pre
         self.post_neuron = post
         self.weight = 1.0
@@ -330,8 +330,7 @@ if __name__ == "__main__":
                 n.S = 0.0
                 n.PTP = 1.0
             for s in total_synapses:
-                s.spikes = []
-                s.I_syn = 0.0
+                s.reset()
                 if hasattr(s, 'Ca'):
                     s.Ca = 0.0
                 if hasattr(s, 'R'):
@@ -405,16 +404,16 @@ if __name__ == "__main__":
     num_trials = 20
     trial_results = {'T': 0, 'R': 0}
     
+    # ✅ WTA 경쟁: T와 R 중 그룹 평균 시냅스 전류가 먼저 강해진 쪽이 승자,
+    #    패자 그룹은 trial 끝까지 -1000 억제 (승자 latch)
+    wta = LateralInhibition(N, groups=[letter_neurons["T"], letter_neurons["R"]], k=1,
+                            threshold=1.0, inhibition=-1000.0, latch=True)
+    
     for trial in range(num_trials):
         # 첫 글자 'C'만 Cue
         cue = letter_neurons["C"]
         logs = []
-    
-        # ✅ WTA 경쟁: T와 R 중 먼저 발화하는 쪽이 승자
-        t_neurons = letter_neurons["T"]
-        r_neurons = letter_neurons["R"]
-        winner_decided = False
-        winner_group = None
+        wta.reset()
         
         for k in range(steps):
             t = k * dt
@@ -427,39 +426,15 @@ if __name__ == "__main__":
             
             spikes = []
             
-            # ✅ 먼저 T와 R의 시냅스 전류를 미리 계산 (경쟁 확인)
-            t_synaptic = [sum(syn.I_syn for syn in neurons[i].incoming_synapses) for i in t_neurons]
-            r_synaptic = [sum(syn.I_syn for syn in neurons[i].incoming_synapses) for i in r_neurons]
-            
-            # ✅ T와 R 중 시냅스 전류가 더 강한 쪽만 발화 허용 (WTA!)
-            t_avg = np.mean(t_synaptic) if t_synaptic else 0.0
-            r_avg = np.mean(r_synaptic) if r_synaptic else 0.0
-            
-            # 경쟁이 시작되면 (t > 5ms, A 발화 후)
-            if t > 5.0 and (t_avg > 1.0 or r_avg > 1.0):
-                if not winner_decided:
-                    if t_avg > r_avg:
-                        winner_decided = True
-                        winner_group = "T"
-                    elif r_avg > t_avg:
-                        winner_decided = True
-                        winner_group = "R"
-                    # 동일하면 노이즈로 결정
-                    else:
-                        winner_decided = True
-                        winner_group = "T" if np.random.rand() > 0.5 else "R"
+            # ✅ 전체 입력 전류 벡터 → 경쟁 (t > 5ms, A 발화 후)
+            I_syn = np.array([sum(syn.I_syn for syn in neurons[i].incoming_synapses)
+                              for i in range(N)])
+            I_in = I + I_syn
+            if t > 5.0 or wta.decided:
+                I_in = wta.apply(I_in)
             
             for i in range(N):
-                # WTA 억제 적용
-                inhibition = 0.0
-                if winner_decided:
-                    if winner_group == "T" and i in r_neurons:
-                        inhibition = -1000.0  # R 강력 억제!
-                    elif winner_group == "R" and i in t_neurons:
-                        inhibition = -1000.0  # T 강력 억제!
-                
-                I_syn_total = sum(syn.I_syn for syn in neurons[i].incoming_synapses)
-                sp, _, _ = neurons[i].step(dt, I[i] + I_syn_total + inhibition, t)
+                sp, _, _ = neurons[i].step(dt, I_in[i], t)
                 if sp:
                     spikes.append(i)
             
@@ -491,8 +466,7 @@ if __name__ == "__main__":
             n.S = 0.0
             n.PTP = 1.0
         for s in total_synapses:
-            s.spikes = []
-            s.I_syn = 0.0
+            s.reset()
     
     # 전체 결과 출력
     print(f"\n📊 Frequency Test Results ({num_trials} trials):")
@@ -33,14 +33,14 @@ matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import warnings
 warnings.filterwarnings('ignore')
-from v4_event import CONFIG, HHSomaQuick, SynapseCore
+from v4_event import CONFIG, HHSomaQuick, SynapseCore, SpikeDecoder
 
 # ======================================================================
 # STDP Synapse
 # ======================================================================
 class STDPSynapse(SynapseCore):
-    def __init__(self, pre, post, delay_ms=1.5, Q_max=50.0, tau_ms=2.0):
-        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms)
+    def __init__(self, pre, post, delay_ms=1.5, Q_max=50.0, tau_ms=2.0, kernel="sum"):
+        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms, kernel=kernel)
         self.pre_neuron = pre
         self.post_neuron = post
         self.weight = 1.0
@@ -225,8 +225,7 @@ if __name__ == "__main__":
                 n.S = 0.0
                 n.PTP = 1.0
             for s in total_synapses:
-                s.spikes = []
-                s.I_syn = 0.0
+                s.reset()
             
             print(" Done.")
     
@@ -266,8 +265,7 @@ if __name__ == "__main__":
         n.S = 0.0
         n.PTP = 1.0
     for s in total_synapses:
-        s.spikes = []
-        s.I_syn = 0.0
+        s.reset()
     print("✅ Reset Done.")
     
     # =========================================================
@@ -283,7 +281,7 @@ if __name__ == "__main__":
     steps_test = int(T_test/dt)
     
     cue = letter_neurons["A"]
-    logs = []
+    decoder = SpikeDecoder(letter_neurons, N)   # neuron → 글자 토큰 (스트리밍)
     
     for k in range(steps_test):
         t = k * dt
@@ -306,19 +304,14 @@ if __name__ == "__main__":
             s.deliver(t)
         
         if spikes:
-            logs.append((t, spikes))
-    
-    # 분석: 각 문자의 발화 시간
-    letter_first_spike = {}
-    letter_spike_counts = {}
-    
-    for letter in ["A", "N", "R", "I", "T", "C", "M"]:
-        letter_spike_counts[letter] = 0
-        for t, ids in logs:
-            if any(n in letter_neurons[letter] for n in ids):
-                letter_spike_counts[letter] += 1
-                if letter not in letter_first_spike:
-                    letter_first_spike[letter] = t
+            for _, letter, t_first in decoder.feed_events(t, spikes):
+                print(f"   ⚡ {t_first:5.1f}ms  {letter}")
+    
+    # 분석: 각 문자의 발화 시간 (decoder 가 스트리밍 중 누적)
+    letter_first_spike = decoder.first_spikes()
+    letter_spike_counts = decoder.spike_counts()
+    waves = " → ".join("/".join(syms) for _, syms in decoder.waves(tol=0.5))
+    print(f"\n🌊 Decoded waves: {waves}")
     
     # 결과 출력
     print(f"\n📊 Activation Timeline:")
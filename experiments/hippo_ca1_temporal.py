@@ -79,8 +79,8 @@ class TimeCell:
 # STDP Synapse
 # ======================================================================
 class STDPSynapse(SynapseCore):
-    def __init__(self, pre, post, delay_ms=1.5, Q_max=50.0, tau_ms=2.0):
-        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms)
+    def __init__(self, pre, post, delay_ms=1.5, Q_max=50.0, tau_ms=2.0, kernel="sum"):
+        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms, kernel=kernel)
         self.pre_neuron = pre
         self.post_neuron = post
         self.weight = 1.0
@@ -236,8 +236,7 @@ if __name__ == "__main__":
             neuron.S = 0.0
             neuron.PTP = 1.0
         for s in all_synapses:
-            s.spikes = []
-            s.I_syn = 0.0
+            s.reset()
         
         print(" Done.")
     
@@ -307,8 +306,7 @@ if __name__ == "__main__":
             cell.PTP = 1.0
             cell.trigger_time = None
         for s in all_synapses:
-            s.spikes = []
-            s.I_syn = 0.0
+            s.reset()
         
         print(" Done.")
     
@@ -344,8 +342,7 @@ if __name__ == "__main__":
         cell.PTP = 1.0
         cell.trigger_time = None
     for s in all_synapses:
-        s.spikes = []
-        s.I_syn = 0.0
+        s.reset()
     
     print("\n🧪 Test: Cue 'A' → CA3 sequence → CA1 timing")
     
@@ -0,0 +1,114 @@
+"""
+================================================================================
+DG Sparse Coding — scalar threshold vs. k-WTA lateral inhibition
+================================================================================
+
+hippo_ultimate 의 DGNeuron 은 입력이 0.8·300 을 넘을 때만 통과시키는 스칼라
+역치로 희소 코딩을 흉내냄. 같은 규칙 (NeuronLayer input_threshold) 과
+LateralInhibition k-WTA 를 수천 개 DG 세포에서 비교.
+
+    1) EC 패턴 (20% 활성) 과 비트를 뒤집어 만든 변형 패턴 (입력 겹침 1.0 → 0.5)
+    2) 고정 무작위 EC → DG 투사로 DG 입력 전류 계산 (배치 원소 = 패턴)
+    3) DG 레이어를 10 ms 실행 (threshold / k-WTA), 입력 이득을 바꿔 반복
+
+Usage:
+    python hippo_dg_sparse.py [--dg 4000] [--sparsity 0.02] [--gains 0.5 1 2]
+
+보고:
+    • 이득별 DG 활성 비율 (역치: 입력 세기에 따라 흔들림, k-WTA: 고정)
+    • 입력 겹침 대비 DG 출력 겹침 (패턴 분리)
+    • 실행 시간 (배치 전체)
+================================================================================
+"""
+
+import argparse
+import time
+
+import numpy as np
+from v4_event import Network
+
+
+def make_patterns(n_ec, overlaps, active=0.2, rng=None):
+    """기준 패턴 + 기준과의 겹침(활성 비트 유지 비율)이 overlaps 인 변형들"""
+    rng = np.random.default_rng() if rng is None else rng
+    n_on = int(active * n_ec)
+    base = np.zeros(n_ec)
+    on = rng.choice(n_ec, n_on, replace=False)
+    base[on] = 1.0
+    off = np.setdiff1d(np.arange(n_ec), on)
+    patterns = [base]
+    for ov in overlaps:
+        n_move = int(round((1.0 - ov) * n_on))
+        p = base.copy()
+        p[rng.choice(on, n_move, replace=False)] = 0.0
+        p[rng.choice(off, n_move, replace=False)] = 1.0
+        patterns.append(p)
+    return np.array(patterns)
+
+
+def dg_codes(I, mode, k, threshold=240.0, T=10.0):
+    """DG 레이어를 T ms 실행해 배치 원소별 활성 뉴런 mask (B, N) 반환"""
+    B, N = I.shape
+    net = Network(dt=0.1, batch=B, active_set=True)
+    if mode == "threshold":
+        net.add_layer("DG", N, input_threshold=threshold)
+    else:
+        net.add_layer("DG", N, inhibition=dict(k=k))
+    t = time.perf_counter()
+    rec = net.run(T, stimulus=lambda t: {"DG": I}, probes=["DG:spikes"], plasticity=False)
+    elapsed = time.perf_counter() - t
+    _, b_sp, i_sp = rec["DG:spikes"]
+    code = np.zeros((B, N), dtype=bool)
+    code[b_sp, i_sp] = True
+    return code, elapsed
+
+
+def overlap(a, b):
+    """활성 집합 겹침 |a∩b| / |a∪b|"""
+    union = np.logical_or(a, b).sum()
+    return np.logical_and(a, b).sum() / union if union else 0.0
+
+
+# ======================================================================
+# MAIN
+# ======================================================================
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    ap.add_argument("--ec", type=int, default=500, help="EC 입력 뉴런 수")
+    ap.add_argument("--dg", type=int, default=4000, help="DG 세포 수")
+    ap.add_argument("--sparsity", type=float, default=0.02, help="k-WTA 활성 비율 (k = sparsity·N)")
+    ap.add_argument("--gains", type=float, nargs="+", default=[0.5, 1.0, 2.0],
+                    help="EC → DG 입력 이득 배율")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    print("\n" + "=" * 70)
+    print("🧩 DG SPARSE CODING: SCALAR THRESHOLD vs k-WTA")
+    print("=" * 70)
+
+    rng = np.random.default_rng(args.seed)
+    overlaps = [0.9, 0.8, 0.7, 0.6, 0.5]
+    patterns = make_patterns(args.ec, overlaps, rng=rng)
+    W = rng.random((args.ec, args.dg)) < 0.1                  # EC → DG 10% 연결
+    drive = patterns @ W                                      # (B, N_DG) 활성 EC 입력 수
+    drive = 300.0 * drive / drive.mean()                      # 평균 입력 ≈ 300 (I_base)
+    k = max(1, int(args.sparsity * args.dg))
+
+    print(f"\n✅ EC {args.ec} → DG {args.dg}, {len(patterns)} patterns, k-WTA k={k}")
+    print(f"   DGNeuron rule: I > 0.8·300 = 240 passes")
+
+    print("\n" + "=" * 70)
+    print(f"{'gain':>5} {'mode':>10} {'active %':>9} " +
+          " ".join(f"{'ov' + str(ov):>6}" for ov in overlaps) + f" {'time[s]':>8}")
+    print("-" * 70)
+    for gain in args.gains:
+        for mode in ("threshold", "kwta"):
+            code, elapsed = dg_codes(gain * drive, mode, k)
+            frac = 100.0 * code.mean(axis=1).mean()
+            outs = [overlap(code[0], code[i + 1]) for i in range(len(overlaps))]
+            print(f"{gain:>5g} {mode:>10} {frac:>9.2f} " +
+                  " ".join(f"{o:>6.2f}" for o in outs) + f" {elapsed:>8.3f}")
+
+    print("\nov* columns: DG output overlap for EC input overlap * (lower = stronger separation).")
+    print("The scalar threshold's activity follows input strength; k-WTA keeps exactly")
+    print(f"k={k} winners per pattern at every gain.")
@@ -33,8 +33,8 @@ from v4_event import CONFIG, HHSomaQuick, SynapseCore
 # STDP Synapse with Consolidation
 # ======================================================================
 class STDPSynapse(SynapseCore):
-    def __init__(self, pre, post, delay_ms=1.5, Q_max=50.0, tau_ms=2.0):
-        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms)
+    def __init__(self, pre, post, delay_ms=1.5, Q_max=50.0, tau_ms=2.0, kernel="sum"):
+        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms, kernel=kernel)
         self.pre_neuron = pre
         self.post_neuron = post
         self.weight = 1.0
@@ -252,8 +252,7 @@ if __name__ == "__main__":
         n.PTP = 1.0
     
     for s in total_synapses:
-        s.spikes = []
-        s.I_syn = 0.0
+        s.reset()
     
     # Sleep parameters
     theta_freq = 6.0  # Hz
@@ -341,8 +340,7 @@ if __name__ == "__main__":
         n.PTP = 1.0
     
     for s in total_synapses:
-        s.spikes = []
-        s.I_syn = 0.0
+        s.reset()
     
     # 여러 번 테스트
     num_trials = 20
@@ -420,8 +418,7 @@ if __name__ == "__main__":
             n.S = 0.0
             n.PTP = 1.0
         for s in total_synapses:
-            s.spikes = []
-            s.I_syn = 0.0
+            s.reset()
     
     print(f"\n📊 Recall Results ({num_trials} trials):")
     print(f"   T (CAT): {trial_results['T']}/{num_trials} ({trial_results['T']/num_trials*100:.0f}%)")
@@ -0,0 +1,132 @@
+"""
+================================================================================
+IonFlow Engine — stacked (4×N) IonFlowDynamics vs. per-ion dict loop
+================================================================================
+
+IonFlowDynamics 는 run_pipeline 에서 dt_elec (0.02 ms) 마다, MICRO_ITERS 때문에
+bio 스텝당 두 번씩 호출됨. 예전 구현 (이온 dict 루프, 이온마다 gradient /
+laplacian 할당 / clip 두 번) 과 (4, N) 배열 구현을 같은 V 구동으로 비교.
+
+    1) 농도에 무작위 공간 교란을 더한 같은 초기 상태
+    2) V 구동: uniform (run_pipeline 처럼 V[:] = soma.V) / ramp (공간 변화)
+    3) explicit: 예전 루프와 비교 (같은 연산 순서 → 차이 0 기대)
+    4) implicit (backward Euler 확산): explicit 과의 차이, 큰 dt 에서 안정성
+
+Usage:
+    python hippo_ionflow.py [--steps 5000] [--dt 0.02]
+
+보고:
+    • V 구동별 스텝당 시간 (loop / stacked) 과 최대 농도 차이
+    • implicit 모드: explicit 대비 차이, dt_bio (1 ms) 스텝에서 유한/양수 여부
+================================================================================
+"""
+
+import argparse
+import time
+
+import numpy as np
+from v4_event import CONFIG, IonFlowDynamics
+
+
+class LoopIonFlow:
+    """예전 IonFlowDynamics: 이온 dict 루프 (이온마다 배열 할당)"""
+
+    def __init__(self, cfg):
+        self.N = cfg.get("N", 121)
+        self.dx = cfg.get("dx", 1e-3)
+        self.V = np.full(self.N, cfg.get("Vrest", -70.0))
+        self.F = 96485.0
+        self.mu_scale = 1e-9
+        self.ions = {
+            "Na": {"C": np.full(self.N, 15.0), "D": 1.33e-5, "z": +1},
+            "K":  {"C": np.full(self.N, 140.0), "D": 1.96e-5, "z": +1},
+            "Ca": {"C": np.full(self.N, 0.0001), "D": 0.79e-5, "z": +2},
+            "Cl": {"C": np.full(self.N, 5.0), "D": 2.03e-5, "z": -1},
+        }
+
+    def laplacian(self, arr):
+        lap = np.zeros_like(arr)
+        lap[1:-1] = arr[:-2] - 2*arr[1:-1] + arr[2:]
+        return lap / (self.dx**2)
+
+    def step(self, dt):
+        dVdx = np.gradient(self.V, self.dx)
+        for ion, d in self.ions.items():
+            D, z, C = d["D"], d["z"], d["C"]
+            diff = D * self.laplacian(C)
+            drift = -self.mu_scale * z * self.F * dVdx * C
+            C += dt * (diff + drift)
+            d["C"] = np.clip(C, 0.0, None)
+        total_q = sum(d["z"]*np.sum(d["C"]) for d in self.ions.values())
+        if abs(total_q) > 1e-3:
+            corr = -total_q / (self.N * len(self.ions))
+            for ion, d in self.ions.items():
+                d["C"] += corr * np.sign(d["z"])
+                d["C"] = np.clip(d["C"], 0.0, None)
+        return {ion: d["C"] for ion, d in self.ions.items()}
+
+
+def perturbed(cls, pert):
+    flow = cls(CONFIG["AXON"])
+    for i, name in enumerate(IonFlowDynamics.ION_NAMES):
+        flow.ions[name]["C"][:] += pert[i]
+    return flow
+
+
+def drive(kind, k, N):
+    if kind == "uniform":
+        return np.full(N, -70.0 + 10.0 * np.sin(0.01 * k))
+    return -70.0 + 30.0 * np.sin(np.linspace(0.0, 3.0, N) + 0.01 * k)
+
+
+def run(flow, kind, steps, dt):
+    t0 = time.perf_counter()
+    for k in range(steps):
+        flow.V[:] = drive(kind, k, flow.N)
+        out = flow.step(dt)
+    elapsed = time.perf_counter() - t0
+    return np.array([out[name] for name in IonFlowDynamics.ION_NAMES]), 1e6 * elapsed / steps
+
+
+# ======================================================================
+# MAIN
+# ======================================================================
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    ap.add_argument("--steps", type=int, default=5000)
+    ap.add_argument("--dt", type=float, default=0.02, help="dt_elec [ms]")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    print("\n" + "=" * 70)
+    print("🧂 IONFLOW: PER-ION LOOP vs STACKED (4×N) ENGINE")
+    print("=" * 70)
+
+    N = CONFIG["AXON"].get("N", 121)
+    rng = np.random.default_rng(args.seed)
+    pert = rng.random((4, N)) * np.array([1.0, 10.0, 1e-4, 1.0])[:, None]
+    print(f"\n✅ N={N}, dx={CONFIG['AXON'].get('dx', 1e-3)}, {args.steps} steps of {args.dt} ms")
+
+    print("\n" + "=" * 70)
+    print(f"{'V drive':>9} {'solver':>9} {'loop µs':>9} {'stacked µs':>11} {'speed-up':>9} {'max |ΔC|':>10}")
+    print("-" * 70)
+    for kind in ("uniform", "ramp"):
+        CONFIG["SOLVER"]["IONFLOW"] = "explicit"
+        C_ref, t_ref = run(perturbed(LoopIonFlow, pert), kind, args.steps, args.dt)
+        C_exp, t_exp = run(perturbed(IonFlowDynamics, pert), kind, args.steps, args.dt)
+        CONFIG["SOLVER"]["IONFLOW"] = "implicit"
+        C_imp, t_imp = run(perturbed(IonFlowDynamics, pert), kind, args.steps, args.dt)
+        for solver, C, t in (("explicit", C_exp, t_exp), ("implicit", C_imp, t_imp)):
+            print(f"{kind:>9} {solver:>9} {t_ref:>9.1f} {t:>11.1f} {t_ref / t:>8.1f}x "
+                  f"{np.abs(C - C_ref).max():>10.3g}")
+
+    # dt_bio 크기 스텝: explicit 은 D·dt/dx² 제한을 넘음
+    print("\n" + "-" * 70)
+    flow = perturbed(IonFlowDynamics, 10.0 * pert)
+    flow.C[:, : N // 2] += 5.0
+    for k in range(200):
+        flow.V[:] = drive("ramp", k, N)
+        flow.step(1.0)
+    print(f"implicit, dt=1.0 ms × 200 (D·dt/dx² = {flow.D.max() / flow.dx**2:.1f}): "
+          f"finite={bool(np.isfinite(flow.C).all())}, min C={flow.C.min():.3g}")
+    CONFIG["SOLVER"]["IONFLOW"] = "explicit"
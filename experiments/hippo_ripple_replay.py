@@ -0,0 +1,198 @@
+"""
+================================================================================
+Compressed-Time Ripple Replay — speed vs. weight-change fidelity
+================================================================================
+
+hippo_dream_final 의 수면 단계(theta 6 Hz, 글자마다 10 ms 간격 5 ms 펄스,
+dt=0.1 로 사이클 전체 적분)를 기준으로, 같은 replay 계획을 κ 배 시간 압축
+(RippleReplay) 으로 돌렸을 때의 속도와 가중치 변화 오차를 측정.
+
+    1) Wake: CAT 20회 / CAR 1회 학습 (Network, 단어별 시냅스 = hippo_dream_final 구조)
+    2) 기준: hippo_dream_final 의 SequenceNeuron/STDPSynapse 수면 루프를
+       같은 wake 가중치에서 시작해 실행
+    3) RippleReplay(compression=κ) 로 같은 plan 실행 (κ=1 은 실시간 replay)
+
+Usage:
+    python hippo_ripple_replay.py [--cycles 20] [--compression 1 2 4 8]
+
+보고 (κ 별):
+    • 시간, 기준 루프 대비 / κ=1 대비 speed-up
+    • 수면 중 가중치 변화 Δw 의 상대 오차 ‖Δw_κ − Δw_ref‖ / ‖Δw_ref‖ 와 최대 오차
+    • A→T (CAT), A→R (CAR) 평균 가중치
+
+측정 (--cycles 20): κ=2/4/8 은 κ=1 대비 ~1.0–2x (실행마다 변동), Δw 상대 오차
+~1%/3%/6%. κ=1 의 기준 루프 대비 speed-up 은 Network 엔진 덕분이고, 압축은
+soma 가 여전히 실제 dt 부분 스텝을 돌아 거의 빨라지지 않음.
+================================================================================
+"""
+
+import argparse
+import time
+
+import numpy as np
+from v4_event import Network, RippleReplay, StimulusSchedule, VocabGraph
+from hippo_dream_final import SequenceNeuron, STDPSynapse
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+WORDS = {"CAT": {"letters": ["C", "A", "T"], "train_count": 20},
+         "CAR": {"letters": ["C", "A", "R"], "train_count": 1}}
+
+
+# ======================================================================
+# Network (wake)
+# ======================================================================
+def build_network(letter_neurons, dt=0.1):
+    """
+    hippo_dream_final 과 같은 단어별 시냅스 구조
+
+    기호를 (단어, 글자) 로 두면 CAT/CAR 의 C→A 가 따로 생김
+    (같은 뉴런 그룹에 연결되지만 edge 블록은 단어마다 하나)
+    """
+    vocab = {w: [(w, L) for L in cfg["letters"]] for w, cfg in WORDS.items()}
+    groups = {sym: letter_neurons[sym[1]] for syms in vocab.values() for sym in syms}
+    graph = VocabGraph(vocab, groups)
+
+    net = Network(dt=dt)
+    net.add_layer("letters", 2 * len(ALPHABET), decay=False)
+    graph.connect(net, "letters", weight=1.0, delay_ms=2.0, Q_max=50.0, tau_ms=2.0,
+                  release_power=3.0, w_ref=50.0,
+                  stdp=dict(A_plus=0.15, A_minus=0.05, w_max=50.0))
+    return net, graph
+
+
+def wake(net, letter_neurons):
+    """PHASE 1 (hippo_dream_final): 80 ms 세션, 글자 i 를 5 + 15i ms 부터 8 ms, 300"""
+    for word, cfg in WORDS.items():
+        for _ in range(cfg["train_count"]):
+            sched = StimulusSchedule()
+            for i, L in enumerate(cfg["letters"]):
+                sched.add("letters", letter_neurons[L], 5.0 + i * 15.0, 13.0 + i * 15.0, 300.0)
+            net.run(80.0, stimulus=sched, t0=0.0, jump=True)
+    net.reset(traces=False)
+
+
+# ======================================================================
+# Reference: hippo_dream_final sleep loop
+# ======================================================================
+def reference_sleep(letter_neurons, w_wake, plan, kernel, dt=0.1):
+    """
+    hippo_dream_final PHASE 2 와 같은 스텝 루프 (단어 선택만 plan 으로 고정)
+
+    Returns
+    -------
+    weight : ndarray
+        단어 순서 × 전이 × pre × post 순서의 시냅스 가중치
+    """
+    N = 2 * len(ALPHABET)
+    neurons = [SequenceNeuron(i) for i in range(N)]
+    total, word_synapses = [], {}
+    for word, cfg in WORDS.items():
+        letters = cfg["letters"]
+        word_synapses[word] = []
+        for i in range(len(letters) - 1):
+            for a in letter_neurons[letters[i]]:
+                for b in letter_neurons[letters[i + 1]]:
+                    syn = STDPSynapse(neurons[a], neurons[b], delay_ms=2.0, Q_max=50.0,
+                                      kernel=kernel)
+                    neurons[a].outgoing_synapses.append(syn)
+                    neurons[b].incoming_synapses.append(syn)
+                    word_synapses[word].append(syn)
+                    total.append(syn)
+    for syn, w in zip(total, w_wake):
+        syn.weight = float(w)
+
+    theta_period = 1000.0 / 6.0
+    for cycle, word in enumerate(plan):
+        letters = WORDS[word]["letters"]
+        t_offset = cycle * theta_period
+        for k in range(int(theta_period / dt)):
+            t = t_offset + k * dt
+            I = np.zeros(N)
+            for letter_idx, letter in enumerate(letters):
+                t_start = 5.0 + letter_idx * 10.0
+                if t_start <= k * dt < t_start + 5.0:
+                    for i in letter_neurons[letter]:
+                        I[i] = 150.0
+            for i in range(N):
+                I_syn_total = sum(syn.I_syn for syn in neurons[i].incoming_synapses)
+                neurons[i].step(dt, I[i] + I_syn_total, t)
+            for s in total:
+                s.deliver(t)
+        for syn in word_synapses[word]:
+            syn.consolidate(factor=0.02)
+    return np.array([s.weight for s in total])
+
+
+# ======================================================================
+# MAIN
+# ======================================================================
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    ap.add_argument("--cycles", type=int, default=20, help="theta 사이클 수")
+    ap.add_argument("--compression", type=float, nargs="+", default=[1.0, 2.0, 4.0, 8.0],
+                    help="시간 압축 배율 κ 목록")
+    ap.add_argument("--kernel", choices=("sum", "recursive"), default="sum",
+                    help="기준 루프 SynapseCore EPSC 커널 (hippo_dream_final 기본: sum)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    print("\n" + "=" * 70)
+    print("🌊 COMPRESSED-TIME RIPPLE REPLAY vs hippo_dream_final SLEEP LOOP")
+    print("=" * 70)
+
+    letter_neurons = {L: [2 * i, 2 * i + 1] for i, L in enumerate(ALPHABET)}
+    net, graph = build_network(letter_neurons)
+    wake(net, letter_neurons)
+    state = net.state_dict()
+    proj = graph.projection
+    edges = np.concatenate([graph.word_edges(w) for w in WORDS])   # 기준 루프 시냅스 순서
+    w_wake = proj.W.weight[edges].copy()
+
+    # hippo_dream_final: rand() < 0.9 → CAT
+    rng = np.random.default_rng(args.seed)
+    plan = ["CAT" if r < 0.9 else "CAR" for r in rng.random(args.cycles)]
+    print(f"\n✅ Wake done: {len(edges)} synapses, plan CAT={plan.count('CAT')} "
+          f"CAR={plan.count('CAR')} ({args.cycles} cycles)")
+
+    t = time.perf_counter()
+    w_ref = reference_sleep(letter_neurons, w_wake, plan, args.kernel)
+    t_ref = time.perf_counter() - t
+    dw_ref = w_ref - w_wake
+    print(f"✅ Reference loop ({args.kernel} kernel): {t_ref:.2f} s, "
+          f"‖Δw‖ = {np.linalg.norm(dw_ref):.3f}")
+
+    def transition(w, word, a, b):
+        """단어 word 의 a→b 전이 평균 (edges 순서 기준)"""
+        sel = np.isin(edges, graph.edges((word, a), (word, b)))
+        return float(w[sel].mean())
+
+    print("\n" + "=" * 70)
+    print(f"{'κ':>5} {'time[s]':>9} {'vs ref':>8} {'vs κ=1':>8} "
+          f"{'rel err':>9} {'max err':>9} {'A→T':>7} {'A→R':>7}")
+    print("-" * 70)
+    print(f"{'ref':>5} {t_ref:>9.3f} {'1.0x':>8} {'':>8} {'':>9} {'':>9} "
+          f"{transition(w_ref, 'CAT', 'A', 'T'):>7.2f} {transition(w_ref, 'CAR', 'A', 'R'):>7.2f}")
+
+    t_one = None
+    for kappa in args.compression:
+        net.load_state_dict(state)
+        ripple = RippleReplay(net, graph, compression=kappa)
+        t = time.perf_counter()
+        w = ripple.simulate(plan)[edges]
+        elapsed = time.perf_counter() - t
+        if kappa == 1.0:
+            t_one = elapsed
+
+        err = (w - w_wake) - dw_ref
+        rel = np.linalg.norm(err) / max(np.linalg.norm(dw_ref), 1e-12)
+        vs_one = f"{t_one / elapsed:.1f}x" if t_one is not None else "-"
+        print(f"{kappa:>5g} {elapsed:>9.3f} {t_ref / elapsed:>7.1f}x {vs_one:>8} "
+              f"{rel:>9.4f} {np.abs(err).max():>9.4f} "
+              f"{transition(w, 'CAT', 'A', 'T'):>7.2f} {transition(w, 'CAR', 'A', 'R'):>7.2f}")
+
+    print("\nκ=1 is real-time replay on the Network engine (identical to the reference up")
+    print("to the EPSC kernel); κ>1 compresses stimulus/synaptic/STDP time scales while")
+    print("spikes keep their real width (soma sub-steps), so errors come from κ·dt")
+    print("quantisation of spike times seen by STDP and synaptic delays.")
+    print("Compression saves little time: active somas still run ceil(κ) real-dt")
+    print("sub-steps per compressed step, and soma integration dominates replay time.")
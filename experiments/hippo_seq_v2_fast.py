@@ -13,8 +13,8 @@ class STDPSynapse(SynapseCore):
     - Pre가 Post보다 먼저 발화하면 강화 (LTP)
     - Post가 Pre보다 먼저 발화하면 약화 (LTD)
     """
-    def __init__(self, pre, post, delay_ms=1.5, Q_max=30.0, tau_ms=2.0):
-        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms)
+    def __init__(self, pre, post, delay_ms=1.5, Q_max=30.0, tau_ms=2.0, kernel="sum"):
+        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms, kernel=kernel)
         self.pre_neuron = pre
         self.post_neuron = post
         self.weight = 1.0
@@ -193,8 +193,7 @@ def run_multi_sequence_memory(N=20, dt=0.1):
                 n.S = 0.0
                 n.PTP = 1.0
             for s in total_synapses:
-                s.spikes = []
-                s.I_syn = 0
+                s.reset()
             
             print(" Done.")
     
@@ -233,8 +232,7 @@ def run_multi_sequence_memory(N=20, dt=0.1):
         n.S = 0.0
         n.PTP = 1.0
     for s in total_synapses:
-        s.spikes = []
-        s.I_syn = 0
+        s.reset()
     print("✅ Reset Done (including S/PTP).")
 
     # =========================================================
@@ -263,8 +261,7 @@ def run_multi_sequence_memory(N=20, dt=0.1):
             n.S = 0.0
             n.PTP = 1.0
         for s in total_synapses:
-            s.spikes = []
-            s.I_syn = 0
+            s.reset()
         
         # Recall
         logs = []
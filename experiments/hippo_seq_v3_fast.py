@@ -13,8 +13,8 @@ class STDPSynapse(SynapseCore):
     - Pre가 Post보다 먼저 발화하면 강화 (LTP)
     - Post가 Pre보다 먼저 발화하면 약화 (LTD)
     """
-    def __init__(self, pre, post, delay_ms=1.5, Q_max=10.0, tau_ms=2.0):
-        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms)
+    def __init__(self, pre, post, delay_ms=1.5, Q_max=10.0, tau_ms=2.0, kernel="sum"):
+        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms, kernel=kernel)
         self.pre_neuron = pre
         self.post_neuron = post
         self.weight = 1.0
@@ -202,8 +202,7 @@ def run_long_sequence_memory(N=20, dt=0.1):
                 n.PTP = 1.0
             # ✅ 시냅스도 완전 초기화!
             for s in synapses:
-                s.spikes = []
-                s.I_syn = 0.0
+                s.reset()
                 if hasattr(s, 'Ca'):
                     s.Ca = 0.0
                 if hasattr(s, 'R'):
@@ -248,8 +247,7 @@ def run_long_sequence_memory(N=20, dt=0.1):
         n.S = 0.0
         n.PTP = 1.0
     for s in synapses:
-        s.spikes = []
-        s.I_syn = 0
+        s.reset()
     print("✅ Reset Done (including S/PTP/ref/gates).")
 
     # =========================================================
@@ -132,10 +132,11 @@ class STDPSynapse(SynapseCore):
     - weight: 시냅스 가중치 (0.1 ~ 50.0)
     - Q_max: 최대 시냅스 자원 (50.0)
     - tau_ms: 시냅스 전달 시간 상수 (2.0 ms)
+    - kernel: EPSC α-kernel 계산 방식 ("sum" | "recursive", O(1) 갱신)
     - STDP window: ±20 ms
     """
-    def __init__(self, pre, post, delay_ms=1.5, Q_max=50.0, tau_ms=2.0):
-        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms)
+    def __init__(self, pre, post, delay_ms=1.5, Q_max=50.0, tau_ms=2.0, kernel="sum"):
+        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms, kernel=kernel)
         self.pre_neuron = pre
         self.post_neuron = post
         self.weight = 1.0  # 초기 가중치
@@ -623,8 +624,7 @@ def reset_neuron(neuron):
 
 def reset_synapse(syn):
     """시냅스 초기화"""
-    syn.spikes = []
-    syn.I_syn = 0.0
+    syn.reset()
     if hasattr(syn, 'Ca'):
         syn.Ca = 0.0
     if hasattr(syn, 'R'):
@@ -0,0 +1,354 @@
+"""
+================================================================================
+Hippocampus Word Memory — Large Vocabulary (10k+ words)
+================================================================================
+
+hippo_words 의 글자 시퀀스 학습을 대규모 어휘로 확장한 실험.
+
+    1) 단어 목록 파일을 한 줄씩 스트리밍 (iter_vocab)
+    2) 기호(글자 또는 위치·글자)마다 뉴런 그룹 할당 (assign_groups)
+    3) 고유 전이만 edge 블록으로 한 번에 연결 (VocabGraph → Projection 1개)
+    4) 미니배치 학습: 배치 원소마다 다른 단어를 동시에 제시하고
+       배치별 STDP 변화량을 합산 (Projection.merge_batch).
+       encoding 동안 재귀 방출을 끔 (k_PTP=0, ACh 가설) → 제시된 전이만 STDP
+    5) 첫 기호 cue → k-WTA (기호 그룹 중 하나만 발화) 로 전이를 따라가며
+       기호 열 재생. 재생 전이가 어휘의 최빈 전이를 따르는지, 재생 열이 cue 로
+       시작하는 저장 단어 (후보 집합) 인지 검사
+       (대조군: 학습 전 가중치, 학습된 가중치를 edge 사이에서 섞은 가중치)
+
+시냅스 방출은 가중치로만 정함 (k_Ca=0, release_power=2, w_ref=w_max):
+학습 전 w=1 은 역치 아래 (전파 없음), 자주 본 전이일수록 전류가 큼.
+전이 빈도는 어휘 크기에 비례하므로 A_plus 기본값은 1000/단어 수 — 최빈
+전이도 w_max 에 닿지 않음 (포화 비율 출력). 예전 A_plus=2.0 + 재귀 방출 켠
+학습은 cue 가 모든 후속 기호를 발화시켜 edge 대부분이 w_max 로 포화되고
+recall 이 학습 여부와 무관했음.
+
+네트워크는 (위치, 기호) 전이 빈도만 저장하는 1차 연쇄라 cue 다음은 가장 강한
+전이를 따라감. 저장된 내용을 재는 지표는 전이 recall (재생 전이 중 최빈 전이
+비율). 후보 집합 단어 완성은 어휘가 조밀하면 무작위 경로도 단어가 되므로
+섞은 가중치 대조군과 비슷해짐 (--words 2000: 학습 25%, 섞은 가중치 41%;
+10000: 80%, 88%), cue 한 단어를 그대로 재생하는 비율 (exact) 은 ~1%.
+측정 (합성 어휘, 포화 0%): 전이 recall 500 단어 98% (학습 전 15%, 섞은
+가중치 13%), 2000 단어 98% (11%, 14%), 10000 단어 97% (10%, 20%).
+
+Usage:
+    python hippo_vocab_scale.py [--vocab words.txt] [--words 10000] [--batch 64]
+
+--vocab 을 주지 않으면 /usr/share/dict/words, 없으면 합성 어휘 파일을 만들어 사용.
+
+보고:
+    • 저장 처리량 (words/sec, 학습 wall-clock 기준)
+    • recall 정확도 (재생 전이 중 어휘 최빈 전이를 따른 비율), 후보 집합 단어
+      완성 비율, cue 한 단어를 그대로 재생한 비율 — 학습 전 / 섞은 가중치
+      대조군과 함께
+    • 가중치 분포 (평균, 최대, w_max 포화 비율)
+================================================================================
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from v4_event import Network, StimulusSchedule, VocabGraph, assign_groups, iter_vocab
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+SYSTEM_DICT = "/usr/share/dict/words"
+W_MAX = 10.0
+
+
+# ======================================================================
+# Vocabulary
+# ======================================================================
+def write_synthetic_vocab(path, n, seed=0, min_len=3, max_len=8):
+    """자음-모음 음절로 만든 합성 단어 n개를 파일로 저장 (사전 파일이 없을 때)"""
+    rng = np.random.default_rng(seed)
+    consonants = list("BCDFGHJKLMNPRSTVWZ")
+    vowels = list("AEIOU")
+    seen = set()
+    with open(path, "w", encoding="utf-8") as f:
+        while len(seen) < n:
+            L = int(rng.integers(min_len, max_len + 1))
+            word = "".join(rng.choice(vowels if i % 2 else consonants) for i in range(L))
+            if word not in seen:
+                seen.add(word)
+                f.write(word + "\n")
+    return path
+
+
+def encode(word, coding):
+    """단어 → 기호 시퀀스 (letter: 글자, position: (위치, 글자))"""
+    if coding == "letter":
+        return list(word)
+    return [(i, c) for i, c in enumerate(word)]
+
+
+def batches(iterable, size):
+    """스트림을 size 개씩 묶음"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ======================================================================
+# Training / Recall
+# ======================================================================
+def train_batch(net, proj, graph, words, layer="letters"):
+    """
+    배치 원소 b 에 words[b] 를 제시 (hippo_words 학습 프로토콜) 후 가중치 병합
+
+    제시 동안 재귀 방출을 끔 (k_PTP=0): 켜 두면 각 기호가 학습된 모든 후속
+    기호를 발화시켜 제시되지 않은 전이까지 LTP 됨
+    """
+    sched = StimulusSchedule(inclusive_start=False)
+    for b, word in enumerate(words):
+        for i, sym in enumerate(graph.words[word]):
+            t_start = 5.0 + i * 15.0
+            sched.add(layer, graph.groups[sym], t_start, t_start + 8.0,
+                      250.0 if i == 0 else 200.0, batch=b)
+    T = 5.0 + 15.0 * max(len(w) for w in words) + 20.0
+
+    base = proj.W.weight[0].copy()
+    k_PTP, proj.W.k_PTP = proj.W.k_PTP, 0.0
+    net.reset()
+    net.run(T, stimulus=sched, jump=True)
+    proj.W.k_PTP = k_PTP
+    proj.merge_batch(base)
+
+
+def collapse(symbols):
+    """연속 반복 제거 (VocabGraph 는 자기 전이를 만들지 않음)"""
+    return tuple(sym for k, sym in enumerate(symbols) if k == 0 or sym != symbols[k - 1])
+
+
+def candidate_sets(graph):
+    """cue (첫 기호) → 그 기호로 시작하는 저장 단어 기호 열 집합"""
+    cands = {}
+    for symbols in graph.words.values():
+        cands.setdefault(symbols[0], set()).add(collapse(symbols))
+    return cands
+
+
+def strongest_successors(graph):
+    """기호 → 어휘에서 가장 자주 뒤따르는 기호 집합 (학습이 가장 강하게 만들 전이)"""
+    count = np.bincount(np.concatenate([ids for ids in graph.word_bigrams.values() if ids]),
+                        minlength=len(graph.bigrams))
+    best, top = {}, {}
+    for (a, b), c in zip(graph.bigrams, count):
+        if c > top.get(a, 0):
+            top[a], best[a] = c, {b}
+        elif c == top[a]:
+            best[a].add(b)
+    return best
+
+
+def transition_score(recalled, target, best):
+    """재생 열의 처음 len(target)−1 전이 중 최빈 전이를 따른 비율 (빠진 전이는 오답)"""
+    steps = len(target) - 1
+    hits = sum(b in best.get(a, ()) for a, b in zip(recalled[:steps], recalled[1:steps + 1]))
+    return hits / max(1, steps)
+
+
+def recall_batch(net, graph, symbol_of, cands, best, words, T_test, layer="letters"):
+    """
+    첫 기호 cue (1–2 ms, 300) → 발화 순서대로 기호 열 재생 → 후보 집합과 비교
+
+    레이어 k-WTA 로 매 스텝 한 기호 그룹만 발화하므로 재생 열은 spike 시각
+    순서의 기호 (연속 반복 제거). cue 로 시작하는 저장 단어 중 하나가 재생
+    열의 앞부분과 같으면 성공 (같은 cue 의 어느 단어를 재생해도 기억).
+
+    Returns
+    -------
+    list of (success, exact, transition, recalled)
+        exact : 재생 열이 cue 한 단어 자체로 시작
+        transition : transition_score (최빈 전이를 따른 비율)
+    """
+    sched = StimulusSchedule()
+    for b, word in enumerate(words):
+        sched.add(layer, graph.groups[graph.words[word][0]], 1.0, 2.0, 300.0, batch=b)
+
+    net.reset()
+    rec = net.run(T_test, stimulus=sched, probes=[f"{layer}:spikes"], plasticity=False, jump=True)
+    t_sp, b_sp, i_sp = rec[f"{layer}:spikes"]
+
+    out = []
+    for b, word in enumerate(words):
+        sel = b_sp == b
+        order = np.argsort(t_sp[sel], kind="stable")
+        recalled = collapse([symbol_of[i] for i in i_sp[sel][order]])
+        target = collapse(graph.words[word])
+        success = any(recalled[:len(c)] == c for c in cands[target[0]])
+        out.append((success, recalled[:len(target)] == target,
+                    transition_score(recalled, target, best), recalled))
+    return out
+
+
+def recall_all(net, graph, symbol_of, cands, best, test, batch, T_test):
+    """test 단어를 batch 개씩 recall_batch"""
+    results = []
+    for chunk in batches(test, batch):
+        results.extend(recall_batch(net, graph, symbol_of, cands, best, chunk, T_test))
+    return results
+
+
+def spell(symbols):
+    """기호 열 → 글자 문자열"""
+    return "".join(sym[1] if isinstance(sym, tuple) else sym for sym in symbols)
+
+
+# ======================================================================
+# MAIN
+# ======================================================================
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[2])
+    ap.add_argument("--vocab", default=None, help="단어 목록 파일 (한 줄에 한 단어)")
+    ap.add_argument("--words", type=int, default=10000, help="최대 학습 단어 수")
+    ap.add_argument("--min-len", type=int, default=3)
+    ap.add_argument("--max-len", type=int, default=8)
+    ap.add_argument("--coding", choices=("position", "letter"), default="position")
+    ap.add_argument("--group-size", type=int, default=2)
+    ap.add_argument("--batch", type=int, default=64, help="미니배치 크기 (동시 제시 단어 수)")
+    ap.add_argument("--epochs", type=int, default=1)
+    ap.add_argument("--test", type=int, default=256, help="recall 검사 단어 수")
+    ap.add_argument("--t-test", type=float, default=60.0)
+    ap.add_argument("--A-plus", type=float, default=None,
+                    help="STDP LTP 학습률 (기본 1000/단어 수)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    print("\n" + "=" * 70)
+    print("📚 HIPPOCAMPUS WORD MEMORY — LARGE VOCABULARY")
+    print("=" * 70)
+
+    path = args.vocab
+    if path is None:
+        if os.path.exists(SYSTEM_DICT):
+            path = SYSTEM_DICT
+        else:
+            path = os.path.join(tempfile.gettempdir(), f"hippo_vocab_{args.words}_{args.seed}.txt")
+            if not os.path.exists(path):
+                write_synthetic_vocab(path, args.words, seed=args.seed,
+                                      min_len=args.min_len, max_len=args.max_len)
+            print(f"ℹ️  No word list given — using synthetic vocabulary")
+
+    # =========================================================
+    # PHASE 0: BUILD (stream → groups → bulk projection)
+    # =========================================================
+    t_build = time.perf_counter()
+    vocab = {}
+    for word in iter_vocab(path, min_len=args.min_len, max_len=args.max_len,
+                           alphabet=ALPHABET, limit=args.words):
+        vocab[word] = encode(word, args.coding)
+    if not vocab:
+        sys.exit(f"❌ No usable words in {path}")
+
+    symbols = sorted({sym for syms in vocab.values() for sym in syms})
+    groups = assign_groups(symbols, args.group_size)
+    N = len(symbols) * args.group_size
+
+    graph = VocabGraph(vocab, groups)
+    symbol_of = {i: sym for sym, idx in groups.items() for i in idx}
+
+    B = args.batch
+    A_plus = 1000.0 / len(vocab) if args.A_plus is None else args.A_plus
+    net = Network(dt=0.1, batch=B, seed=args.seed, active_set=True)
+    # k-WTA: 기호 그룹 중 입력이 가장 큰 하나만 통과 (hippo_branching 과 같은 -1000 억제)
+    net.add_layer("letters", N, inhibition=dict(groups=[groups[sym] for sym in symbols], k=1,
+                                                threshold=1.0, inhibition=-1000.0))
+    # 방출 = k_PTP·R·w·(w/w_ref)² — 학습 전 w=1 은 역치 아래
+    proj = graph.connect(net, "letters", weight=1.0, delay_ms=2.0, Q_max=50.0, tau_ms=2.0,
+                         k_Ca=0.0, release_power=2.0, w_ref=W_MAX,
+                         stdp=dict(A_plus=A_plus, A_minus=0.1, w_max=W_MAX))
+    t_build = time.perf_counter() - t_build
+
+    print(f"\n✅ Vocabulary: {len(vocab)} words from {path}")
+    print(f"   Coding: {args.coding} ({len(symbols)} symbols × {args.group_size} neurons = {N})")
+    print(f"   Transitions: {len(graph.bigrams)} unique bigrams")
+    print(f"   Synapses: {graph.n_edges} (per-word wiring would need {graph.n_edges_naive})")
+    print(f"   STDP: A_plus={A_plus:.3g}, w_max={W_MAX:g}")
+    print(f"   Build time: {t_build:.2f} s")
+
+    # =========================================================
+    # PHASE 1: MINI-BATCH LEARNING
+    # =========================================================
+    print("\n" + "=" * 70)
+    print(f"PHASE 1: WORD LEARNING (mini-batch {B}, {args.epochs} epoch(s))")
+    print("=" * 70)
+
+    words = list(vocab)
+    rng = np.random.default_rng(args.seed)
+    w_init = proj.W.weight.copy()               # 대조군 (학습 전) recall 용
+    n_seen = 0
+    t_learn = time.perf_counter()
+    for epoch in range(args.epochs):
+        order = rng.permutation(len(words))
+        for chunk in batches((words[i] for i in order), B):
+            train_batch(net, proj, graph, chunk)
+            n_seen += len(chunk)
+        elapsed = time.perf_counter() - t_learn
+        print(f"  Epoch {epoch + 1}/{args.epochs}: {n_seen} words, "
+              f"{n_seen / elapsed:.1f} words/sec")
+    t_learn = time.perf_counter() - t_learn
+
+    w = proj.W.weight[0]
+    print(f"\n✅ Learning Complete! ({t_learn:.1f} s)")
+    print(f"   Weights: mean {w.mean():.2f}, max {w.max():.2f}, "
+          f"saturated {np.mean(w >= W_MAX) * 100:.1f}%")
+
+    # =========================================================
+    # PHASE 2: RECALL TEST (first-symbol cue)
+    # =========================================================
+    print("\n" + "=" * 70)
+    print("PHASE 2: WORD RECALL TEST")
+    print("=" * 70)
+
+    test = [words[i] for i in rng.choice(len(words), min(args.test, len(words)), replace=False)]
+    cands, best = candidate_sets(graph), strongest_successors(graph)
+    t_recall = time.perf_counter()
+    results = recall_all(net, graph, symbol_of, cands, best, test, B, args.t_test)
+    t_recall = time.perf_counter() - t_recall
+
+    # 대조군: 학습 전 가중치 / 학습된 가중치를 edge 사이에서 섞은 가중치
+    # (가중치 분포는 같고 어느 전이가 강한지만 무작위)
+    w_trained = proj.W.weight.copy()
+    controls = {}
+    proj.W.weight[...] = w_init
+    controls["untrained"] = recall_all(net, graph, symbol_of, cands, best, test, B, args.t_test)
+    proj.W.weight[...] = w_trained[..., rng.permutation(w_trained.shape[-1])]
+    controls["shuffled"] = recall_all(net, graph, symbol_of, cands, best, test, B, args.t_test)
+    proj.W.weight[...] = w_trained
+
+    for word, (ok, exact, _, recalled) in list(zip(test, results))[:8]:
+        print(f"   {'✅' if ok else '❌'} cue {spell(graph.words[word][:1])} ({word:<8}) "
+              f"→ {spell(recalled)}{'  (exact)' if exact else ''}")
+
+    def rate(res, k=0):
+        n = sum(r[k] for r in res)
+        return f"{n}/{len(res)} ({100.0 * n / len(res):.1f}%)"
+
+    def transitions(res):
+        return f"{100.0 * np.mean([r[2] for r in res]):.1f}%"
+
+    # =========================================================
+    # SUMMARY
+    # =========================================================
+    print("\n" + "=" * 70)
+    print("🏆 FINAL SUMMARY")
+    print("=" * 70)
+    print(f"\n📥 Storage throughput: {n_seen / t_learn:.1f} words/sec "
+          f"({n_seen} presentations in {t_learn:.1f} s)")
+    print(f"🎯 Recall accuracy:    {transitions(results)} "
+          f"(recalled steps that follow the most frequent stored transition)")
+    print(f"🔤 Word completion:    {rate(results)} stored word with the cued first symbol, "
+          f"exact cued word {rate(results, 1)}")
+    for name, res in controls.items():
+        print(f"🧪 {name.capitalize() + ' control:':<19} recall {transitions(res)}, "
+              f"completion {rate(res)}, exact {rate(res, 1)}")
+    print(f"⏱️  Recall time:        {t_recall:.1f} s ({len(test) / t_recall:.1f} words/sec)")
@@ -5,8 +5,8 @@ from v4_event import CONFIG, HHSomaQuick, SynapseCore
 # STDP Synapse
 # ======================================================================
 class STDPSynapse(SynapseCore):
-    def __init__(self, pre, post, delay_ms=1.5, Q_max=50.0, tau_ms=2.0):
-        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms)
+    def __init__(self, pre, post, delay_ms=1.5, Q_max=50.0, tau_ms=2.0, kernel="sum"):
+        super().__init__(pre.soma, post.soma, delay_ms=delay_ms, Q_max=Q_max, tau_ms=tau_ms, kernel=kernel)
         self.pre_neuron = pre
         self.post_neuron = post
         self.weight = 1.0
@@ -180,8 +180,7 @@ if __name__ == "__main__":
                 n.S = 0.0
                 n.PTP = 1.0
             for s in total_synapses:
-                s.spikes = []
-                s.I_syn = 0.0
+                s.reset()
                 if hasattr(s, 'Ca'):
                     s.Ca = 0.0
                 if hasattr(s, 'R'):
@@ -292,8 +291,7 @@ if __name__ == "__main__":
             n.S = 0.0
             n.PTP = 1.0
         for s in total_synapses:
-            s.spikes = []
-            s.I_syn = 0.0
+            s.reset()
     
     # =========================================================
     # FINAL SUMMARY
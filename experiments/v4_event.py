@@ -107,6 +107,7 @@
 # =============================================================
 
 from __future__ import annotations
+from collections import deque
 from dataclasses import dataclass
 import numpy as np
 import matplotlib.pyplot as plt
@@ -293,13 +294,15 @@ CONFIG = {
     #   - Heun: 2차 정확도, Ca·Heat 등 비선형 완화에 적합
     #   - RK4 : 4차 정확도, DTG/Mito/HH 정밀 시뮬에 적합
     #   - cfl_euler: 축삭용 내부 서브스텝 포함, 안정성 확보 전용
+    #   - cn       : 축삭 Crank–Nicolson (dt_elec 당 1 스텝, 사전 분해 확산 행렬)
 
     "SOLVER": {
         "DTG": "euler",        # "rk4"로 바꿔도 됨 (더 정확하지만 계산 비용 증가)
         "MITO": "rk4",         # 4차 Runge-Kutta: ATP 대사 정밀도 향상
         "HH":   "rk4",         # 4차 Runge-Kutta: 게이트+막전위 동시 적분으로 정확도 향상
         "CA":   "heun",        # Heun 방법: 중간 정확도, semi-implicit도 가능
-        "AXON": "cfl_euler"    # CFL 조건 만족 Euler: 안정성 보장, 서브스텝 포함
+        "AXON": "cfl_euler",   # CFL 조건 만족 Euler: 안정성 보장, 서브스텝 포함
+        "IONFLOW": "explicit"  # 이온 확산: "explicit" (Euler) / "implicit" (backward Euler)
     },
 }
 
@@ -1105,6 +1108,123 @@ def rk4_step_quick(derivs, y, dt):
     return y + (k1 + 2*k2 + 2*k3 + k4) / 6.0
 
 
+# ----------------------------------------------------------------------
+# Gate Lookup Table Registry (process-wide, shared read-only arrays)
+# ----------------------------------------------------------------------
+# 게이트 속도함수 상수: rate(V) = A·(V+V0)/(1-exp(-(V+V0)/k))  (am, an — 선형/지수형)
+#                       rate(V) = A·exp(-(V+V0)/k)             (bm, ah, bn — 지수형)
+#                       rate(V) = A/(1+exp(-(V+V0)/k))         (bh — 시그모이드형)
+HH_QUICK_GATE_PARAMS = {
+    "am": (0.1, 40.0, 10.0),
+    "bm": (4.0, 65.0, 18.0),
+    "ah": (0.07, 65.0, 20.0),
+    "bh": (1.0, 35.0, 10.0),
+    "an": (0.01, 55.0, 10.0),
+    "bn": (0.125, 65.0, 80.0),
+}
+
+
+def _build_hh_quick_tables(min_v, max_v, res, params=None):
+    """
+    HHSomaQuick 게이트 Lookup Table 생성 (벡터화)
+    -------------------------------------
+    반환: (6, steps) 배열 — 행 순서 (τ_m, m_inf, τ_h, h_inf, τ_n, n_inf)
+    """
+    p = HH_QUICK_GATE_PARAMS if params is None else params
+    steps = int((max_v - min_v) / res) + 1
+    v = np.linspace(min_v, max_v, steps)
+
+    def _linexp(A, V0, k):
+        # A·x/(1-exp(-x/k)),  x→0 극한값 = A·k
+        x = v + V0
+        ok = np.abs(x) > 1e-5
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = A * x / (1.0 - np.exp(-x / k))
+        return np.where(ok, r, A * k)
+
+    am = _linexp(*p["am"])
+    bm = p["bm"][0] * np.exp(-(v + p["bm"][1]) / p["bm"][2])
+    ah = p["ah"][0] * np.exp(-(v + p["ah"][1]) / p["ah"][2])
+    bh = p["bh"][0] / (1.0 + np.exp(-(v + p["bh"][1]) / p["bh"][2]))
+    an = _linexp(*p["an"])
+    bn = p["bn"][0] * np.exp(-(v + p["bn"][1]) / p["bn"][2])
+
+    tables = np.empty((6, steps))
+    tables[0] = 1.0 / (am + bm); tables[1] = am / (am + bm)
+    tables[2] = 1.0 / (ah + bh); tables[3] = ah / (ah + bh)
+    tables[4] = 1.0 / (an + bn); tables[5] = an / (an + bn)
+    return tables
+
+
+class HHGateTableRegistry:
+    """
+    HHSomaQuick 게이트 LUT 공유 레지스트리
+    ---------------------------------------------
+    • key = (게이트 파라미터, V 범위, 해상도)
+    • key당 한 번만 생성 → 모든 인스턴스가 같은 읽기 전용 배열 공유
+    • cache_dir 지정 시 .npy 로 저장 후 memory-map 로드
+      (워커 프로세스/반복 실행은 파일만 열고 바로 시작)
+    ---------------------------------------------
+    cache_dir 기본값: 환경변수 HIPPO_LUT_CACHE_DIR (없으면 디스크 캐시 끔)
+    """
+
+    def __init__(self, cache_dir=None):
+        self._tables = {}
+        self.cache_dir = cache_dir if cache_dir is not None else os.environ.get("HIPPO_LUT_CACHE_DIR")
+
+    def set_cache_dir(self, cache_dir):
+        """디스크 캐시 경로 설정 (None이면 끔)"""
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def make_key(min_v, max_v, res, params=None):
+        p = HH_QUICK_GATE_PARAMS if params is None else params
+        return (tuple(sorted((k, tuple(float(x) for x in v)) for k, v in p.items())),
+                float(min_v), float(max_v), float(res))
+
+    def _cache_path(self, key):
+        import hashlib
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"hh_quick_lut_{digest}.npy")
+
+    def get(self, min_v=-100.0, max_v=100.0, res=0.1, params=None):
+        """
+        LUT 조회 (없으면 생성/로드)
+
+        Returns
+        -------
+        ndarray, shape (6, steps), read-only
+            행 순서 (τ_m, m_inf, τ_h, h_inf, τ_n, n_inf)
+        """
+        key = self.make_key(min_v, max_v, res, params)
+        tables = self._tables.get(key)
+        if tables is not None:
+            return tables
+
+        path = self._cache_path(key) if self.cache_dir else None
+        if path is not None and os.path.exists(path):
+            tables = np.load(path, mmap_mode="r")
+        else:
+            tables = _build_hh_quick_tables(min_v, max_v, res, params)
+            if path is not None:
+                # 임시 파일에 쓰고 교체 → 동시 실행 워커가 반쯤 쓴 파일을 읽지 않음
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp.npy"
+                np.save(tmp, tables)
+                os.replace(tmp, path)
+            tables.flags.writeable = False
+
+        self._tables[key] = tables
+        return tables
+
+    def clear(self):
+        """메모리 캐시 비우기 (디스크 파일은 유지)"""
+        self._tables.clear()
+
+
+HH_GATE_TABLES = HHGateTableRegistry()
+
+
 class HHSomaQuick:
     """
     [Section 2: Eve - Fast Bio-Neuron (Optimized v4)]
@@ -1142,31 +1262,12 @@ class HHSomaQuick:
         # ----------------------------------------------------
         # ⚡ 핵심 최적화: LOOKUP TABLE 생성 (최초 1회만 계산)
         # ----------------------------------------------------
+        # (프로세스 공유 레지스트리에서 읽기 전용 배열로 가져옴)
         self.min_v, self.max_v = -100.0, 100.0
         self.res = 0.1  # 0.1mV 단위
-        steps = int((self.max_v - self.min_v) / self.res) + 1
-        
-        # 테이블 배열 생성
-        self._tau_m = np.zeros(steps); self._minf = np.zeros(steps)
-        self._tau_h = np.zeros(steps); self._hinf = np.zeros(steps)
-        self._tau_n = np.zeros(steps); self._ninf = np.zeros(steps)
-        
-        # 테이블 채우기
-        v_axis = np.linspace(self.min_v, self.max_v, steps)
-        for i, v in enumerate(v_axis):
-            am = 0.1*(v+40.0)/(1.0 - math.exp(-(v+40.0)/10.0)) if abs(v+40)>1e-5 else 1.0
-            bm = 4.0*math.exp(-(v+65.0)/18.0)
-            ah = 0.07*math.exp(-(v+65.0)/20.0)
-            bh = 1.0/(1.0 + math.exp(-(v+35.0)/10.0))
-            an = 0.01*(v+55.0)/(1.0 - math.exp(-(v+55.0)/10.0)) if abs(v+55)>1e-5 else 0.1
-            bn = 0.125*math.exp(-(v+65.0)/80.0)
-            
-            self._tau_m[i] = 1.0 / (am + bm)
-            self._minf[i]  = am / (am + bm)
-            self._tau_h[i] = 1.0 / (ah + bh)
-            self._hinf[i]  = ah / (ah + bh)
-            self._tau_n[i] = 1.0 / (an + bn)
-            self._ninf[i]  = an / (an + bn)
+        (self._tau_m, self._minf,
+         self._tau_h, self._hinf,
+         self._tau_n, self._ninf) = HH_GATE_TABLES.get(self.min_v, self.max_v, self.res)
 
     # ---------------------------------------------------------
     # 외부 호환성 메서드 (기존 코드 안 깨지게)
@@ -1815,6 +1916,375 @@ class HHNeuronInputWrapper:
         
         return soma_result
 
+# =============================================================
+# 3c. hh_soma_population.py — Vectorized HHSomaQuick Population
+# =============================================================
+# 목적:
+#   • HHSomaQuick N개를 struct-of-arrays(SoA) 형태로 묶어 한 번에 적분
+#   • 실험 코드의 "뉴런당 soma.step() 호출" 파이썬 루프 제거
+#   • HHSomaQuick.step()과 동일한 수식·연산 순서 → 동일한 스파이크 래스터
+#
+# 상태 배열 (shape = (N,) 또는 임의의 shape):
+#   V, m, h, n        : 막전위 / HH 게이트
+#   mode              : REST(0) | ACTIVE(1)
+#   ref_remaining     : 남은 불응기 [ms]
+#   I_syn_total       : 시냅스 전류 버퍼 (add_synaptic_current 누적)
+# =============================================================
+
+def _load_fields(obj, state, fields):
+    """state[k] 를 obj.k 배열에 제자리 복사 (shape 불일치 시 ValueError)"""
+    for k in fields:
+        dst, src = getattr(obj, k), np.asarray(state[k])
+        if dst.shape != src.shape:
+            raise ValueError(f"{type(obj).__name__}.{k}: shape {src.shape} != {dst.shape}")
+        dst[...] = src
+
+
+class HHSomaQuickPopulation:
+    """
+    [Section 2b: Eve Population - Vectorized HHSomaQuick (v4)]
+    ---------------------------------------------
+    HHSomaQuick의 벡터화 버전입니다.
+    1. SoA 상태: V/m/h/n/mode/ref_remaining 를 NumPy 배열로 보관
+    2. Masked 분기: Active/Rest 처리를 boolean mask로 일괄 계산
+    3. LUT gather: 룩업 테이블을 정수 인덱스 배열로 한 번에 조회
+    → step() 한 번 = 뉴런 N개 스텝 (spike bool 배열 반환)
+    ---------------------------------------------
+
+    사용 예시
+    ----------
+    >>> pop = HHSomaQuickPopulation(CONFIG["HH"], 52)
+    >>> I = np.zeros(52); I[[4, 5]] = 300.0
+    >>> spikes = pop.step(0.1, I)      # shape (52,) bool
+    """
+
+    REST, ACTIVE = 0, 1
+
+    def __init__(self, config, N):
+        self.shape = (int(N),) if np.isscalar(N) else tuple(int(k) for k in N)
+
+        # 파라미터 설정 (HHSomaQuick과 동일)
+        self.C_m = 1.0
+        self.gNa, self.ENa = float(config["gNa"]), float(config["ENa"])
+        self.gK,  self.EK  = float(config["gK"]),  float(config["EK"])
+        self.gL,  self.EL  = float(config["gL"]),  float(config["EL"])
+        self.V0 = float(config["V0"])
+        self.spike_thresh = float(config.get("spike_thresh", 0.0))
+        self.REFRACTORY_TIME_MS = 5.0
+
+        # 시간 배율 (압축 replay): step(dt) 한 번 = 뉴런 시간 time_scale·dt
+        # (ceil(s) 개 부분 스텝으로 적분 → 스파이크 파형/불응기는 실제 시간 유지)
+        # 1.0 이면 HHSomaQuick 과 동일
+        self.time_scale = 1.0
+
+        # 룩업 테이블 (HHSomaQuick과 동일 범위/해상도, 공유 레지스트리)
+        self.min_v, self.max_v = -100.0, 100.0
+        self.res = 0.1
+        (self._tau_m, self._minf,
+         self._tau_h, self._hinf,
+         self._tau_n, self._ninf) = HH_GATE_TABLES.get(self.min_v, self.max_v, self.res)
+        self._idx_max = len(self._tau_m) - 1
+
+        # 상태 배열
+        self.V = np.empty(self.shape)
+        self.m = np.empty(self.shape)
+        self.h = np.empty(self.shape)
+        self.n = np.empty(self.shape)
+        self.mode = np.empty(self.shape, dtype=np.int8)
+        self.ref_remaining = np.empty(self.shape)
+        self.spike_flag = np.zeros(self.shape, dtype=bool)
+        self.I_syn_total = np.zeros(self.shape)
+        self._clock = 0                                   # 누적 스텝 수
+        self._stamp = np.zeros(self.shape, dtype=np.int64)  # 뉴런별 마지막 적분 스텝
+        self.reset()
+
+    @property
+    def N(self):
+        return int(np.prod(self.shape))
+
+    # ---------------------------------------------------------
+    # pickle: 룩업 테이블은 저장하지 않고 레지스트리에서 다시 조회
+    # ---------------------------------------------------------
+    _LUT_FIELDS = ("_tau_m", "_minf", "_tau_h", "_hinf", "_tau_n", "_ninf")
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in self._LUT_FIELDS:
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        tables = HH_GATE_TABLES.get(self.min_v, self.max_v, self.res)
+        for key, table in zip(self._LUT_FIELDS, tables):
+            setattr(self, key, table)
+
+    # ---------------------------------------------------------
+    # 초기화 (실험 코드의 reset 블록과 동일한 값)
+    # ---------------------------------------------------------
+    def reset(self, idx=None):
+        """
+        상태 초기화 (V=V0, m/h/n = 0.05/0.60/0.32, rest, 불응기 0)
+
+        Parameters
+        ----------
+        idx : None | index array | bool mask
+            None이면 전체, 아니면 해당 뉴런만 초기화
+        """
+        sel = slice(None) if idx is None else idx
+        self.V[sel] = self.V0
+        self.m[sel] = 0.05
+        self.h[sel] = 0.60
+        self.n[sel] = 0.32
+        self.mode[sel] = self.REST
+        self.ref_remaining[sel] = 0.0
+        self.spike_flag[sel] = False
+        self.I_syn_total[sel] = 0.0
+        self._stamp[sel] = self._clock
+
+    # ---------------------------------------------------------
+    # 외부 호환성 메서드 (HHSomaQuick 인터페이스)
+    # ---------------------------------------------------------
+    def add_synaptic_current(self, I_syn):
+        self.I_syn_total += I_syn
+
+    def get_total_synaptic_current(self):
+        I = self.I_syn_total
+        self.I_syn_total = np.zeros(self.shape)
+        return I
+
+    # ---------------------------------------------------------
+    # MAIN STEP (벡터화 엔진)
+    # ---------------------------------------------------------
+    def step(self, dt, I_ext=0.0, ATP=100.0, **kwargs):
+        """
+        전체 뉴런 한 스텝 적분 (HHSomaQuick.step 과 동일한 의미론)
+
+        Parameters
+        ----------
+        dt : float
+            시간 스텝 [ms]
+        I_ext : float | ndarray
+            외부 전류 (스칼라 또는 shape 배열)
+
+        Returns
+        -------
+        spikes : ndarray[bool]
+            이번 스텝 발화 여부
+        """
+        # lazy 이완 대기 중인 뉴런 반영 (step_sparse 와 섞어 쓸 때)
+        self.sync()
+
+        # 외부 전류 + 내부 버퍼 합산 후 버퍼 초기화
+        total = I_ext + self.I_syn_total
+        if np.ndim(total) == 0:
+            total = np.full(self.shape, float(total))
+        self.I_syn_total = np.zeros(self.shape)
+
+        self.V, spikes = self._advance(self.V, self.m, self.h, self.n,
+                                       self.mode, self.ref_remaining, total, dt)
+        self._clock += 1
+        self._stamp[...] = self._clock
+        self.spike_flag = spikes
+        return spikes
+
+    def _advance(self, V, m_all, h_all, n_all, mode, ref_all, total, dt):
+        """
+        상태 배열 한 스텝 적분 (m/h/n/mode/ref 는 제자리 갱신)
+
+        time_scale = s > 1 이면 뉴런 시간 s·dt 를 한 번에 진행 (입력 total 은 일정):
+          • 무입력 rest          : V = EL + (V − EL)·0.9^s  (닫힌 해)
+          • 약한 입력 rest       : 선형 Euler n 회의 닫힌 해 (끝까지 깨지 않을 때)
+          • active / 깨어날 뉴런 : ceil(s) 개 부분 스텝 (부분 스텝 중 발화하면 spike)
+        active 뉴런 비용은 s 에 비례 → 압축해도 active 적분 시간은 줄지 않음
+
+        Returns
+        -------
+        V : ndarray
+            갱신된 막전위 (새 배열)
+        spikes : ndarray[bool]
+        """
+        scale = self.time_scale
+        if scale == 1.0:
+            return self._substep(V, m_all, h_all, n_all, mode, ref_all, total, dt, 0.1)
+
+        n_sub = max(1, int(np.ceil(scale - 1e-9)))
+        frac = scale / n_sub
+        h_dt = dt * frac
+        gain = 0.1 if frac == 1.0 else 1.0 - 0.9 ** frac
+
+        V = np.clip(V, -90.0, 40.0)
+        total = np.broadcast_to(total, V.shape)
+        act = mode == self.ACTIVE
+        stim = np.abs(total) > 0.001
+
+        # rest 뉴런: 닫힌 해로 s·dt 진행
+        quiet = ~act & ~stim
+        V[quiet] = self.EL + (V[quiet] - self.EL) * 0.9 ** scale
+        lin = ~act & stim
+        sub = act.copy()
+        if lin.any():
+            # V' = V + h·(gL(EL − V) + I)/C 를 n 번 → V* + (V − V*)·a^n
+            I = total[lin]
+            V_inf = self.EL + I / self.gL
+            V_end = V_inf + (V[lin] - V_inf) * (1.0 - h_dt * self.gL / self.C_m) ** n_sub
+            wakes = (I > 5.0) | (V_end > -55.0)
+            sub[lin] = wakes
+            V[lin] = np.where(wakes, V[lin], V_end)
+
+        # active + 이번 스텝에 깨어날 뉴런만 부분 스텝 적분
+        spikes = np.zeros(V.shape, dtype=bool)
+        if sub.any():
+            Vs, ms, hs, ns = V[sub], m_all[sub], h_all[sub], n_all[sub]
+            mo, rs, Is = mode[sub], ref_all[sub], total[sub]
+            spk = np.zeros(Vs.shape, dtype=bool)
+            for _ in range(n_sub):
+                Vs, k = self._substep(Vs, ms, hs, ns, mo, rs, Is, h_dt, gain)
+                spk |= k
+            V[sub], m_all[sub], h_all[sub], n_all[sub] = Vs, ms, hs, ns
+            mode[sub], ref_all[sub] = mo, rs
+            spikes[sub] = spk
+        return V, spikes
+
+    def _substep(self, V, m_all, h_all, n_all, mode, ref_all, total, dt, relax):
+        """HHSomaQuick 한 스텝 (relax: 무입력 rest 뉴런의 스텝당 EL 방향 이완 비율)"""
+        spikes = np.zeros(V.shape, dtype=bool)
+
+        # 전압 안전 범위 확인 (무한대 방지)
+        V = np.clip(V, -90.0, 40.0)
+
+        # 1. 룩업 테이블 인덱스 (절사 = int())
+        idx = ((V - self.min_v) / self.res).astype(np.intp)
+        np.clip(idx, 0, self._idx_max, out=idx)
+
+        act = mode == self.ACTIVE
+        rest = ~act
+
+        # 2-a. [Active]: Euler 적분
+        if act.any():
+            ia = idx[act]
+            Va = V[act]
+            m = m_all[act]; h = h_all[act]; n = n_all[act]
+
+            m += (dt / self._tau_m[ia]) * (self._minf[ia] - m)
+            h += (dt / self._tau_h[ia]) * (self._hinf[ia] - h)
+            n += (dt / self._tau_n[ia]) * (self._ninf[ia] - n)
+
+            INa = self.gNa * (m**3) * h * (self.ENa - Va)
+            IK  = self.gK  * (n**4) * (self.EK - Va)
+            IL  = self.gL  * (self.EL - Va)
+
+            dV = (INa + IK + IL + total[act]) / self.C_m
+            Va = np.clip(Va + dV * dt, -90.0, 40.0)
+
+            # 스파이크 감지 (불응기 체크)
+            ref = ref_all[act]
+            spk = (Va > self.spike_thresh) & (ref <= 0)
+            ref[spk] = self.REFRACTORY_TIME_MS
+
+            # 안정화되면 Rest로 복귀
+            back = (Va < -60.0) & (ref <= 0)
+            Va[back] = self.EL
+            mode_a = np.where(back, self.REST, self.ACTIVE).astype(np.int8)
+
+            pos = ref > 0
+            ref[pos] -= dt
+
+            V[act] = Va
+            m_all[act] = m; h_all[act] = h; n_all[act] = n
+            ref_all[act] = ref
+            mode[act] = mode_a
+            spikes[act] = spk
+
+        # 2-b. [Rest]: 선형 근사 (강한 자극에만 Active 전환)
+        if rest.any():
+            Vr = V[rest]
+            Ir = total[rest]
+            stim = np.abs(Ir) > 0.001
+
+            dV = (self.gL * (self.EL - Vr) + Ir) / self.C_m
+            V_stim = Vr + dV * dt
+            V_relax = Vr + relax * (self.EL - Vr)
+            Vr = np.where(stim, V_stim, V_relax)
+
+            V[rest] = Vr
+            wake = np.zeros(V.shape, dtype=bool)
+            wake[rest] = stim & ((Vr > -55.0) | (Ir > 5.0))
+            mode[wake] = self.ACTIVE
+
+        return V, spikes
+
+    # ---------------------------------------------------------
+    # ACTIVE-SET STEP (조용한 뉴런 건너뛰기)
+    # ---------------------------------------------------------
+    def step_sparse(self, dt, I_ext=0.0, ATP=100.0, **kwargs):
+        """
+        active set 만 적분하는 step (결과 의미론은 step 과 동일)
+
+        active set = active 모드 ∪ |입력| > 0.001 인 뉴런.
+        나머지(rest + 무입력)는 매 스텝 V += 0.1·(EL − V) 만 하므로 건너뛰고,
+        다음에 접근할 때 k 스텝분을 닫힌 해로 한 번에 적용:
+            V_k = EL + (V − EL)·0.9^(k·time_scale)
+
+        Returns
+        -------
+        spikes : ndarray[bool]
+            이번 스텝 발화 여부
+        """
+        total = I_ext + self.I_syn_total
+        self.I_syn_total = np.zeros(self.shape)
+        touch = (self.mode == self.ACTIVE) | (np.abs(total) > 0.001)
+        sel = np.flatnonzero(touch)
+        self._catch_up(sel)
+
+        spikes = np.zeros(self.shape, dtype=bool)
+        self._clock += 1
+        if sel.size:
+            V, m, h, n = (a.ravel() for a in (self.V, self.m, self.h, self.n))
+            mode, ref = self.mode.ravel(), self.ref_remaining.ravel()
+            ms, hs, ns = m[sel], h[sel], n[sel]
+            mo, rs = mode[sel], ref[sel]
+            I_sel = np.broadcast_to(total, self.shape).ravel()[sel]
+            V[sel], spk = self._advance(V[sel], ms, hs, ns, mo, rs, I_sel, dt)
+            m[sel], h[sel], n[sel], mode[sel], ref[sel] = ms, hs, ns, mo, rs
+            spikes.ravel()[sel] = spk
+            self._stamp.ravel()[sel] = self._clock
+        self.spike_flag = spikes
+        return spikes
+
+    def _catch_up(self, sel=None):
+        """lazy 이완 k 스텝을 닫힌 해로 적용 (sel: 평탄화 인덱스, None 이면 전체)"""
+        V, stamp = self.V.ravel(), self._stamp.ravel()
+        if sel is None:
+            sel = np.flatnonzero(stamp != self._clock)
+        k = self._clock - stamp[sel]
+        lag = k > 0
+        if lag.any():
+            i = sel[lag]
+            V[i] = self.EL + (np.clip(V[i], -90.0, 40.0) - self.EL) * (0.9 ** self.time_scale) ** k[lag]
+            stamp[i] = self._clock
+
+    def sync(self):
+        """모든 뉴런의 lazy 이완을 현재 스텝까지 반영 (probe/저장 전 호출)"""
+        self._catch_up()
+
+    def spiking(self):
+        return self.spike_flag
+
+    # ---------------------------------------------------------
+    # 상태 저장/복원 (Network.save_state 에서 사용)
+    # ---------------------------------------------------------
+    STATE_FIELDS = ("V", "m", "h", "n", "mode", "ref_remaining", "spike_flag", "I_syn_total")
+
+    def state_dict(self):
+        self.sync()
+        return {k: getattr(self, k).copy() for k in self.STATE_FIELDS}
+
+    def load_state_dict(self, state):
+        _load_fields(self, state, self.STATE_FIELDS)
+        self._stamp[...] = self._clock
+
+
 # =============================================================
 # 4. ionflow_dynamics.py — 다중 이온 확산/전기이동 모델
 # =============================================================
@@ -1829,8 +2299,21 @@ class IonFlowDynamics:
     IonFlowDynamics — Multi-Ion Diffusion + Electric Drift
     ------------------------------------------------------
     ∂C_i/∂t = D_i∇²C_i − μ_i·z_i·F·∇V
+
+    4종 이온 농도를 (4, N) 배열 C 한 개로 보관하고 이온 축 전체를 한 번에
+    갱신 (작업 버퍼 사전 할당). ions[name]["C"] 는 C 의 행 view.
+
+    V 가 공간적으로 균일하면 (run_pipeline: ionflow.V[:] = soma.V) ∇V = 0 이라
+    drift 항을 건너뜀.
+
+    Solver (CONFIG["SOLVER"]["IONFLOW"]):
+        "explicit" : 확산 + drift explicit Euler (기본)
+        "implicit" : 확산은 backward Euler (dt 별 사전 역행렬), drift 는 explicit
+                     — D·dt/dx² 제한 없이 안정, 농도 양수 유지
     """
 
+    ION_NAMES = ("Na", "K", "Ca", "Cl")
+
     def __init__(self, cfg: dict):
         self.N = cfg.get("N", 121)
         self.dx = cfg.get("dx", 1e-3)
@@ -1843,42 +2326,101 @@ class IonFlowDynamics:
         #   - 큰 값: drift 효과 증가 → 전기장 영향 강화, 불안정 가능
         self.mu_scale = 1e-9  # [PATCH] 이동도 스케일 (1e-8 → 1e-9, 장기 시뮬 안정성 강화)
 
-        # 4종 이온 초기화
-        self.ions = {
-            "Na": {"C": np.full(self.N, 15.0), "D": 1.33e-5, "z": +1},
-            "K":  {"C": np.full(self.N,140.0), "D": 1.96e-5, "z": +1},
-            "Ca": {"C": np.full(self.N, 0.0001), "D": 0.79e-5, "z": +2},
-            "Cl": {"C": np.full(self.N, 5.0), "D": 2.03e-5, "z": -1},
-        }
+        # 4종 이온 초기화 (행 순서 = ION_NAMES)
+        self.C = np.empty((4, self.N))
+        self.C[:] = np.array([15.0, 140.0, 0.0001, 5.0])[:, None]
+        self.D = np.array([1.33e-5, 1.96e-5, 0.79e-5, 2.03e-5])
+        self.z = np.array([+1, +1, +2, -1])
+        self.ions = {name: {"C": self.C[i], "D": float(self.D[i]), "z": int(self.z[i])}
+                     for i, name in enumerate(self.ION_NAMES)}
+
+        # 작업 버퍼 (라플라시안 양끝 0 고정)
+        self._lap = np.zeros((4, self.N))
+        self._drift = np.empty((4, self.N))
+        self._implicit = {}                    # dt → (I − dt·D·L)⁻¹ (4, N, N)
 
     def laplacian(self, arr):
-        """1D 중심차분 ∇²C"""
+        """1D 중심차분 ∇²C (마지막 축, 양끝 0)"""
         lap = np.zeros_like(arr)
-        lap[1:-1] = arr[:-2] - 2*arr[1:-1] + arr[2:]
+        lap[..., 1:-1] = arr[..., :-2] - 2*arr[..., 1:-1] + arr[..., 2:]
         return lap / (self.dx**2)
 
+    def _laplacian_into(self, C):
+        """self._lap[:, 1:-1] ← ∇²C (laplacian 과 같은 연산 순서, 할당 없음)"""
+        mid = self._lap[:, 1:-1]
+        np.multiply(C[:, 1:-1], 2, out=mid)
+        np.subtract(C[:, :-2], mid, out=mid)
+        np.add(mid, C[:, 2:], out=mid)
+        mid /= self.dx**2
+        return self._lap
+
+    def _drift_into(self):
+        """self._drift ← −μ·z·F·∇V·C, V 가 균일하면 None (drift = 0)"""
+        V = self.V
+        if (V == V[0]).all():
+            return None
+        dVdx = np.gradient(V, self.dx)
+        coef = -self.mu_scale * self.z * self.F
+        np.multiply(coef[:, None], dVdx, out=self._drift)
+        self._drift *= self.C
+        return self._drift
+
+    def _implicit_operator(self, dt):
+        """이온별 (I − dt·D_i·L)⁻¹, L 은 laplacian 과 같은 행렬 (양끝 행 0)"""
+        key = float(dt)
+        op = self._implicit.get(key)
+        if op is None:
+            N = self.N
+            L = np.zeros((N, N))
+            i = np.arange(1, N - 1)
+            L[i, i - 1] = L[i, i + 1] = 1.0 / self.dx**2
+            L[i, i] = -2.0 / self.dx**2
+            op = np.linalg.inv(np.eye(N) - dt * self.D[:, None, None] * L)
+            self._implicit[key] = op
+        return op
+
     def step(self, dt: float):
-        """한 스텝(dt[ms]) 이온 농도 업데이트"""
-        dVdx = np.gradient(self.V, self.dx)
-        for ion, d in self.ions.items():
-            D, z, C = d["D"], d["z"], d["C"]
-            diff = D * self.laplacian(C)
-            drift = -self.mu_scale * z * self.F * dVdx * C
-            C += dt * (diff + drift)
-            d["C"] = np.clip(C, 0.0, None)
+        """
+        한 스텝(dt[ms]) 이온 농도 업데이트
+
+        Returns
+        -------
+        dict : 이온 → 이번 스텝 농도 (N,) 복사본 (이후 스텝에 바뀌지 않음)
+        """
+        C = self.C
+        drift = self._drift_into()
+        if CONFIG["SOLVER"].get("IONFLOW", "explicit") == "implicit":
+            # (I − dt·D·L) C⁺ = C + dt·drift
+            rhs = self._drift
+            if drift is not None:
+                rhs *= dt
+                rhs += C
+            else:
+                np.copyto(rhs, C)
+            np.einsum("inm,im->in", self._implicit_operator(dt), rhs, out=C)
+        else:
+            upd = self._laplacian_into(C)
+            upd *= self.D[:, None]
+            if drift is not None:
+                upd += drift
+            upd *= dt
+            C += upd
+            self._lap[:, 0] = self._lap[:, -1] = 0.0
+        np.maximum(C, 0.0, out=C)
 
         # 전하 중립 보정
-        total_q = sum(d["z"]*np.sum(d["C"]) for d in self.ions.values())
+        total_q = float(self.z @ C.sum(axis=1))
         if abs(total_q) > 1e-3:
-            corr = -total_q / (self.N * len(self.ions))
-            for ion, d in self.ions.items():
-                d["C"] += corr * np.sign(d["z"])
-                # [PATCH] 전하 중립 보정 후 추가 클램프
-                # 기능: 전하 중립 보정으로 인해 음수 농도가 발생할 수 있으므로 0 이상으로 제한
-                # 효과: 이온 농도가 음수가 되는 것을 방지하여 안정성 향상
-                d["C"] = np.clip(d["C"], 0.0, None)  # ← 추가 클램프
+            corr = -total_q / (self.N * len(self.ION_NAMES))
+            C += (corr * np.sign(self.z))[:, None]
+            # [PATCH] 전하 중립 보정 후 추가 클램프
+            # 기능: 전하 중립 보정으로 인해 음수 농도가 발생할 수 있으므로 0 이상으로 제한
+            # 효과: 이온 농도가 음수가 되는 것을 방지하여 안정성 향상
+            np.maximum(C, 0.0, out=C)  # ← 추가 클램프
 
-        return {ion: d["C"] for ion, d in self.ions.items()}
+        # 반환값은 스텝마다 새 배열 (self.C / ions[...]["C"] 는 다음 스텝에 덮어씀)
+        out = C.copy()
+        return {ion: out[i] for i, ion in enumerate(self.ION_NAMES)}
 
 # =============================================================
 # 5.myelinated_axon.py — 물리적 도약전도 (Saltatory Conduction)
@@ -1890,8 +2432,116 @@ class IonFlowDynamics:
 #   - 노드에서만 빠른 Na⁺ 채널이 활성화되어 도약 전위 형성
 #   - 시간 감쇠(Lambda), 에너지 감쇠(gamma_extra), α-펄스 자극까지 통합
 
+import bisect
+import math
 import numpy as np
 
+try:
+    from scipy.linalg import solve_banded as _solve_banded
+except ImportError:
+    # scipy 미설치 시 numpy dense solve 로 대체 (결과 동일, N² 메모리·느림)
+    _solve_banded = None
+
+
+def _cable_bands(D_x, Cm_x, gL_x, dx, EL, Vrest, gamma, c_t):
+    """
+    A = c_t·D(x)∂²/∂x² − gL/Cm − γ (Neumann) 의 삼중대각 띠와 상수항 b
+
+    D_x 등이 (..., N) 이면 축삭별로 쌓인 띠를 반환
+
+    Returns
+    -------
+    sub : (..., N-1)   A[i, i-1] (i = 1..N-1)
+    diag : (..., N)    A[i, i]
+    sup : (..., N-1)   A[i, i+1] (i = 0..N-2)
+    b : (..., N)
+    """
+    r = c_t * D_x / dx ** 2
+    diag = -2.0 * r - gL_x / Cm_x - gamma
+    sub = r[..., 1:].copy()
+    sub[..., -1] *= 2.0                       # Neumann: ghost node 대칭
+    sup = r[..., :-1].copy()
+    sup[..., 0] *= 2.0
+    return sub, diag, sup, gL_x * EL / Cm_x + gamma * Vrest
+
+
+def _tridiag_matvec(sub, diag, sup, x):
+    """삼중대각 행렬 · x (마지막 축)"""
+    y = diag * x
+    y[..., :-1] += sup * x[..., 1:]
+    y[..., 1:] += sub * x[..., :-1]
+    return y
+
+
+def _tridiag_solve(sub, diag, sup, rhs):
+    """
+    삼중대각 선형계 풀이 (마지막 축)
+
+    LAPACK 띠 solver (scipy.linalg.solve_banded). (A, N) 배치는 축삭들을 결합 0 으로
+    이어 붙인 길이 A·N 의 삼중대각 한 개로 풀이 (호출 한 번, O(A·N)).
+    scipy 가 없으면 1-D 는 dense solve, 배치는 축삭 축으로 벡터화한 Thomas 알고리즘
+    (대각 우세 가정 — θ-scheme 의 I − θ·dt·A 는 항상 대각 우세)
+    """
+    shape = rhs.shape
+    N = shape[-1]
+    if _solve_banded is not None:
+        ab = np.zeros(shape[:-1] + (3, N))
+        ab[..., 0, 1:] = sup
+        ab[..., 1, :] = diag
+        ab[..., 2, :-1] = sub                 # 축삭 경계 (ab[2, N-1]) 는 0 으로 끊김
+        ab = np.moveaxis(ab, -2, 0).reshape(3, -1)
+        x = _solve_banded((1, 1), ab, rhs.reshape(-1), overwrite_ab=True, check_finite=False)
+        return x.reshape(shape)
+    if rhs.ndim == 1:
+        M = np.diag(diag) + np.diag(sup, 1) + np.diag(sub, -1)
+        return np.linalg.solve(M, rhs)
+    c = np.empty_like(rhs)
+    d = np.empty_like(rhs)
+    c[..., 0] = sup[..., 0] / diag[..., 0]
+    d[..., 0] = rhs[..., 0] / diag[..., 0]
+    for i in range(1, N):
+        w = diag[..., i] - sub[..., i - 1] * c[..., i - 1]
+        if i < N - 1:
+            c[..., i] = sup[..., i] / w
+        d[..., i] = (rhs[..., i] - sub[..., i - 1] * d[..., i - 1]) / w
+    x = d
+    for i in range(N - 2, -1, -1):
+        x[..., i] -= c[..., i] * x[..., i + 1]
+    return x
+
+
+def _cable_operator(D_x, Cm_x, gL_x, dx, EL, Vrest, gamma, dt, c_t, theta, node_idx):
+    """
+    축삭 확산·누설·γ 감쇠의 θ-scheme 분해 (Crank–Nicolson: θ=0.5)
+
+        dV/dt = A·V + b,  A = c_t·D(x)∂²/∂x² − gL/Cm − γ  (Neumann)
+        M = I − θ·dt·A,   V⁺ = M⁻¹[(I + (1−θ)·dt·A)·V + dt·b]
+
+    N ≈ 121 이면 dense 전파 행렬의 matvec 한 번이 Python Thomas sweep 보다 빠름
+
+    Returns
+    -------
+    P : ndarray (N, N)     M⁻¹(I + (1−θ)dt·A)
+    q : ndarray (N,)       M⁻¹·dt·b
+    MU : ndarray (N, K)    M⁻¹ 의 노드 열 (노드 대각 항 Woodbury 보정용)
+    C : ndarray (K, K)     MU 의 노드 행
+    """
+    N = D_x.size
+    r = c_t * D_x / dx ** 2
+    i = np.arange(N)
+    A = np.zeros((N, N))
+    A[i, i] = -2.0 * r - gL_x / Cm_x - gamma
+    A[i[1:-1], i[:-2]] = r[1:-1]
+    A[i[1:-1], i[2:]] = r[1:-1]
+    A[0, 1] = 2.0 * r[0]                      # Neumann: ∂V/∂x = 0 (ghost node 대칭)
+    A[-1, -2] = 2.0 * r[-1]
+    b = gL_x * EL / Cm_x + gamma * Vrest
+    M_inv = np.linalg.inv(np.eye(N) - theta * dt * A)
+    P = M_inv @ (np.eye(N) + (1.0 - theta) * dt * A)
+    MU = np.ascontiguousarray(M_inv[:, node_idx])
+    return P, M_inv @ (dt * b), MU, MU[node_idx]
+
+
 class MyelinatedAxon:
     r"""
     MyelinatedAxon — Saltatory Conduction Model
@@ -1904,6 +2554,12 @@ class MyelinatedAxon:
         I_Na_node = g_Na_node·m³·h·(E_Na_node - V)
         ḿ = (m_inf(V) - m)/τ_m
         ḣ = (h_inf(V) - h)/τ_h
+
+    Solver (CONFIG["SOLVER"]["AXON"]):
+        "cfl_euler" : CFL 서브스텝 explicit Euler (기본)
+        "cn"        : dt_elec 당 1 스텝 — 게이트 지수 적분 후 확산·누설·노드
+                      전류를 삼중대각 Crank–Nicolson 으로 처리
+                      (dt_elec ≤ cn_dt_max = 0.025 ms, _step_cn 참고)
     """
 
     # ---------------------------------------------------------
@@ -1981,7 +2637,24 @@ class MyelinatedAxon:
             self.alpha_I0 = 0.0
             self.alpha_tr = 0.5
             self.alpha_td = 3.0
-        self.alpha_ts = []  # spike timestamps (ms)
+
+        # α-펄스 재귀 상태: t_alpha 기준 Σ_k e^(−(t−t_k)/τ_d), Σ_k e^(−(t−t_k)/τ_r)
+        # (spike 목록 없이 스텝당 O(1), 질의 시각보다 늦은 spike 만 잠시 대기)
+        self.alpha_d = 0.0
+        self.alpha_r = 0.0
+        self.alpha_t = 0.0
+        self.alpha_pending = []
+
+        # 구간별 D/Cm/gL 분포 (서브스텝마다 np.full 하지 않도록 한 번만 생성)
+        self.D_x = np.where(self.IS_NODE, self.D_node, self.D_internode)
+        self.Cm_x = np.where(self.IS_NODE, self.Cm_node, self.Cm_myelin)
+        self.gL_x = np.where(self.IS_NODE, self.gL_node, self.gL_myelin)
+        self.node_idx = np.flatnonzero(self.IS_NODE)
+
+        # Crank–Nicolson: θ (0.5 = CN, 1.0 = backward Euler), 삼중대각 띠 캐시
+        self.cn_theta = cfg.get("cn_theta", 0.5)
+        self.cn_dt_max = cfg.get("cn_dt_max", 0.025)
+        self._cn = None
 
     # ---------------------------------------------------------
     # Sigmoid 및 게이트 평형함수
@@ -2033,47 +2706,70 @@ class MyelinatedAxon:
     # ---------------------------------------------------------
     # 노드 Na 전류
     # ---------------------------------------------------------
+    def _node_gNa_eff(self):
+        """
+        ATP-dependent Na+ conductance modulation
+        ATP 수준에 따라 Na+ 전도도를 조정 (ATP가 높을수록 전도도 증가)
+        """
+        A = getattr(self, "ATP_level", None)
+        if A is None:
+            return self.node_gNa
+        A0 = 100.0        # baseline ATP (tune as needed)
+        dA = 50.0         # ATP scaling range
+        lambda_A = 0.25   # modulation gain
+        return self.node_gNa * (1.0 + lambda_A * np.tanh((A - A0) / dA))
+
     def _node_Na_current(self):
         """
         ATP-dependent Na+ conductance modulation
         ATP 수준에 따라 Na+ 채널 전도도를 동적으로 조정합니다.
         """
         INa = np.zeros(self.N)
-        idx = np.where(self.IS_NODE)[0]
+        idx = self.node_idx
         if idx.size:
             m3h = (self.m_node[idx] ** 3) * self.h_node[idx]
-            
-            # --- PATCH: ATP-dependent Na conductance modulation ---
-            # ATP 수준에 따라 Na+ 전도도를 조정 (ATP가 높을수록 전도도 증가)
-            A = getattr(self, "ATP_level", None)
-            if A is not None:
-                A0 = 100.0        # baseline ATP (tune as needed)
-                dA = 50.0         # ATP scaling range
-                lambda_A = 0.25   # modulation gain
-                gNa_eff = self.node_gNa * (1.0 + lambda_A * np.tanh((A - A0) / dA))
-            else:
-                gNa_eff = self.node_gNa
-            
-            INa[idx] = gNa_eff * m3h * (self.node_ENa - self.V[idx])
+            INa[idx] = self._node_gNa_eff() * m3h * (self.node_ENa - self.V[idx])
         return INa
 
     # ---------------------------------------------------------
     # α-펄스 커널
     # ---------------------------------------------------------
     def trigger_alpha(self, t_ms: float):
-        """소마 스파이크 발생 시 호출"""
-        self.alpha_ts.append(float(t_ms))
+        """소마 스파이크 발생 시 호출 (재귀 상태에 합류, 마지막 질의보다 늦으면 대기)"""
+        t0 = float(t_ms)
+        if t0 <= self.alpha_t:
+            self.alpha_d += math.exp(-(self.alpha_t - t0) / self.alpha_td)
+            self.alpha_r += math.exp(-(self.alpha_t - t0) / self.alpha_tr)
+        else:
+            bisect.insort(self.alpha_pending, t0)
+
+    def _alpha_advance(self, t_ms):
+        """재귀 상태를 t_ms 로 감쇠 (앞으로만)"""
+        dt = t_ms - self.alpha_t
+        if dt > 0.0:
+            self.alpha_d *= math.exp(-dt / self.alpha_td)
+            self.alpha_r *= math.exp(-dt / self.alpha_tr)
+            self.alpha_t = t_ms
 
     def _alpha_kernel(self, t_ms: float):
-        """I_α(t) = I₀[exp(−(t−t₀)/τ_d) − exp(−(t−t₀)/τ_r)]₊"""
-        if self.alpha_I0 == 0.0 or not self.alpha_ts:
+        """
+        I_α(t) = I₀[Σ_k exp(−(t−t_k)/τ_d) − exp(−(t−t_k)/τ_r)]₊
+
+        두 지수합을 재귀로 유지 → spike 수와 무관하게 O(1), kernel 합과 같은 값
+        (t_k = t 항은 0 이므로 포함해도 같음). 질의 시각이 거꾸로 가면 그 사이
+        spike 를 뺄 수 없어 근사가 됨 (run_pipeline/실험 루프는 단조 증가)
+        """
+        if self.alpha_I0 == 0.0:
             return 0.0
-        val = 0.0
-        for t0 in self.alpha_ts:
-            dt = t_ms - t0
-            if dt <= 0.0:
-                continue
-            val += (np.exp(-dt / self.alpha_td) - np.exp(-dt / self.alpha_tr))
+        while self.alpha_pending and self.alpha_pending[0] <= t_ms:
+            t0 = self.alpha_pending.pop(0)
+            self._alpha_advance(t0)
+            self.alpha_d += 1.0
+            self.alpha_r += 1.0
+        self._alpha_advance(t_ms)
+        back = self.alpha_t - t_ms             # 거꾸로 질의 (보통 0)
+        val = (self.alpha_d * math.exp(back / self.alpha_td)
+               - self.alpha_r * math.exp(back / self.alpha_tr))
         return max(0.0, val) * self.alpha_I0
 
     # ---------------------------------------------------------
@@ -2089,22 +2785,19 @@ class MyelinatedAxon:
     # ---------------------------------------------------------
     def step(self, dt_elec: float, t_ms: float, I0_from_soma: float, soma_V: float):
         """한 시점에서의 축삭 전도 계산"""
+        if CONFIG["SOLVER"]["AXON"] == "cn":
+            self._step_cn(dt_elec, t_ms, I0_from_soma, soma_V)
+            return
+
         # CFL 기반 서브스텝 분할
         dt_cfl = self._calc_dt_cfl()
         n_sub = max(1, int(np.ceil(dt_elec / max(1e-12, dt_cfl))))
         dt_sub = dt_elec / n_sub
+        D, Cm, gL = self.D_x, self.Cm_x, self.gL_x
 
         for _ in range(n_sub):
             self._update_node_gates(dt_sub)
 
-            # 구간별 파라미터 분포
-            D = np.full(self.N, self.D_internode)
-            D[self.IS_NODE] = self.D_node
-            Cm = np.full(self.N, self.Cm_myelin)
-            Cm[self.IS_NODE] = self.Cm_node
-            gL = np.full(self.N, self.gL_myelin)
-            gL[self.IS_NODE] = self.gL_node
-
             # 외부 자극 (소마 결합)
             I_ext = np.zeros(self.N)
             I_ext[0] = I0_from_soma + self.coupling * (soma_V - self.V[0])
@@ -2139,6 +2832,68 @@ class MyelinatedAxon:
             # 노드 통과 시간 기록
             self._record_crossings(t_ms)
 
+    # ---------------------------------------------------------
+    # Crank–Nicolson 스텝 (operator splitting)
+    # ---------------------------------------------------------
+    def _cn_bands(self, c_t):
+        """확산·누설·γ 감쇠의 삼중대각 띠 (c_t 가 같으면 재사용, _cable_bands)"""
+        key = (float(c_t), self.gamma_extra)
+        if self._cn is None or self._cn[0] != key:
+            self._cn = (key,) + _cable_bands(
+                self.D_x, self.Cm_x, self.gL_x, self.dx, self.EL, self.Vrest,
+                self.gamma_extra, c_t)
+        return self._cn[1:]
+
+    def _step_cn(self, dt, t_ms, I0_from_soma, soma_V):
+        """
+        dt_elec 당 1 스텝 (CFL 무관하게 안정 — 정확도는 dt 에 의존, 아래 표)
+
+        1) 노드 Na 게이트: V 고정 지수 이완 (Rush–Larsen, operator splitting)
+        2) 게이트 고정 시 노드 전류 (Na + 소마 결합 + α) 는 V 에 선형
+               I_node = J − G·V,  G = gNa·m³h (+ coupling),  J = G·E_Na (+ ...)
+           → 확산·누설과 같은 θ-scheme 에 넣어 함께 implicit 하게 풂
+               Ã = A − diag(G/Cm)[노드]
+               (I − θ·dt·Ã) V⁺ = (I + (1−θ)·dt·Ã) V + dt·(b + J/Cm[노드])
+        3) 좌변은 삼중대각 → 스텝마다 O(N) 띠 solve (c_t = c0·e^(−Λt) 가 매
+           스텝 바뀌어도 재분해 비용 없음)
+
+        정확도 (CONFIG 기본값, θ=0.5, cfl_euler 대비):
+            dt_elec=0.02 : velocity_last ≤ 5%, first_cross_ms ≤ 0.4 ms
+                           (ATP 60: 0.7 ms), run_pipeline(60) TOF 25.34 → 26.02 ms
+            dt_elec=0.025: velocity ≤ 6%, first_cross_ms ≤ 0.5 ms (ATP 60: 0.9 ms)
+            dt_elec=0.03 : velocity ≤ 8%, first_cross_ms ≤ 1.3 ms (ATP 60)
+            dt_elec=0.05 : velocity 9%, ATP 60 에서 50% / first_cross 15 ms
+        노드 Na 게이트 분할 오차가 dt 에 따라 빠르게 커지므로 dt > cn_dt_max
+        (cfg, 기본 0.025 ms) 이면 ValueError — 큰 dt 는 cfl_euler 사용.
+        """
+        if dt > self.cn_dt_max:
+            raise ValueError(f"cn axon solver validated for dt_elec <= {self.cn_dt_max} ms "
+                             f"(got {dt}); use cfl_euler or raise cfg['cn_dt_max']")
+        idx = self.node_idx
+        Vi = self.V[idx]
+        m_inf = self._node_m_inf(Vi)
+        h_inf = self._node_h_inf(Vi)
+        m = m_inf + (self.m_node[idx] - m_inf) * np.exp(-dt / self.m_tau)
+        h = h_inf + (self.h_node[idx] - h_inf) * np.exp(-dt / self.h_tau)
+        self.m_node[idx] = m
+        self.h_node[idx] = h
+
+        G = self._node_gNa_eff() * m ** 3 * h
+        J = G * self.node_ENa
+        G[0] += self.coupling                 # 노드 0 = 소마 결합 지점
+        J[0] += self.coupling * soma_V + I0_from_soma + self._alpha_kernel(t_ms)
+
+        c_t = self.c0 * np.exp(-self.Lambda * t_ms)
+        sub, diag, sup, b = self._cn_bands(c_t)
+        th, Cm = self.cn_theta, self.Cm_x[idx]
+        diag = diag.copy()
+        diag[idx] -= G / Cm
+        rhs = self.V + (1.0 - th) * dt * _tridiag_matvec(sub, diag, sup, self.V) + dt * b
+        rhs[idx] += dt * J / Cm
+        V = _tridiag_solve(-th * dt * sub, 1.0 - th * dt * diag, -th * dt * sup, rhs)
+        self.V = np.clip(V, -90.0, 50.0)
+        self._record_crossings(t_ms)
+
     # ---------------------------------------------------------
     # 도약전도 속도 계산
     # ---------------------------------------------------------
@@ -2196,6 +2951,10 @@ class CaVesicle:
     이산 적분 (dt_ms[ms]):
         Ca_{n+1} = Ca_n + (dCa/dt)·(dt_ms/1000)
 
+    유입 Σ_k A·α(t − t_k) 은 두 지수합 d = Σ e^{−(t−t_k)/τ_d}, r = Σ e^{−(t−t_k)/τ_r}
+    을 재귀로 감쇠시켜 A·(d − r)_+ 로 계산 (τ_d > τ_r 이면 항마다 α ≥ 0 이라
+    kernel 합과 같음). max_spike_memory_ms 밖으로 나간 spike 는 그때 빼 줌.
+
     정규화:
         S = (Ca − C0) / (Cmax − C0)
 
@@ -2228,15 +2987,29 @@ class CaVesicle:
         # --- 상태 변수 ---
         self.t_ms: float = 0.0
         self.Ca: float = float(self.C0)
-        self.spike_times: List[float] = []     # [ms]
+        self.spike_times: List[float] = []     # [ms] 메모리 창 안, 시각순
         self.events: List[VesicleEvent] = []
 
+        # 유입 재귀 상태: _inf_t 기준 Σ e^{−(t−t_k)/τ_d}, Σ e^{−(t−t_k)/τ_r}
+        # (spike_times 앞 _n_folded 개가 합류, 나머지는 아직 _inf_t 이후)
+        self._inf_d: float = 0.0
+        self._inf_r: float = 0.0
+        self._inf_t: float = 0.0
+        self._n_folded: int = 0
+
     # ------------------------------
     # 외부 API
     # ------------------------------
     def add_spike(self, t_ms: float) -> None:
         """스파이크 시각 등록(단위: ms)."""
-        self.spike_times.append(float(t_ms))
+        t0 = float(t_ms)
+        if self.spike_times and t0 < self.spike_times[-1]:
+            bisect.insort(self.spike_times, t0)
+        else:
+            self.spike_times.append(t0)
+        if t0 <= self._inf_t:
+            # 마지막 질의 이전 시각 → 바로 합류 (대기 spike 는 모두 _inf_t 이후라 순서 유지)
+            self._fold(t0)
 
     def add_spike_now(self) -> None:
         """현재 시각(self.t_ms)에 스파이크 등록."""
@@ -2252,6 +3025,8 @@ class CaVesicle:
         self.Ca = float(self.C0 if Ca is None else Ca)
         self.spike_times.clear()
         self.events.clear()
+        self._inf_d = self._inf_r = self._inf_t = 0.0
+        self._n_folded = 0
 
     # ------------------------------
     # 내부 커널/헬퍼
@@ -2268,13 +3043,53 @@ class CaVesicle:
         return float(max(0.0, val))
 
     def _trim_spike_memory(self) -> None:
-        """메모리 윈도우 바깥 스파이크 제거."""
+        """메모리 윈도우 바깥 스파이크 제거 (합류된 것은 유입 합에서 뺌)."""
         if not self.spike_times:
             return
         cutoff = self.t_ms - self.max_spike_memory_ms
-        if cutoff <= 0.0:
+        if cutoff <= 0.0 or self.spike_times[0] >= cutoff:
             return
-        self.spike_times = [s for s in self.spike_times if s >= cutoff]
+        n = bisect.bisect_left(self.spike_times, cutoff)
+        for ts in self.spike_times[:min(n, self._n_folded)]:
+            self._inf_d -= math.exp(-(self._inf_t - ts) / (1000.0 * self.tau_d_s))
+            self._inf_r -= math.exp(-(self._inf_t - ts) / (1000.0 * self.tau_r_s))
+        self._n_folded = max(0, self._n_folded - n)
+        del self.spike_times[:n]
+        if not self._n_folded:
+            self._inf_d = self._inf_r = 0.0     # 뺄셈 반올림 잔여 제거
+
+    def _fold(self, ts: float) -> None:
+        """spike ts 를 유입 재귀 상태에 합류"""
+        if ts > self._inf_t:
+            self._advance_influx(ts)
+        self._inf_d += math.exp(-(self._inf_t - ts) / (1000.0 * self.tau_d_s))
+        self._inf_r += math.exp(-(self._inf_t - ts) / (1000.0 * self.tau_r_s))
+        self._n_folded += 1
+
+    def _advance_influx(self, t_ms: float) -> None:
+        """유입 재귀 상태를 t_ms 로 감쇠 (앞으로만)"""
+        dt = t_ms - self._inf_t
+        if dt > 0.0:
+            self._inf_d *= math.exp(-dt / (1000.0 * self.tau_d_s))
+            self._inf_r *= math.exp(-dt / (1000.0 * self.tau_r_s))
+            self._inf_t = t_ms
+
+    def _influx(self, t_ms: float) -> float:
+        """
+        Σ_k A·α(t − t_k) (메모리 창 안 spike) — 재귀, 스텝당 O(1)
+
+        t_ms 이전 spike 를 합류시키고 상태를 t_ms 로 감쇠. 질의 시각이 거꾸로
+        가면 합류된 spike 를 빼지 않고 감쇠만 되돌림 (run_pipeline 은 단조 증가).
+        """
+        spikes = self.spike_times
+        t_fold = max(t_ms, self._inf_t)
+        while self._n_folded < len(spikes) and spikes[self._n_folded] <= t_fold:
+            self._fold(spikes[self._n_folded])
+        self._advance_influx(t_ms)
+        back = self._inf_t - t_ms
+        val = (self._inf_d * math.exp(back / (1000.0 * self.tau_d_s))
+               - self._inf_r * math.exp(back / (1000.0 * self.tau_r_s)))
+        return self.A * max(0.0, val)
 
     # ------------------------------
     # 메인 스텝
@@ -2282,7 +3097,7 @@ class CaVesicle:
     def step(self, ATP: float):
         """
         한 스텝(dt_ms) 진행:
-          • α-커널 합으로 유입 계산
+          • α-커널 합으로 유입 계산 (재귀 지수합, spike 수와 무관)
           • ATP-의존 펌프로 Ca 제거
           • Ca, S, status 업데이트 및 이벤트 로깅
 
@@ -2306,10 +3121,7 @@ class CaVesicle:
         self._trim_spike_memory()
 
         # α-커널 유입 합
-        influx = 0.0
-        if self.spike_times:
-            for ts in self.spike_times:
-                influx += self.A * self._alpha_kernel(self.t_ms - ts)
+        influx = self._influx(self.t_ms)
 
         # 펌프(ATP 의존 제거) — (Ca − C0)에 비례
         pump = self.k_c * float(ATP) * max(0.0, (self.Ca - self.C0))
@@ -2826,6 +3638,15 @@ class SynapseCore:
 
         α-kernel:
         α(dt) = (dt/τ) * exp(1 - dt/τ)   , dt > 0
+
+    4) kernel="recursive" (O(1) 갱신 모드)
+        α-kernel 합을 두 상태변수 (A, B)로 표현 (기준시각 t₀):
+            A = Σ Q·e^{-(t₀-t_a)/τ},   B = Σ Q·(t₀-t_a)·e^{-(t₀-t_a)/τ}
+            I_syn(t) = (B + s·A)/τ · exp(1 - s/τ),   s = t - t₀
+        도착(t_a = t_s + delay) 전 이벤트는 pending 큐(FIFO)에서 대기.
+        → 스텝당 비용이 발화율과 무관 (exp 1회)
+        ※ "sum" 모드는 새 spike가 올 때 5τ 이전 spike를 버리지만(kernel 절단),
+          "recursive" 모드는 절단 없는 정확한 α-kernel 합을 계산
         
     사용 예시
     ----------
@@ -2859,7 +3680,8 @@ class SynapseCore:
                  k_PTP=0.4,
                  k_ATP=0.2,
                  k_phi=0.3,
-                 p_eff_floor=0.0):  # ✅ recall memory floor 추가!
+                 p_eff_floor=0.0,  # ✅ recall memory floor 추가!
+                 kernel="sum"):
         """
         Parameters
         ----------
@@ -2884,7 +3706,12 @@ class SynapseCore:
             Phase difference (Δφ) weight for release probability
         p_eff_floor : float
             Minimum p_eff value (recall memory protection, default 0.0)
+        kernel : {"sum", "recursive"}
+            EPSC 계산 방식. "sum": 기억된 spike마다 α-kernel 합산 (기존),
+            "recursive": 2-변수 선형 필터로 O(1) 갱신
         """
+        if kernel not in ("sum", "recursive"):
+            raise ValueError(f"unknown kernel mode: {kernel!r}")
 
         # 연결된 뉴런
         self.pre = pre_neuron
@@ -2905,8 +3732,29 @@ class SynapseCore:
         self.p_eff_floor = float(p_eff_floor)
 
         # 내부 상태
-        self.spikes = []     # [(t_spike_ms, Q)]
+        self.kernel = kernel
+        self.spikes = []     # [(t_spike_ms, Q)]  ("sum" 모드)
+        self.I_syn = 0.0
+        self._last_Q = 0.0
+
+        # "recursive" 모드 상태: 기준시각 t₀ 에서의 (A, B) + 도착 대기 큐
+        self._pending = deque()   # [(t_arrival_ms, Q)]
+        self._A = 0.0
+        self._B = 0.0
+        self._t0 = 0.0
+
+    # ------------------------------------------------------------
+    # 0) 상태 초기화
+    # ------------------------------------------------------------
+    def reset(self):
+        """기억된 spike/필터 상태와 I_syn 초기화 (가중치 등 파라미터는 유지)"""
+        self.spikes = []
         self.I_syn = 0.0
+        self._last_Q = 0.0
+        self._pending.clear()
+        self._A = 0.0
+        self._B = 0.0
+        self._t0 = 0.0
 
     # ------------------------------------------------------------
     # 1) Pre neuron spike 수신
@@ -2955,6 +3803,12 @@ class SynapseCore:
         Q = self.Q_max * p_eff
 
         # 3. 스파이크 이벤트 기록
+        self._last_Q = Q
+        if self.kernel == "recursive":
+            # 도착 시각 순서 = 발화 순서 (delay 고정) → FIFO
+            self._pending.append((float(t_ms) + self.delay, Q))
+            return Q
+
         self.spikes.append((float(t_ms), Q))
 
         # 오래된 스파이크 제거 (5*tau 이후)
@@ -2993,7 +3847,10 @@ class SynapseCore:
         - α-kernel은 생리학적 EPSC 파형을 근사
         - peak는 dt = τ에서 발생 (peak value = 1/e ≈ 0.368)
         - 다중 스파이크는 선형 중첩(linear superposition)
+        - kernel="recursive": _compute_I_recursive() 사용 (O(1))
         """
+        if self.kernel == "recursive":
+            return self._compute_I_recursive(t_ms)
 
         I_total = 0.0
         tau = self.tau
@@ -3011,6 +3868,42 @@ class SynapseCore:
         self.I_syn = I_total
         return I_total
 
+    def _compute_I_recursive(self, t_ms):
+        """
+        2-변수 α-필터 평가 (kernel="recursive")
+
+        도착한 이벤트(t_a < t)를 기준시각 t₀ 로 흡수:
+            d = exp(-(t_a - t₀)/τ)
+            B ← (B + (t_a - t₀)·A)·d,   A ← A·d + Q,   t₀ ← t_a
+        평가:
+            I(t) = (B + s·A)/τ · exp(1 - s/τ),   s = t - t₀ > 0
+
+        Notes
+        -----
+        - 같은 t로 반복 호출해도 같은 값 (실험의 세척 루프와 동일 동작)
+        - reset() 없이 시간이 되돌아가면(s ≤ 0) 0을 반환
+        """
+        tau = self.tau
+        pending = self._pending
+        while pending and pending[0][0] < t_ms:
+            t_a, Q = pending.popleft()
+            lag = t_a - self._t0
+            if self._A != 0.0 or self._B != 0.0:
+                d = math.exp(-lag / tau)
+                self._B = (self._B + lag * self._A) * d
+                self._A = self._A * d
+            self._A += Q
+            self._t0 = t_a
+
+        s = t_ms - self._t0
+        if s <= 0.0 or (self._A == 0.0 and self._B == 0.0):
+            I_total = 0.0
+        else:
+            I_total = (self._B + s * self._A) / tau * math.exp(1.0 - s / tau)
+
+        self.I_syn = I_total
+        return I_total
+
     # ------------------------------------------------------------
     # 3) post 뉴런에 전류 전달
     # ------------------------------------------------------------
@@ -3048,7 +3941,7 @@ class SynapseCore:
         Returns
         -------
         dict
-            n_spikes : int, 현재 활성 스파이크 개수
+            n_spikes : int, 현재 활성 스파이크 개수 ("recursive": 도착 대기 개수)
             last_Q : float, 마지막 방출량
             I_syn : float, 현재 post-synaptic current
             delay : float, 축삭 delay (ms)
@@ -3057,8 +3950,8 @@ class SynapseCore:
             k_Ca, k_PTP, k_ATP, k_phi : float, 가중치 파라미터들
         """
         return {
-            "n_spikes": len(self.spikes),
-            "last_Q": self.spikes[-1][1] if self.spikes else 0.0,
+            "n_spikes": len(self._pending) if self.kernel == "recursive" else len(self.spikes),
+            "last_Q": self._last_Q,
             "I_syn": self.I_syn,
             "delay": self.delay,
             "tau": self.tau,
@@ -3835,14 +4728,14 @@ def run_pipeline(T_ms: float | None = None):
             # Heun 방법 사용 (predictor-corrector)
             # predictor: Euler step으로 예측
             Ca0 = ca.Ca
-            influx0 = sum(ca.A * ca._alpha_kernel(ca.t_ms + ca.dt_ms - ts) for ts in ca.spike_times)
+            influx0 = ca._influx(ca.t_ms + ca.dt_ms)
             pump0 = ca.k_c * float(mito.ATP) * max(0.0, (Ca0 - ca.C0))
             dCa0 = (influx0 - pump0)
             Ca_pred = Ca0 + dCa0 * (ca.dt_ms / 1000.0)
             
             # corrector: 예측값을 사용해서 기울기 재계산 후 평균
-            # [PATCH] influx1 재계산 (정확도 향상)
-            influx1 = sum(ca.A * ca._alpha_kernel(ca.t_ms + ca.dt_ms - ts) for ts in ca.spike_times)
+            # 유입은 Ca 와 무관하고 같은 시각 (t + dt) 이므로 predictor 값 재사용
+            influx1 = influx0
             pump1 = ca.k_c * float(mito.ATP) * max(0.0, (Ca_pred - ca.C0))
             dCa1 = (influx1 - pump1)
             ca.Ca = Ca0 + 0.5*(dCa0 + dCa1) * (ca.dt_ms / 1000.0)
@@ -4383,6 +5276,3516 @@ def run_pipeline_patched(T_ms: float | None = None):
         print(f"Terminal logs saved: logs/terminal_patched.csv")
     sys.stdout.flush()
 
+# =============================================================
+# 14. synapse_matrix.py — Sparse Synapse Matrix (Vectorized SynapseCore)
+# =============================================================
+# 목적:
+#   • SynapseCore/STDPSynapse E개를 압축 희소(CSR) 배열로 묶어 일괄 처리
+#   • 실험 코드의 O(E) 파이썬 루프 제거:
+#       sum(syn.I_syn for syn in neuron.incoming_synapses)  → 1회 sparse matvec
+#       for s in total_synapses: s.deliver(t)              → 1회 벡터 평가
+#
+# 저장 구조 (edge 배열, pre 기준 정렬 = CSR):
+#   pre, post            : 연결 인덱스 (indptr[i]:indptr[i+1] = pre i 의 edge)
+#   weight, delay, Q_max : edge별 파라미터
+#   tau                  : edge별 α-kernel 시정수
+#   A, B, t0             : α-필터 상태 (SynapseCore kernel="recursive"와 동일)
+#   pending              : 도착 대기 이벤트 heap [(t_arrival, seq, edges, Q)]
+#
+# 방출 공식 (SynapseCore와 동일, R에 weight 적용 = STDPSynapse 관례):
+#   p_eff = k_Ca·Ca + k_PTP·(R·w) + k_ATP·(ATP-100)·0.01 + k_phi·Δφ
+#   p_eff = clamp(p_eff, p_eff_floor, 1),   Q = Q_max·p_eff
+#   release_power=p 이면 R·w 대신 R·w·(w/w_ref)^p  (hippo_dream_final: p=3, w_ref=50)
+# =============================================================
+
+import heapq
+import json
+
+
+class SynapseMatrix:
+    """
+    PHAM SynapseMatrix — CSR 희소 시냅스 행렬
+    -----------------------------------------------------------
+    • pre/post 인덱스, weight, delay, Q_max, τ 를 edge 배열로 보관
+    • on_pre_spike(spike 벡터) → 해당 pre의 모든 edge 방출량 Q 일괄 계산
+    • compute_I(t) → edge 전류 → post 뉴런별 전류 벡터 (sparse matvec)
+    • EPSC는 SynapseCore kernel="recursive"와 같은 2-변수 α-필터
+    • batch=B 이면 같은 연결 구조의 독립 네트워크 B개를 (B, E) 배열로 동시 처리
+    -----------------------------------------------------------
+
+    사용 예시
+    ----------
+    >>> pop = HHSomaQuickPopulation(CONFIG["HH"], 52)
+    >>> W = SynapseMatrix(52, 52, pre=[4, 5], post=[38, 39], delay_ms=2.0, Q_max=50.0, tau_ms=2.0)
+    >>> spikes = pop.step(dt, I)
+    >>> W.on_pre_spike(t, spikes, Ca=S, R=PTP)
+    >>> I_post = W.deliver(t, pop)    # pop.add_synaptic_current(I_post) 호출됨
+    """
+
+    def __init__(self, n_pre, n_post, pre, post,
+                 weight=1.0,
+                 delay_ms=1.5,
+                 Q_max=1.0,
+                 tau_ms=3.0,
+                 k_Ca=0.6,
+                 k_PTP=0.4,
+                 k_ATP=0.2,
+                 k_phi=0.3,
+                 p_eff_floor=0.0,
+                 batch=None,
+                 idle_tau=750.0,
+                 release_power=0.0,
+                 w_ref=50.0):
+        """
+        Parameters
+        ----------
+        n_pre, n_post : int
+            Pre/post 뉴런 개수
+        pre, post : array-like of int
+            Edge별 pre/post 뉴런 인덱스 (같은 길이 E)
+        weight, delay_ms, Q_max, tau_ms : float | array-like
+            Edge별 파라미터 (스칼라면 모든 edge 공통).
+            배치 모드에서 (B, 1) 이면 배치별, (B, E) 이면 배치×edge 값
+        k_Ca, k_PTP, k_ATP, k_phi, p_eff_floor : float
+            SynapseCore와 동일한 방출 확률 가중치
+        batch : int | None
+            배치 크기 B (None 이면 배치 축 없음)
+        idle_tau : float
+            마지막 도착 후 idle_tau·τ 가 지난 edge 는 active set 에서 제외.
+            기본값은 exp(1 − s/τ) 가 0 으로 underflow 하는 지점이라 결과가 같음
+        release_power, w_ref : float
+            방출 비선형 증폭 R·w·(w/w_ref)^release_power (0 이면 R·w)
+        """
+        pre = np.asarray(pre, dtype=np.intp).ravel()
+        post = np.asarray(post, dtype=np.intp).ravel()
+        if pre.shape != post.shape:
+            raise ValueError("pre and post must have the same length")
+        E = pre.size
+        self.n_pre = int(n_pre)
+        self.n_post = int(n_post)
+        self.batch = None if batch is None else int(batch)
+        self.n_batch = 1 if batch is None else self.batch
+        self.shape = (E,) if batch is None else (self.batch, E)
+        self.post_shape = (self.n_post,) if batch is None else (self.batch, self.n_post)
+
+        # pre 기준 정렬 (stable → 같은 pre 내 입력 순서 유지)
+        order = np.argsort(pre, kind="stable")
+        self.order = order                  # 원래 입력 순서 → 정렬 위치 매핑용
+        self.pre = pre[order]
+        self.post = post[order]
+        self.indptr = np.zeros(self.n_pre + 1, dtype=np.intp)
+        np.cumsum(np.bincount(self.pre, minlength=self.n_pre), out=self.indptr[1:])
+
+        # post 기준 보조 인덱스 (CSC 뷰: incoming edge 조회용)
+        self.post_order = np.argsort(self.post, kind="stable")
+        self.post_indptr = np.zeros(self.n_post + 1, dtype=np.intp)
+        np.cumsum(np.bincount(self.post, minlength=self.n_post), out=self.post_indptr[1:])
+
+        # 배치 평탄화 인덱스: flat = b·E + e,  post_flat = b·n_post + post[e]
+        self._post_flat = (np.arange(self.n_batch)[:, None] * self.n_post + self.post).ravel()
+
+        def _edge_param(x):
+            a = np.asarray(x, dtype=float)
+            if a.ndim == 0:
+                return np.full(self.shape, float(a))
+            if a.shape[-1] == E:
+                a = a[..., order]
+            return np.broadcast_to(a, self.shape).copy()
+
+        self.weight = _edge_param(weight)
+        self.delay = _edge_param(delay_ms)
+        self.Q_max = _edge_param(Q_max)
+        self.tau = _edge_param(tau_ms)
+
+        # 생리 가중치 (SynapseCore와 동일)
+        self.k_Ca = float(k_Ca)
+        self.k_PTP = float(k_PTP)
+        self.k_ATP = float(k_ATP)
+        self.k_phi = float(k_phi)
+        self.p_eff_floor = float(p_eff_floor)
+        self.idle_tau = float(idle_tau)
+        self.release_power = float(release_power)
+        self.w_ref = float(w_ref)
+
+        # 내부 상태
+        self.A = np.zeros(self.shape)
+        self.B = np.zeros(self.shape)
+        self.t0 = np.zeros(self.shape)
+        self.I_syn = np.zeros(self.shape)          # edge별 현재 전류
+        self.I_post = np.zeros(self.post_shape)
+        self.replay_count = np.zeros(self.shape, dtype=np.int64)   # sleep replay 횟수
+        self._pending = []                # heap [(t_arrival, seq, flat_edges, Q)]
+        self._seq = 0
+        self._live = np.zeros(0, dtype=np.intp)   # active set: 상태가 남은 edge (평탄화)
+        self._live_mask = np.zeros(self.A.size, dtype=bool)
+        self._t_eval = 0.0                         # 마지막 compute_I 시각
+        self.release_log = None                    # list 이면 on_pre_spike 마다 (t, edges, Q) 기록
+
+    @property
+    def E(self):
+        return self.pre.size
+
+    # ------------------------------------------------------------
+    # 0) 상태 초기화
+    # ------------------------------------------------------------
+    def reset(self):
+        """α-필터/대기 이벤트/전류 초기화 (weight 등 파라미터는 유지)"""
+        self.A[:] = 0.0
+        self.B[:] = 0.0
+        self.t0[:] = 0.0
+        self.I_syn[:] = 0.0
+        self.I_post[:] = 0.0
+        self._pending.clear()
+        self._live = np.zeros(0, dtype=np.intp)
+        self._live_mask[:] = False
+
+    @property
+    def idle(self):
+        """대기 이벤트도, 전류가 남은 edge 도 없으면 True"""
+        return not self._pending and self._live.size == 0
+
+    def quiet_bound(self):
+        """
+        대기 이벤트가 없고 모든 잔류 edge 가 α-kernel 정점을 지났으면
+        이후 |I_post| 의 상한 (마지막 compute_I 값의 |I| 합), 아니면 None
+
+        α-kernel (B + s·A)·e^{−s/τ} 는 (s − τ)·A + B 가 A 와 같은 부호가 된
+        뒤로는 크기가 단조 감소함
+        """
+        if self._pending:
+            return None
+        live = self._live
+        if live.size:
+            A = self.A.ravel()[live]
+            s = self._t_eval - self.t0.ravel()[live]
+            if np.any(((s - self.tau.ravel()[live]) * A + self.B.ravel()[live]) * np.sign(A) < 0.0):
+                return None
+        return np.bincount(self._post_flat[live], weights=np.abs(self.I_syn.ravel()[live]),
+                           minlength=self.n_batch * self.n_post).reshape(self.post_shape)
+
+    # ------------------------------------------------------------
+    # CSR/CSC 조회: 뉴런 인덱스 → edge 인덱스
+    # ------------------------------------------------------------
+    @staticmethod
+    def _gather(indptr, idx):
+        """indptr 구간 [indptr[i], indptr[i+1]) 들을 이어붙인 위치 배열 + 구간 길이"""
+        idx = np.asarray(idx, dtype=np.intp)
+        starts = indptr[idx]
+        counts = indptr[idx + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return np.zeros(0, dtype=np.intp), counts
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return offsets + np.arange(total), counts
+
+    def edges_of(self, pre_idx):
+        """pre 뉴런들의 outgoing edge 인덱스 (정렬 순서)"""
+        return self._gather(self.indptr, pre_idx)[0]
+
+    def edges_to(self, post_idx):
+        """post 뉴런들의 incoming edge 인덱스 (CSC 뷰)"""
+        return self.post_order[self._gather(self.post_indptr, post_idx)[0]]
+
+    def _fired(self, spikes, n):
+        """spike 벡터 → (배치 인덱스, 뉴런 인덱스)"""
+        spikes = np.asarray(spikes)
+        if spikes.dtype != bool:
+            idx = spikes.astype(np.intp).ravel()
+            return np.zeros(idx.size, dtype=np.intp), idx
+        return np.nonzero(spikes.reshape(self.n_batch, n))
+
+    def fanout(self, spikes):
+        """발화한 pre 의 outgoing edge: (flat 인덱스, 배치, edge)"""
+        b, idx = self._fired(spikes, self.n_pre)
+        edges, counts = self._gather(self.indptr, idx)
+        b = np.repeat(b, counts)
+        return b * self.E + edges, b, edges
+
+    def fanin(self, spikes):
+        """발화한 post 의 incoming edge: (flat 인덱스, 배치, edge)"""
+        b, idx = self._fired(spikes, self.n_post)
+        pos, counts = self._gather(self.post_indptr, idx)
+        edges = self.post_order[pos]
+        b = np.repeat(b, counts)
+        return b * self.E + edges, b, edges
+
+    # ------------------------------------------------------------
+    # 1) Pre spike 벡터 수신
+    # ------------------------------------------------------------
+    def release(self, spikes, Ca, R, ATP=100.0, dphi=0.0):
+        """
+        발화한 pre 뉴런들의 모든 edge 방출량 Q 계산 (대기열 등록 없음)
+
+        Parameters
+        ----------
+        spikes : ndarray[bool] (n_pre,) | (B, n_pre) | index array
+            이번 스텝 발화한 pre 뉴런
+        Ca, R, ATP, dphi : float | ndarray (n_pre,) | (B, n_pre)
+            pre 뉴런별 Ca(S), PTP R, ATP, Δφ (스칼라면 공통)
+
+        Returns
+        -------
+        edges : ndarray[int]
+            방출한 edge 의 평탄화 인덱스 (배치 없으면 edge 인덱스)
+        Q : ndarray
+            edge별 방출량
+        """
+        flat, b, edges = self.fanout(spikes)
+        if flat.size == 0:
+            return flat, np.zeros(0)
+
+        src = self.pre[edges]
+        src_b = b * self.n_pre + src
+
+        def _at(x):
+            if np.ndim(x) == 0:
+                return x
+            x = np.ravel(x)
+            return x[src] if x.size == self.n_pre else x[src_b]
+
+        # 1. 방출 확률 p_eff 계산
+        w = self.weight.ravel()[flat]
+        Rw = _at(R) * w
+        if self.release_power:
+            Rw = Rw * (w / self.w_ref) ** self.release_power
+        p_eff = (
+            self.k_Ca * _at(Ca) +
+            self.k_PTP * Rw +
+            self.k_ATP * (_at(ATP) - 100.0) * 0.01 +
+            self.k_phi * _at(dphi)
+        )
+        p_eff = np.maximum(self.p_eff_floor, np.minimum(1.0, p_eff))
+
+        # 2. 방출량
+        return flat, self.Q_max.ravel()[flat] * p_eff
+
+    def on_pre_spike(self, t_ms, spikes, Ca, R, ATP=100.0, dphi=0.0):
+        """
+        발화한 pre 뉴런들의 방출량 Q 계산 (release) 후 도착 대기열에 등록
+
+        Parameters
+        ----------
+        t_ms : float
+            Current simulation time (ms)
+        spikes, Ca, R, ATP, dphi :
+            release() 와 동일
+
+        Returns
+        -------
+        edges, Q : release() 결과
+        """
+        flat, Q = self.release(spikes, Ca, R, ATP, dphi)
+        if flat.size == 0:
+            return flat, Q
+        if self.release_log is not None:
+            self.release_log.append((float(t_ms), flat, Q))
+
+        # 3. 도착 시각별로 대기열 등록 (delay가 같으면 1개 항목)
+        t_arr = float(t_ms) + self.delay.ravel()[flat]
+        if np.all(t_arr == t_arr[0]):
+            self._push(float(t_arr[0]), flat, Q)
+        else:
+            for ta in np.unique(t_arr):
+                sel = t_arr == ta
+                self._push(float(ta), flat[sel], Q[sel])
+        return flat, Q
+
+    def _push(self, t_arrival, edges, Q):
+        heapq.heappush(self._pending, (t_arrival, self._seq, edges, Q))
+        self._seq += 1
+
+    # ------------------------------------------------------------
+    # 2) EPSC 계산 (α-필터) + post 합산
+    # ------------------------------------------------------------
+    def _absorb_arrivals(self, t_ms):
+        """도착한 이벤트(t_a < t)를 α-필터 상태로 흡수"""
+        pending = self._pending
+        A, B, t0, tau = self.A.ravel(), self.B.ravel(), self.t0.ravel(), self.tau.ravel()
+        arrived = []
+        while pending and pending[0][0] < t_ms:
+            t_a, _, e, Q = heapq.heappop(pending)
+            lag = t_a - t0[e]
+            d = np.exp(-lag / tau[e])
+            B[e] = (B[e] + lag * A[e]) * d
+            A[e] = A[e] * d + Q
+            t0[e] = t_a
+            arrived.append(e)
+        if arrived:
+            # mask 로 합집합 (정렬 순서 유지 → post 합산 순서 불변)
+            self._live_mask[np.concatenate(arrived)] = True
+            self._live = np.flatnonzero(self._live_mask)
+
+    def compute_I(self, t_ms):
+        """
+        Edge 전류 및 post 뉴런별 전류 계산
+
+        Formula
+        -------
+        I_e(t)    = (B_e + s·A_e)/τ_e · exp(1 - s/τ_e),   s = t - t0_e > 0
+        I_post[j] = Σ_{e: post_e = j} I_e(t)     (희소 incidence 행렬 matvec)
+
+        Returns
+        -------
+        I_post : ndarray (n_post,) | (B, n_post)
+        """
+        self._absorb_arrivals(t_ms)
+        self._t_eval = t_ms
+
+        # active set 의 edge 만 평가 (나머지 edge 전류는 0)
+        live = self._live
+        if 4 * live.size > self.A.size:
+            # 대부분이 live 면 gather 대신 전체 배열을 연속 연산
+            # (상태 0 인 edge 는 정확히 0 → 결과 동일)
+            A, B, tau = self.A, self.B, self.tau
+            s = t_ms - self.t0
+            on = s > 0.0
+            I = np.where(on, (B + s * A) / tau * np.exp(1.0 - np.where(on, s, 0.0) / tau), 0.0)
+            idle = (s > self.idle_tau * tau).ravel()[live]
+        else:
+            I = np.zeros(self.shape)
+            if live.size:
+                A, B, tau = self.A.ravel()[live], self.B.ravel()[live], self.tau.ravel()[live]
+                s = t_ms - self.t0.ravel()[live]
+                on = s > 0.0
+                I.ravel()[live] = np.where(on, (B + s * A) / tau * np.exp(1.0 - np.where(on, s, 0.0) / tau), 0.0)
+            idle = s > self.idle_tau * tau if live.size else np.zeros(0, dtype=bool)
+
+        # 충분히 오래된 edge 은퇴 (상태 0 으로 → 다음 도착 시 결과 동일)
+        if idle.any():
+            gone = live[idle]
+            self.A.ravel()[gone] = 0.0
+            self.B.ravel()[gone] = 0.0
+            self._live_mask[gone] = False
+            self._live = live[~idle]
+        self.I_syn = I
+        self.I_post = np.bincount(self._post_flat[live], weights=I.ravel()[live],
+                                  minlength=self.n_batch * self.n_post).reshape(self.post_shape)
+        return self.I_post
+
+    # ------------------------------------------------------------
+    # 3) post 뉴런에 전류 전달
+    # ------------------------------------------------------------
+    def deliver(self, t_ms, post_population=None):
+        """
+        EPSC 계산 후 post population의 I_syn_total 에 누적
+        (HHSomaQuickPopulation.add_synaptic_current 사용)
+
+        Returns
+        -------
+        I_post : ndarray (n_post,) | (B, n_post)
+        """
+        I_post = self.compute_I(t_ms)
+        if post_population is not None:
+            post_population.add_synaptic_current(I_post)
+        return I_post
+
+    # ------------------------------------------------------------
+    # 4) Sleep 강화 (STDPSynapse.consolidate 의 벡터판)
+    # ------------------------------------------------------------
+    def consolidate(self, edges=None, factor=0.05, w_max=50.0):
+        """
+        W = min(w_max, W + factor),  replay_count += 1
+
+        Parameters
+        ----------
+        edges : None | ndarray[int] | ndarray[bool]
+            강화할 edge (평탄화 인덱스 또는 weight 모양 mask, None 이면 전체)
+        """
+        w, rc = self.weight, self.replay_count
+        if edges is None:
+            sel = slice(None)
+        else:
+            sel = np.asarray(edges)
+            if sel.dtype != bool:
+                w, rc = w.ravel(), rc.ravel()     # 평탄화 인덱스 (뷰)
+        w[sel] = np.minimum(w_max, w[sel] + factor)
+        rc[sel] += 1
+
+    # ------------------------------------------------------------
+    # 5) 상태 저장/복원
+    # ------------------------------------------------------------
+    STATE_FIELDS = ("weight", "A", "B", "t0", "I_syn", "I_post", "replay_count")
+
+    def state_dict(self):
+        """가중치/α-필터/대기 이벤트 상태 (배열 dict)"""
+        state = {k: getattr(self, k).copy() for k in self.STATE_FIELDS}
+        pending = sorted(self._pending)
+        state["pending_t"] = np.array([p[0] for p in pending], dtype=float)
+        state["pending_len"] = np.array([len(p[2]) for p in pending], dtype=np.int64)
+        state["pending_edges"] = (np.concatenate([p[2] for p in pending]) if pending
+                                  else np.zeros(0, dtype=np.intp))
+        state["pending_Q"] = (np.concatenate([p[3] for p in pending]) if pending
+                              else np.zeros(0))
+        return state
+
+    def load_state_dict(self, state):
+        _load_fields(self, state, self.STATE_FIELDS)
+        self._live_mask = ((self.A != 0.0) | (self.B != 0.0)).ravel()
+        self._live = np.flatnonzero(self._live_mask)
+        self._pending.clear()
+        bounds = np.cumsum(np.concatenate([[0], state["pending_len"]])).astype(np.intp)
+        edges = np.asarray(state["pending_edges"], dtype=np.intp)
+        Q = np.asarray(state["pending_Q"], dtype=float)
+        for k, t_a in enumerate(state["pending_t"]):
+            self._push(float(t_a), edges[bounds[k]:bounds[k + 1]], Q[bounds[k]:bounds[k + 1]])
+
+    # ------------------------------------------------------------
+    # 6) 내부 상태 반환(옵션)
+    # ------------------------------------------------------------
+    def state(self):
+        """시냅스 행렬 요약 상태 (디버깅/로깅용)"""
+        return {
+            "E": self.E,
+            "batch": self.batch,
+            "n_pending": int(sum(len(e) for _, _, e, _ in self._pending)),
+            "I_syn_sum": float(self.I_syn.sum()),
+            "weight_mean": float(self.weight.mean()) if self.E else 0.0,
+            "k_Ca": self.k_Ca,
+            "k_PTP": self.k_PTP,
+            "k_ATP": self.k_ATP,
+            "k_phi": self.k_phi,
+        }
+
+# =============================================================
+# 15. stdp_rule.py — Trace-based Vectorized STDP
+# =============================================================
+# 목적:
+#   • 실험 코드 STDPSynapse 의 last_pre_time/last_post_time + 스칼라 np.exp
+#     콜백을 뉴런별 trace 배열로 대체
+#   • spike 벡터 1회당 SynapseMatrix edge 가중치를 일괄 갱신
+#     (비용: O(spikes × fan-out), 파이썬 루프 없음)
+#
+# Trace (뉴런별, lazy 감쇠):
+#   x(t) = a · exp(-(t - t_last)/τ)     (0 < t - t_last < window 일 때만 유효)
+#   mode="nearest" : spike 시 a = 1           (실험 코드와 동일)
+#   mode="all"     : spike 시 a = x(t) + 1    (all-to-all 누적)
+#
+# 갱신 규칙 (실험 STDPSynapse 와 동일):
+#   pre spike  (LTD): w = max(w_min, w - A_minus · x_post)
+#   post spike (LTP): w = min(w_max, w + A_plus  · x_pre)
+# =============================================================
+
+
+class STDPRule:
+    """
+    PHAM STDPRule — 뉴런별 trace 기반 벡터화 STDP
+    -----------------------------------------------------------
+    • SynapseMatrix 의 weight 배열을 직접 갱신
+    • pre/post 뉴런별 마지막 spike 시각 + trace 진폭만 보관 (O(N))
+    • 같은 시각의 pre/post 동시 발화: on_pre → on_post 순서로 호출하면
+      pre가 먼저 갱신된 실험 루프와 동일 (LTD만 적용, LTP dt=0 → 무시)
+    • 배치 행렬이면 학습 파라미터를 (B,) 배열로 주어 배치별 sweep 가능
+    -----------------------------------------------------------
+
+    사용 예시
+    ----------
+    >>> W = SynapseMatrix(N, N, pre, post, Q_max=50.0, tau_ms=2.0)
+    >>> stdp = STDPRule(W, A_plus=2.0, A_minus=0.1, w_max=10.0)
+    >>> stdp.on_pre_spike(t, spikes)      # LTD (release 전에 호출)
+    >>> W.on_pre_spike(t, spikes, Ca=S, R=PTP)
+    >>> stdp.on_post_spike(t, spikes)     # LTP
+    """
+
+    MODES = ("nearest", "all")
+
+    def __init__(self, matrix,
+                 A_plus=0.15,
+                 A_minus=0.05,
+                 tau_plus_ms=10.0,
+                 tau_minus_ms=10.0,
+                 window_ms=20.0,
+                 w_min=0.1,
+                 w_max=50.0,
+                 mode="nearest"):
+        """
+        Parameters
+        ----------
+        matrix : SynapseMatrix
+            가중치를 갱신할 시냅스 행렬
+        A_plus, A_minus : float | ndarray (B,)
+            LTP/LTD 학습률
+        tau_plus_ms, tau_minus_ms : float | ndarray (B,)
+            pre/post trace 감쇠 시정수 (ms)
+        window_ms : float | ndarray (B,)
+            STDP 유효 구간 (0 < Δt < window)
+        w_min, w_max : float | ndarray (B,)
+            가중치 하한/상한
+        mode : {"nearest", "all"}
+            trace 누적 방식
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"unknown STDP mode: {mode!r}")
+
+        def _param(x):
+            a = np.asarray(x, dtype=float)
+            return float(a) if a.ndim == 0 else np.broadcast_to(a.ravel(), (matrix.n_batch,)).copy()
+
+        self.W = matrix
+        self.A_plus = _param(A_plus)
+        self.A_minus = _param(A_minus)
+        self.tau_plus = _param(tau_plus_ms)
+        self.tau_minus = _param(tau_minus_ms)
+        self.window = _param(window_ms)
+        self.w_min = _param(w_min)
+        self.w_max = _param(w_max)
+        self.mode = mode
+
+        # 뉴런별 trace 상태 (t_last = -100 → 실험 코드 초기값)
+        pre_shape = (matrix.n_pre,) if matrix.batch is None else (matrix.batch, matrix.n_pre)
+        self.last_pre = np.full(pre_shape, -100.0)
+        self.last_post = np.full(matrix.post_shape, -100.0)
+        self.a_pre = np.zeros(pre_shape)
+        self.a_post = np.zeros(matrix.post_shape)
+
+    # ------------------------------------------------------------
+    # 0) 상태 초기화
+    # ------------------------------------------------------------
+    def reset(self):
+        """trace/마지막 spike 시각 초기화 (가중치는 유지)"""
+        self.last_pre[:] = -100.0
+        self.last_post[:] = -100.0
+        self.a_pre[:] = 0.0
+        self.a_post[:] = 0.0
+
+    STATE_FIELDS = ("last_pre", "last_post", "a_pre", "a_post")
+
+    def state_dict(self):
+        return {k: getattr(self, k).copy() for k in self.STATE_FIELDS}
+
+    def load_state_dict(self, state):
+        _load_fields(self, state, self.STATE_FIELDS)
+
+    # ------------------------------------------------------------
+    # trace 평가 (idx: 배치 평탄화 뉴런 인덱스, b: 배치 인덱스)
+    # ------------------------------------------------------------
+    @staticmethod
+    def _at(p, b):
+        return p if np.ndim(p) == 0 else p[b]
+
+    def _trace(self, t_ms, a, last, tau, idx, b):
+        """뉴런 idx 의 trace 값 x(t) (window 밖이면 0)"""
+        dt = t_ms - last.ravel()[idx]
+        inside = (dt > 0.0) & (dt < self._at(self.window, b))
+        return np.where(inside, a.ravel()[idx] * np.exp(-dt / self._at(tau, b)), 0.0)
+
+    def pre_trace(self, t_ms):
+        """전체 pre trace (shape = last_pre.shape)"""
+        b = np.repeat(np.arange(self.W.n_batch), self.W.n_pre)
+        idx = np.arange(self.last_pre.size)
+        return self._trace(t_ms, self.a_pre, self.last_pre, self.tau_plus, idx, b).reshape(self.last_pre.shape)
+
+    def post_trace(self, t_ms):
+        """전체 post trace (shape = last_post.shape)"""
+        b = np.repeat(np.arange(self.W.n_batch), self.W.n_post)
+        idx = np.arange(self.last_post.size)
+        return self._trace(t_ms, self.a_post, self.last_post, self.tau_minus, idx, b).reshape(self.last_post.shape)
+
+    def _bump(self, t_ms, a, last, tau, idx, b):
+        """spike 시 trace 갱신"""
+        a_f, last_f = a.ravel(), last.ravel()
+        if self.mode == "all":
+            a_f[idx] = self._trace(t_ms, a, last, tau, idx, b) + 1.0
+        else:
+            a_f[idx] = 1.0
+        last_f[idx] = t_ms
+
+    def _ltd(self, t_ms, flat, b, edges):
+        post_f = b * self.W.n_post + self.W.post[edges]
+        x_post = self._trace(t_ms, self.a_post, self.last_post, self.tau_minus, post_f, b)
+        w = self.W.weight.ravel()
+        w[flat] = np.maximum(self._at(self.w_min, b), w[flat] - self._at(self.A_minus, b) * x_post)
+
+    def _ltp(self, t_ms, flat, b, edges):
+        pre_f = b * self.W.n_pre + self.W.pre[edges]
+        x_pre = self._trace(t_ms, self.a_pre, self.last_pre, self.tau_plus, pre_f, b)
+        w = self.W.weight.ravel()
+        w[flat] = np.minimum(self._at(self.w_max, b), w[flat] + self._at(self.A_plus, b) * x_pre)
+
+    # ------------------------------------------------------------
+    # 1) Pre spike → LTD
+    # ------------------------------------------------------------
+    def on_pre_spike(self, t_ms, spikes):
+        """
+        발화한 pre 뉴런의 outgoing edge 전체에 LTD 적용 후 pre trace 갱신
+
+        Returns
+        -------
+        edges : ndarray[int]
+            갱신 대상 edge 의 평탄화 인덱스
+        """
+        flat, b, edges = self.W.fanout(spikes)
+        if flat.size:
+            self._ltd(t_ms, flat, b, edges)
+        bs, idx = self.W._fired(spikes, self.W.n_pre)
+        self._bump(t_ms, self.a_pre, self.last_pre, self.tau_plus, bs * self.W.n_pre + idx, bs)
+        return flat
+
+    # ------------------------------------------------------------
+    # 2) Post spike → LTP
+    # ------------------------------------------------------------
+    def on_post_spike(self, t_ms, spikes):
+        """
+        발화한 post 뉴런의 incoming edge 전체에 LTP 적용 후 post trace 갱신
+
+        Returns
+        -------
+        edges : ndarray[int]
+            갱신 대상 edge 의 평탄화 인덱스
+        """
+        flat, b, edges = self.W.fanin(spikes)
+        if flat.size:
+            self._ltp(t_ms, flat, b, edges)
+        bs, idx = self.W._fired(spikes, self.W.n_post)
+        self._bump(t_ms, self.a_post, self.last_post, self.tau_minus, bs * self.W.n_post + idx, bs)
+        return flat
+
+    # ------------------------------------------------------------
+    # 3) 한 스텝 일괄 처리
+    # ------------------------------------------------------------
+    def step(self, t_ms, pre_spikes, post_spikes, pre_first=True):
+        """
+        한 스텝의 pre/post spike 를 일괄 처리
+
+        Parameters
+        ----------
+        pre_first : bool | ndarray[bool] (E,)
+            같은 스텝에 pre/post 가 모두 발화한 edge 의 처리 순서.
+            True  → pre 먼저 (LTD 적용, LTP 는 Δt=0 으로 무시)
+            False → post 먼저 (LTP 적용, LTD 는 Δt=0 으로 무시)
+            edge 별 배열이면 뉴런 순회 순서(pre_idx ≤ post_idx)를 재현
+        """
+        if np.ndim(pre_first) == 0 and pre_first:
+            self.on_pre_spike(t_ms, pre_spikes)
+            self.on_post_spike(t_ms, post_spikes)
+            return
+
+        W = self.W
+        first = np.broadcast_to(np.asarray(pre_first, dtype=bool), (W.E,))
+        bp, ip = W._fired(pre_spikes, W.n_pre)
+        bq, iq = W._fired(post_spikes, W.n_post)
+        pre_fired = np.zeros(W.n_batch * W.n_pre, dtype=bool)
+        pre_fired[bp * W.n_pre + ip] = True
+        post_fired = np.zeros(W.n_batch * W.n_post, dtype=bool)
+        post_fired[bq * W.n_post + iq] = True
+
+        # 갱신 전 trace 로 계산 (동시 발화 edge 는 한쪽만 적용)
+        flat, b, edges = W.fanout(pre_spikes)
+        if flat.size:
+            keep = ~(post_fired[b * W.n_post + W.post[edges]] & ~first[edges])
+            self._ltd(t_ms, flat[keep], b[keep], edges[keep])
+        flat, b, edges = W.fanin(post_spikes)
+        if flat.size:
+            keep = ~(pre_fired[b * W.n_pre + W.pre[edges]] & first[edges])
+            self._ltp(t_ms, flat[keep], b[keep], edges[keep])
+
+        self._bump(t_ms, self.a_pre, self.last_pre, self.tau_plus, bp * W.n_pre + ip, bp)
+        self._bump(t_ms, self.a_post, self.last_post, self.tau_minus, bq * W.n_post + iq, bq)
+
+# =============================================================
+# 16. network.py — Layer / Projection / Network 시뮬레이터
+# =============================================================
+# 목적:
+#   • 실험 스크립트마다 반복되는 build → 자극 → step → deliver → reset
+#     루프를 하나의 최적화된 경로로 통합
+#   • NeuronLayer   : HHSomaQuickPopulation + S/PTP (SequenceNeuron/DGNeuron/CA3Neuron)
+#   • Projection    : SynapseMatrix (+ STDPRule) (STDPSynapse 묶음)
+#   • Network.run() : 단일 시뮬레이션 루프 + probe 기록
+#
+# 한 스텝 순서 (실험 루프와 동일):
+#   1) 각 레이어: I = I_ext + I_syn(직전 deliver) → soma step → S/PTP 갱신
+#   2) 각 projection: STDP(LTD/LTP) → 발화 pre 의 방출량 Q 계산
+#   3) 각 projection: deliver(t) → post soma 버퍼 + 레이어 I_syn 누적
+#
+# 주의:
+#   실험 코드는 I_syn 을 I_ext 에 더해 넘기면서 deliver() 도 soma 버퍼에
+#   같은 전류를 넣으므로 시냅스 전류가 두 번 반영됨.
+#   syn_readout=True (기본) 이면 이 동작을 그대로 재현.
+#
+# Active set (active_set=True):
+#   • 적분 대상 = active 모드 ∪ 입력 |I| > 0.001 인 뉴런
+#   • 나머지는 V_k = EL + (V − EL)·0.9^k, S/PTP 는 k 스텝분 감쇠를
+#     다음 접근(발화/probe/저장) 때 한 번에 적용
+#   • 시냅스는 항상 도착 이벤트가 있었던 edge 만 평가, 대기/잔류가 없는
+#     projection 은 deliver 자체를 건너뜀
+# =============================================================
+
+
+class NeuronLayer:
+    """
+    PHAM NeuronLayer — 같은 종류 뉴런 N개 (벡터화)
+    -----------------------------------------------------------
+    • soma : HHSomaQuickPopulation
+    • S, PTP : 단기 가소성 변수 (spike 시 상승, 아니면 감쇠)
+    • input_threshold : DGNeuron 처럼 역치 이하 입력 차단 (None 이면 통과)
+    • inhibition : LateralInhibition (k-WTA / 억제 풀, None 이면 경쟁 없음)
+    -----------------------------------------------------------
+    """
+
+    def __init__(self, name, N, config=None,
+                 input_threshold=None,
+                 inhibition=None,
+                 S_rise=0.3, S_decay=0.01,
+                 PTP_rise=0.05, PTP_decay=0.001,
+                 S_max=1.0, PTP_max=2.0,
+                 decay=True,
+                 batch=None):
+        """
+        Parameters
+        ----------
+        name : str
+            레이어 이름
+        N : int
+            뉴런 수
+        config : dict
+            HH 파라미터 (기본 CONFIG["HH"])
+        input_threshold : float | ndarray (B, 1) | None
+            입력 전류가 이 값 이하이면 0 으로 차단 (DGNeuron: 0.8·300)
+        inhibition : LateralInhibition | dict | None
+            레이어 내 경쟁. dict 이면 LateralInhibition(N, batch=batch, **dict)
+        S_rise, S_decay, PTP_rise, PTP_decay, S_max, PTP_max : float
+            S/PTP 상승/감쇠량과 상한
+        decay : bool
+            False 면 비발화 시 S/PTP 감쇠 생략 (hippo_dream_final)
+        batch : int | None
+            배치 크기 B (상태 배열이 (B, N) 이 됨)
+        """
+        self.name = name
+        self.N = int(N)
+        self.batch = None if batch is None else int(batch)
+        self.shape = (self.N,) if batch is None else (self.batch, self.N)
+        self.config = CONFIG["HH"] if config is None else config
+        self.soma = HHSomaQuickPopulation(self.config, self.shape)
+        self.input_threshold = input_threshold
+        if isinstance(inhibition, dict):
+            inhibition = LateralInhibition(self.N, batch=self.batch, **inhibition)
+        if inhibition is not None and inhibition.shape != self.shape:
+            raise ValueError(f"inhibition shape {inhibition.shape} != layer shape {self.shape}")
+        self.inhibition = inhibition
+        self.S_rise, self.S_decay = float(S_rise), float(S_decay)
+        self.PTP_rise, self.PTP_decay = float(PTP_rise), float(PTP_decay)
+        self.S_max, self.PTP_max = float(S_max), float(PTP_max)
+        self.decay = bool(decay)
+
+        self.S = np.zeros(self.shape)
+        self.PTP = np.ones(self.shape)
+        self.I_syn = np.zeros(self.shape)    # 직전 deliver 의 시냅스 전류 합
+        self.spikes = np.zeros(self.shape, dtype=bool)
+        self.offset = 0                      # Network 전역 인덱스 시작점
+
+        # sparse 모드: 비발화 감쇠를 lazy 하게 (뉴런별 마지막 반영 스텝)
+        self._clock = 0
+        self._stamp = np.zeros(self.shape, dtype=np.int64)
+
+    def reset(self):
+        """soma 상태 + S/PTP + 시냅스 전류 초기화"""
+        self.soma.reset()
+        self.S[:] = 0.0
+        self.PTP[:] = 1.0
+        self.I_syn[:] = 0.0
+        self.spikes[:] = False
+        self._stamp[:] = self._clock
+        if self.inhibition is not None:
+            self.inhibition.reset()
+
+    STATE_FIELDS = ("S", "PTP", "I_syn", "spikes")
+
+    def state_dict(self):
+        self.sync()
+        state = {k: getattr(self, k).copy() for k in self.STATE_FIELDS}
+        state.update({f"soma.{k}": v for k, v in self.soma.state_dict().items()})
+        if self.inhibition is not None:
+            state.update({f"inhibition.{k}": v for k, v in self.inhibition.state_dict().items()})
+        return state
+
+    def load_state_dict(self, state):
+        _load_fields(self, state, self.STATE_FIELDS)
+        self._stamp[:] = self._clock
+        self.soma.load_state_dict({k[5:]: v for k, v in state.items() if k.startswith("soma.")})
+        if self.inhibition is not None:
+            self.inhibition.load_state_dict(
+                {k[11:]: v for k, v in state.items() if k.startswith("inhibition.")})
+
+    def _decay_to(self, sel, steps):
+        """sel 뉴런에 비발화 감쇠 steps 회분 적용"""
+        if self.decay:
+            self.S[sel] = np.maximum(0.0, self.S[sel] - steps * self.S_decay)
+            self.PTP[sel] = np.maximum(1.0, self.PTP[sel] - steps * self.PTP_decay)
+
+    def sync(self):
+        """lazy S/PTP 감쇠와 soma 이완을 현재 스텝까지 반영"""
+        lag = self._stamp != self._clock
+        if lag.any():
+            self._decay_to(lag, self._clock - self._stamp[lag])
+            self._stamp[lag] = self._clock
+        self.soma.sync()
+
+    def step(self, dt, I_in, sparse=False):
+        """
+        레이어 한 스텝 (SequenceNeuron.step 과 동일한 의미론)
+
+        Parameters
+        ----------
+        sparse : bool
+            True 면 active set 만 적분 (soma.step_sparse) 하고
+            비발화 S/PTP 감쇠는 다음 발화/sync 때 몰아서 적용
+
+        Returns
+        -------
+        spikes : ndarray[bool] (N,) | (B, N)
+        """
+        if self.input_threshold is not None:
+            I_in = np.where(I_in > self.input_threshold, I_in, 0.0)
+        if self.inhibition is not None:
+            V = None
+            if self.inhibition.score == "V":
+                self.soma.sync()
+                V = self.soma.V
+            I_in = self.inhibition.apply(I_in, V)
+
+        if sparse:
+            sp = self.soma.step_sparse(dt, I_in)
+            self._clock += 1
+            if sp.any():
+                # 직전까지의 비발화 스텝 감쇠를 먼저 반영
+                self._decay_to(sp, self._clock - 1 - self._stamp[sp])
+                self._stamp[sp] = self._clock
+                self.S[sp] = np.minimum(self.S_max, self.S[sp] + self.S_rise)
+                self.PTP[sp] = np.minimum(self.PTP_max, self.PTP[sp] + self.PTP_rise)
+            if self.inhibition is not None:
+                self.inhibition.observe(dt, sp)
+            self.spikes = sp
+            return sp
+
+        self.sync()
+        sp = self.soma.step(dt, I_in)
+        self._clock += 1
+        self._stamp[:] = self._clock
+
+        self.S[sp] = np.minimum(self.S_max, self.S[sp] + self.S_rise)
+        self.PTP[sp] = np.minimum(self.PTP_max, self.PTP[sp] + self.PTP_rise)
+        if self.decay:
+            quiet = ~sp
+            self.S[quiet] = np.maximum(0.0, self.S[quiet] - self.S_decay)
+            self.PTP[quiet] = np.maximum(1.0, self.PTP[quiet] - self.PTP_decay)
+        if self.inhibition is not None:
+            self.inhibition.observe(dt, sp)
+
+        self.spikes = sp
+        return sp
+
+
+class Projection:
+    """
+    PHAM Projection — pre 레이어 → post 레이어 시냅스 묶음
+    -----------------------------------------------------------
+    • W    : SynapseMatrix (weight/delay/α-필터)
+    • stdp : STDPRule | None
+    • pre_first : 동시 발화 edge 의 STDP 처리 순서 (전역 인덱스 pre ≤ post)
+    -----------------------------------------------------------
+    """
+
+    def __init__(self, name, pre, post, matrix, stdp=None):
+        self.name = name
+        self.pre = pre
+        self.post = post
+        self.W = matrix
+        self.stdp = stdp
+        self.pre_first = (pre.offset + matrix.pre) <= (post.offset + matrix.post)
+        self.w_init = matrix.weight.copy()
+
+    def reset(self, weights=False, traces=True):
+        """α-필터/trace 초기화 (weights=True 면 초기 가중치 복원)"""
+        self.W.reset()
+        if traces and self.stdp is not None:
+            self.stdp.reset()
+        if weights:
+            self.W.weight[:] = self.w_init
+
+    def merge_batch(self, base):
+        """
+        미니배치 학습 결과 병합: 배치 원소별 가중치 변화량을 합산해
+        모든 배치에 같은 가중치로 되돌림
+
+            w = clip(base + Σ_b (w_b − base), w_min, w_max)
+
+        배치마다 다른 단어를 제시한 뒤 호출하면, 서로 다른 전이를 건드린
+        갱신은 순차 학습과 같고 공유 전이의 갱신은 누적됨
+
+        Parameters
+        ----------
+        base : ndarray (E,)
+            미니배치 시작 시점 가중치 (모든 배치 공통)
+
+        Returns
+        -------
+        merged : ndarray (E,)
+        """
+        w = self.W.weight
+        if w.ndim != 2:
+            raise ValueError(f"projection {self.name!r} is not batched")
+        merged = base + (w - base).sum(axis=0)
+        if self.stdp is not None:
+            lo = np.reshape(self.stdp.w_min, (-1, 1))
+            hi = np.reshape(self.stdp.w_max, (-1, 1))
+            w[:] = np.clip(merged, lo, hi)
+        else:
+            w[:] = merged
+        return w[0].copy()
+
+    def state_dict(self):
+        state = {f"W.{k}": v for k, v in self.W.state_dict().items()}
+        if self.stdp is not None:
+            state.update({f"stdp.{k}": v for k, v in self.stdp.state_dict().items()})
+        return state
+
+    def load_state_dict(self, state):
+        self.W.load_state_dict({k[2:]: v for k, v in state.items() if k.startswith("W.")})
+        if self.stdp is not None:
+            self.stdp.load_state_dict({k[5:]: v for k, v in state.items() if k.startswith("stdp.")})
+
+
+class Network:
+    """
+    PHAM Network — 레이어/프로젝션 기반 단일 시뮬레이션 루프
+    -----------------------------------------------------------
+    • add_layer()  : 뉴런 레이어 추가
+    • connect()    : 레이어 간 희소 연결 (+ STDP)
+    • run()        : T ms 시뮬레이션, 자극/probe 지원
+    • reset()      : 전체 상태 일괄 초기화
+    -----------------------------------------------------------
+
+    사용 예시
+    ----------
+    >>> net = Network(dt=0.1)
+    >>> L = net.add_layer("letters", 52)
+    >>> net.connect("letters", "letters", pre=[4, 5], post=[0, 1],
+    ...             delay_ms=2.0, Q_max=50.0, tau_ms=2.0,
+    ...             stdp=dict(A_plus=2.0, A_minus=0.1, w_max=10.0))
+    >>> rec = net.run(80.0, stimulus=lambda t: {"letters": I_of(t)},
+    ...               probes=["letters:spikes"])
+    """
+
+    PROBE_VARS = ("spikes", "V", "S", "PTP", "I_syn", "weight")
+
+    def __init__(self, dt=0.1, syn_readout=True, ATP=100.0, dphi=0.0, batch=None, seed=None,
+                 active_set=False):
+        """
+        Parameters
+        ----------
+        dt : float
+            시간 스텝 [ms]
+        syn_readout : bool
+            True 면 직전 I_syn 을 외부 전류에 더해 넘김 (실험 루프 재현)
+        ATP, dphi : float
+            방출 확률 계산에 쓰는 ATP/Δφ (실험 코드 고정값)
+        batch : int | None
+            배치 크기 B. 같은 구조의 독립 네트워크 B개를 한 스텝에 진행
+            (파라미터 sweep: Q_max/STDP 계수/역치를 배치별 배열로 지정)
+        seed : int | None
+            네트워크 RNG (self.rng) 시드 — 확률적 선택은 전역 np.random 대신 사용
+        active_set : bool
+            True 면 active 모드/입력이 있는 뉴런만 적분하고 조용한 뉴런은
+            닫힌 해로 lazy 이완 (희소 활동 구간의 비용 ∝ 활동량)
+        """
+        self.dt = float(dt)
+        self.syn_readout = bool(syn_readout)
+        self.ATP = float(ATP)
+        self.dphi = float(dphi)
+        self.batch = None if batch is None else int(batch)
+        self.rng = np.random.default_rng(seed)
+        self.active_set = bool(active_set)
+        self.t = 0.0
+        self.layers = {}
+        self.projections = {}
+        self._n_total = 0
+
+    # ------------------------------------------------------------
+    # 구성
+    # ------------------------------------------------------------
+    def add_layer(self, name, N, **kwargs):
+        """NeuronLayer 생성 후 등록 (kwargs → NeuronLayer)"""
+        if name in self.layers:
+            raise ValueError(f"duplicate layer name: {name!r}")
+        layer = NeuronLayer(name, N, batch=self.batch, **kwargs)
+        layer.offset = self._n_total
+        self._n_total += layer.N
+        self.layers[name] = layer
+        return layer
+
+    def connect(self, pre, post, pre_idx, post_idx, name=None, stdp=None, **syn_kwargs):
+        """
+        pre 레이어 → post 레이어 연결
+
+        Parameters
+        ----------
+        pre, post : str
+            레이어 이름
+        pre_idx, post_idx : array-like of int
+            edge 별 pre/post 뉴런 인덱스
+        stdp : None | dict | STDPRule
+            dict 이면 STDPRule(matrix, **stdp) 생성
+        syn_kwargs :
+            SynapseMatrix 인자 (weight, delay_ms, Q_max, tau_ms, k_Ca ...)
+        """
+        L_pre, L_post = self.layers[pre], self.layers[post]
+        name = f"{pre}->{post}" if name is None else name
+        if name in self.projections:
+            raise ValueError(f"duplicate projection name: {name!r}")
+        W = SynapseMatrix(L_pre.N, L_post.N, pre_idx, post_idx, batch=self.batch, **syn_kwargs)
+        if isinstance(stdp, dict):
+            stdp = STDPRule(W, **stdp)
+        proj = Projection(name, L_pre, L_post, W, stdp)
+        self.projections[name] = proj
+        return proj
+
+    # ------------------------------------------------------------
+    # 초기화
+    # ------------------------------------------------------------
+    def reset(self, weights=False, traces=True, t=0.0):
+        """
+        모든 레이어/프로젝션 상태 초기화 (실험 코드의 Reset 블록)
+
+        Parameters
+        ----------
+        weights : bool
+            True 면 가중치도 생성 시점 값으로 복원
+        traces : bool
+            False 면 STDP 마지막 spike 시각 유지 (실험 코드는 SynapseCore
+            상태만 초기화하고 last_pre/post_time 은 남겨 둠)
+        t : float
+            초기화 후 시뮬레이션 시각
+        """
+        for layer in self.layers.values():
+            layer.reset()
+        for proj in self.projections.values():
+            proj.reset(weights=weights, traces=traces)
+        self.t = float(t)
+
+    # ------------------------------------------------------------
+    # checkpoint (npz)
+    # ------------------------------------------------------------
+    def state_dict(self):
+        """
+        전체 동적 상태를 평탄한 {키: 배열} dict 로 반환
+
+        키 형식: "layer/<이름>/<필드>", "proj/<이름>/<필드>", "t", "rng"
+        (구조/파라미터는 저장하지 않음 → 같은 방식으로 만든 Network 에 복원)
+        """
+        state = {"t": np.array(self.t),
+                 "rng": np.array(json.dumps(self.rng.bit_generator.state))}
+        for name, layer in self.layers.items():
+            state.update({f"layer/{name}/{k}": v for k, v in layer.state_dict().items()})
+        for name, proj in self.projections.items():
+            state.update({f"proj/{name}/{k}": v for k, v in proj.state_dict().items()})
+        return state
+
+    def load_state_dict(self, state):
+        """state_dict() 결과로 상태 복원 (레이어/프로젝션 구성이 같아야 함)"""
+        def _sub(prefix):
+            sub = {k[len(prefix):]: state[k] for k in state if k.startswith(prefix)}
+            if not sub:
+                raise KeyError(f"missing state for {prefix!r}")
+            return sub
+
+        for name, layer in self.layers.items():
+            layer.load_state_dict(_sub(f"layer/{name}/"))
+        for name, proj in self.projections.items():
+            proj.load_state_dict(_sub(f"proj/{name}/"))
+        self.t = float(state["t"])
+        self.rng.bit_generator.state = json.loads(str(state["rng"]))
+
+    def save_state(self, path):
+        """상태를 압축 npz 로 저장 (예: wake 학습 직후 snapshot)"""
+        np.savez_compressed(path, **self.state_dict())
+
+    def load_state(self, path):
+        """save_state() 로 저장한 npz 에서 상태 복원"""
+        with np.load(path, allow_pickle=False) as data:
+            self.load_state_dict({k: data[k] for k in data.files})
+
+    # ------------------------------------------------------------
+    # probe
+    # ------------------------------------------------------------
+    def _parse_probes(self, probes):
+        specs = []
+        for p in probes or ():
+            owner, _, var = p.partition(":")
+            if var not in self.PROBE_VARS:
+                raise ValueError(f"unknown probe variable: {p!r}")
+            if var == "weight":
+                specs.append((p, self.projections[owner], var))
+            else:
+                specs.append((p, self.layers[owner], var))
+        return specs
+
+    @staticmethod
+    def _read(obj, var):
+        if var in ("V", "S", "PTP"):
+            obj.sync()
+        if var == "V":
+            return obj.soma.V
+        if var == "weight":
+            return obj.W.weight
+        return getattr(obj, var)
+
+    # ------------------------------------------------------------
+    # 한 스텝
+    # ------------------------------------------------------------
+    def step(self, I_ext=None, plasticity=True):
+        """
+        전체 네트워크 한 스텝
+
+        Parameters
+        ----------
+        I_ext : dict | None
+            {layer_name: 전류 (스칼라 또는 (N,) 배열)}
+        plasticity : bool
+            False 면 STDP 생략 (recall 단계)
+        """
+        dt, t = self.dt, self.t
+
+        # 1) 뉴런 업데이트
+        for name, layer in self.layers.items():
+            I = 0.0 if I_ext is None else I_ext.get(name, 0.0)
+            if self.syn_readout:
+                I = I + layer.I_syn
+            layer.step(dt, I, sparse=self.active_set)
+
+        # 2) STDP → 방출
+        for proj in self.projections.values():
+            pre_sp, post_sp = proj.pre.spikes, proj.post.spikes
+            if plasticity and proj.stdp is not None and (pre_sp.any() or post_sp.any()):
+                proj.stdp.step(t, pre_sp, post_sp, pre_first=proj.pre_first)
+            if pre_sp.any():
+                proj.W.on_pre_spike(t, pre_sp, proj.pre.S, proj.pre.PTP, self.ATP, self.dphi)
+
+        # 3) 시냅스 전달
+        for layer in self.layers.values():
+            layer.I_syn[:] = 0.0
+        for proj in self.projections.values():
+            if not proj.W.idle:           # 대기/잔류 전류가 없으면 건너뜀
+                proj.post.I_syn += proj.W.deliver(t, proj.post.soma)
+
+        self.t = t + dt
+
+    # ------------------------------------------------------------
+    # 시간 점프 (next-event)
+    # ------------------------------------------------------------
+    def _quiet(self, I_ext):
+        """
+        모든 뉴런이 rest 이고 in-flight spike 가 없으며, 이후 입력이
+        soma 의 이완 분기 기준(|I| ≤ 0.001) 아래로만 남는지 검사
+        """
+        # active 모드 검사가 가장 싸므로 먼저 (활동 중에는 여기서 끝남)
+        for layer in self.layers.values():
+            if np.any(layer.soma.mode == layer.soma.ACTIVE):
+                return False
+            if layer.inhibition is not None and not layer.inhibition.quiet():
+                return False
+        bound = {name: 0.0 for name in self.layers}
+        for proj in self.projections.values():
+            b = proj.W.quiet_bound()
+            if b is None:
+                return False
+            bound[proj.post.name] = bound[proj.post.name] + b
+        gain = 2.0 if self.syn_readout else 1.0
+        for name, layer in self.layers.items():
+            I = 0.0 if I_ext is None else I_ext.get(name, 0.0)
+            if np.any(np.abs(I) + gain * bound[name] > 0.001):
+                return False
+        return True
+
+    def _skip(self, n, t_last):
+        """
+        조용한 n 스텝을 건너뜀: soma 이완/S·PTP 감쇠는 lazy 로 넘기고,
+        마지막 스텝(t_last) 의 deliver 만 다시 계산해 다음 스텝 입력을 맞춤
+        """
+        for layer in self.layers.values():
+            layer.soma._clock += n
+            layer._clock += n
+            layer.soma.spike_flag = np.zeros(layer.shape, dtype=bool)
+            layer.soma.I_syn_total = np.zeros(layer.shape)
+            layer.spikes = layer.soma.spike_flag
+            layer.I_syn[:] = 0.0
+            if layer.inhibition is not None:
+                layer.inhibition.skip(n, self.dt)
+        for proj in self.projections.values():
+            if not proj.W.idle:
+                proj.post.I_syn += proj.W.deliver(t_last, proj.post.soma)
+
+    # ------------------------------------------------------------
+    # 실행
+    # ------------------------------------------------------------
+    def run(self, T, stimulus=None, probes=None, plasticity=True, t0=None, jump=False,
+            stop=None):
+        """
+        T ms 시뮬레이션
+
+        Parameters
+        ----------
+        T : float
+            실행 시간 [ms]
+        stimulus : None | dict | callable
+            dict      → 매 스텝 같은 {layer: 전류}
+            callable  → stimulus(t) 가 {layer: 전류} 반환
+            StimulusSchedule / CompiledStimulus → edge 테이블 (사전 컴파일)
+        probes : list of str
+            "layer:spikes" | "layer:V" | "layer:S" | "layer:PTP" | "layer:I_syn"
+            | "projection:weight"
+        plasticity : bool
+            STDP 적용 여부
+        t0 : float | None
+            시작 시각 (None 이면 현재 self.t 에서 이어감)
+        jump : bool
+            True 면 네트워크 전체가 조용할 때 (전부 rest, in-flight spike 없음,
+            입력 ≤ 0.001) 다음 자극 edge 까지 한 번에 건너뜀. rest 이완은
+            닫힌 해로 적용되며 spike raster 는 동일.
+            callable 자극이나 V/S/PTP/I_syn probe 가 있으면 사용하지 않음
+        stop : callable | None
+            stop(net) → True 면 조기 종료. 매 스텝 적분 후 (layer.spikes 는
+            이번 스텝 발화, net.t 는 다음 스텝 시각) 와 시간 점프 후에 호출
+
+        Returns
+        -------
+        rec : dict
+            "t" → (steps,) 시각 배열 (조기 종료 시 실행한 스텝까지)
+            "layer:spikes" → (spike_times, neuron_idx) 튜플
+                             (배치: (spike_times, batch_idx, neuron_idx))
+            그 외 → (steps, N) | (steps, B, N) 기록 배열
+        """
+        if t0 is not None:
+            self.t = float(t0)
+        steps = int(T / self.dt)
+        specs = self._parse_probes(probes)
+
+        t_rec = np.empty(steps)
+        dense = {key: np.empty((steps,) + self._read(obj, var).shape)
+                 for key, obj, var in specs if var != "spikes"}
+        spk_t = {key: [] for key, _, var in specs if var == "spikes"}
+        spk_b = {key: [] for key in spk_t}
+        spk_i = {key: [] for key in spk_t}
+
+        const = stimulus if isinstance(stimulus, dict) else None
+        compiled = None
+        if isinstance(stimulus, StimulusSchedule):
+            sizes = {name: layer.shape for name, layer in self.layers.items()}
+            compiled = stimulus.compile(self.dt, steps, sizes, t0=self.t)
+        elif isinstance(stimulus, CompiledStimulus):
+            compiled = stimulus
+            compiled.rewind()
+
+        jump = (jump and not callable(stimulus)
+                and all(var in ("spikes", "weight") for _, _, var in specs))
+
+        t_start = self.t
+        k = 0
+        while k < steps:
+            # t = t0 + k·dt (누적 합 대신 실험 루프와 같은 시각 계산)
+            self.t = t_start + k * self.dt
+            t_rec[k] = self.t
+            if compiled is not None:
+                I_ext = compiled.at(k)
+            elif const is not None or stimulus is None:
+                I_ext = const
+            else:
+                I_ext = stimulus(self.t)
+
+            if jump and self._quiet(I_ext):
+                k_next = compiled.next_edge(k) if compiled is not None else None
+                k_next = steps if k_next is None else min(k_next, steps)
+                if k_next - k > 1:
+                    self._skip(k_next - k, t_start + (k_next - 1) * self.dt)
+                    t_rec[k:k_next] = t_start + np.arange(k, k_next) * self.dt
+                    for key, obj, var in specs:
+                        if var == "weight":
+                            dense[key][k:k_next] = self._read(obj, var)
+                    k = k_next
+                    self.t = t_start + k * self.dt
+                    if stop is not None and k < steps and stop(self):
+                        break
+                    continue
+
+            self.step(I_ext, plasticity=plasticity)
+
+            for key, obj, var in specs:
+                if var == "spikes":
+                    b, idx = np.nonzero(obj.spikes.reshape(-1, obj.N))
+                    if idx.size:
+                        spk_t[key].append(np.full(idx.size, t_rec[k]))
+                        spk_b[key].append(b)
+                        spk_i[key].append(idx)
+                else:
+                    dense[key][k] = self._read(obj, var)
+            k += 1
+            if stop is not None:
+                self.t = t_start + k * self.dt
+                if stop(self):
+                    break
+        self.t = t_start + k * self.dt
+
+        rec = {"t": t_rec[:k]}
+        rec.update({key: arr[:k] for key, arr in dense.items()})
+        for key in spk_t:
+            if spk_t[key]:
+                cols = (spk_t[key], spk_b[key], spk_i[key])
+                cols = tuple(np.concatenate(c) for c in cols)
+            else:
+                cols = (np.zeros(0), np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp))
+            rec[key] = cols if self.batch is not None else (cols[0], cols[2])
+        return rec
+
+
+# =============================================================
+# 17. stimulus_schedule.py — 사전 컴파일된 자극 스케줄
+# =============================================================
+# 목적:
+#   • 실험 루프의 매 스텝 I = np.zeros(N) 할당 + "if t_start <= t < t_end"
+#     분기를 제거
+#   • (레이어, 뉴런 그룹, 시작, 끝, 세기) 이벤트 목록을 실행 전에
+#     on/off edge 스텝 테이블로 컴파일
+#   • 루프는 edge 스텝에서만 전류 배열을 갱신 (그 외 스텝은 그대로 재사용)
+# =============================================================
+
+
+class StimulusSchedule:
+    """
+    PHAM StimulusSchedule — 선언적 자극 이벤트 목록
+    -----------------------------------------------------------
+    • add(layer, idx, start, end, amplitude) 로 이벤트 등록
+    • compile(dt, steps, sizes) → CompiledStimulus (edge 테이블)
+    • 구간 판정은 실험 코드와 같은 부동소수 비교 (t = t0 + k·dt)
+    • batch=b 로 등록한 이벤트는 배치 b 에만 적용 (미니배치 학습:
+      배치 원소마다 다른 단어 제시)
+    -----------------------------------------------------------
+
+    사용 예시
+    ----------
+    >>> sched = StimulusSchedule()
+    >>> for i, letter in enumerate("CAT"):
+    ...     sched.add("letters", letter_neurons[letter], 5.0 + 15.0*i, 13.0 + 15.0*i, 200.0)
+    >>> rec = net.run(80.0, stimulus=sched)
+    """
+
+    def __init__(self, events=None, inclusive_start=True, inclusive_end=False, combine="set"):
+        """
+        Parameters
+        ----------
+        events : iterable of (layer, idx, start, end, amplitude)
+            초기 이벤트 목록
+        inclusive_start, inclusive_end : bool
+            구간 경계 포함 여부 (기본: start <= t < end)
+            hippo_words 처럼 start < t < end 이면 inclusive_start=False
+        combine : {"set", "add"}
+            겹치는 이벤트 처리. "set": 나중 이벤트가 덮어씀 (I[idx] = amp),
+            "add": 합산
+        """
+        if combine not in ("set", "add"):
+            raise ValueError(f"unknown combine mode: {combine!r}")
+        self.inclusive_start = bool(inclusive_start)
+        self.inclusive_end = bool(inclusive_end)
+        self.combine = combine
+        self.events = []
+        for ev in events or ():
+            self.add(*ev)
+
+    def add(self, layer, idx, start, end, amplitude, batch=None):
+        """
+        이벤트 1개 추가 (idx: 뉴런 인덱스 또는 인덱스 목록)
+
+        batch : int | None
+            배치 원소 인덱스 (None 이면 모든 배치에 공통)
+        """
+        idx = np.atleast_1d(np.asarray(idx, dtype=np.intp))
+        amp = np.broadcast_to(np.asarray(amplitude, dtype=float), idx.shape).copy()
+        batch = None if batch is None else int(batch)
+        self.events.append((layer, idx, float(start), float(end), amp, batch))
+        return self
+
+    def extend(self, events):
+        for ev in events:
+            self.add(*ev)
+        return self
+
+    # ------------------------------------------------------------
+    # 구간 → 스텝 인덱스
+    # ------------------------------------------------------------
+    def _inside(self, t, start, end):
+        lo = (t >= start) if self.inclusive_start else (t > start)
+        hi = (t <= end) if self.inclusive_end else (t < end)
+        return lo & hi
+
+    def _step_range(self, start, end, dt, steps, t0):
+        """조건을 만족하는 스텝 구간 [k_on, k_off) (실제 t 값으로 경계 보정)"""
+        k_on = max(0, int(np.floor((start - t0) / dt)) - 1)
+        k_off = min(steps, int(np.ceil((end - t0) / dt)) + 2)
+        if k_on >= k_off:
+            return 0, 0
+        k = np.arange(k_on, k_off)
+        hit = np.flatnonzero(self._inside(t0 + k * dt, start, end))
+        if hit.size == 0:
+            return 0, 0
+        return k_on + int(hit[0]), k_on + int(hit[-1]) + 1
+
+    # ------------------------------------------------------------
+    # 컴파일
+    # ------------------------------------------------------------
+    def compile(self, dt, steps, sizes, t0=0.0):
+        """
+        Parameters
+        ----------
+        dt : float
+            시간 스텝 [ms]
+        steps : int
+            전체 스텝 수
+        sizes : dict
+            {layer: 뉴런 수 | 배열 shape}  (batch 이벤트는 (B, N) shape 필요)
+        t0 : float
+            첫 스텝 시각
+
+        Returns
+        -------
+        CompiledStimulus
+        """
+        ranges = [self._step_range(s, e, dt, steps, t0) for _, _, s, e, _, _ in self.events]
+        bounds = sorted({k for r in ranges if r[0] < r[1] for k in r})
+
+        edges = []
+        for k in bounds:
+            active = [ev for ev, (a, b) in zip(self.events, ranges) if a <= k < b]
+            table = {}
+            for layer in sizes:
+                I = np.zeros(sizes[layer])
+                # 등록 순서대로 적용 → "set" 은 나중 이벤트가 덮어씀
+                for _, idx, _, _, amp, b in (ev for ev in active if ev[0] == layer):
+                    if b is not None and I.ndim < 2:
+                        raise ValueError(f"batch event on unbatched layer {layer!r}")
+                    key = (Ellipsis, idx) if b is None else (b, idx)
+                    if self.combine == "add":
+                        np.add.at(I, key, amp)
+                    else:
+                        I[key] = amp
+                table[layer] = I
+            edges.append((k, table))
+        return CompiledStimulus(edges, sizes)
+
+
+class CompiledStimulus:
+    """
+    PHAM CompiledStimulus — edge 스텝 테이블
+    -----------------------------------------------------------
+    • edges : [(k, {layer: 전류 배열})]  (k 오름차순)
+    • at(k) : 스텝 k 의 {layer: 전류}  — edge 에서만 교체, 나머지는 재사용
+    -----------------------------------------------------------
+    """
+
+    def __init__(self, edges, sizes):
+        self.edges = edges
+        self.sizes = dict(sizes)
+        self._zero = {layer: np.zeros(n) for layer, n in self.sizes.items()}
+        self.rewind()
+
+    def rewind(self):
+        """첫 스텝으로 되감기"""
+        self._next = 0
+        self.current = self._zero
+
+    def at(self, k):
+        """스텝 k 의 자극 (k 는 증가 순서로 호출)"""
+        edges = self.edges
+        while self._next < len(edges) and edges[self._next][0] <= k:
+            self.current = edges[self._next][1]
+            self._next += 1
+        return self.current
+
+    def next_edge(self, k):
+        """스텝 k 이후 첫 edge 스텝 (없으면 None)"""
+        for k_e, _ in self.edges[self._next:]:
+            if k_e > k:
+                return k_e
+        return None
+
+    def to_dense(self, layer, steps):
+        """(steps, N) 전류 테이블 (검증/시각화용)"""
+        out = np.zeros((steps,) + tuple(np.atleast_1d(self.sizes[layer])))
+        for (k, table), nxt in zip(self.edges, self.edges[1:] + [(steps, None)]):
+            out[k:nxt[0]] = table[layer]
+        return out
+
+
+# =============================================================
+# 18. trial_runner.py — 독립 trial 병렬 실행 (ProcessPool)
+# =============================================================
+# 목적:
+#   • 학습된 네트워크를 한 번 snapshot(pickle) 한 뒤 recall trial /
+#     파라미터 변형을 ProcessPoolExecutor 로 분산
+#   • trial 마다 SeedSequence.spawn 으로 만든 독립 RNG 스트림 제공
+#     (전역 np.random.rand() 대체 → 실행 순서/worker 수와 무관하게 재현)
+#   • 결과는 제출 순서대로 병합
+#
+# trial 함수 규약 (모듈 최상위 함수여야 pickle 가능):
+#   fn(net, trial, rng) -> result
+#     net   : snapshot 의 새 복사본 (trial 마다 독립)
+#     trial : trials 목록의 원소 (cue, 파라미터 등)
+#     rng   : np.random.Generator (trial 전용 스트림)
+# =============================================================
+
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+
+def trial_rngs(seed, n):
+    """seed 에서 파생된 독립 RNG n 개 (trial i ↔ 스트림 i)"""
+    return [np.random.default_rng(ss) for ss in np.random.SeedSequence(seed).spawn(n)]
+
+
+# worker 프로세스 전역 상태 (initializer 에서 1회 설정)
+_TRIAL_WORKER = {}
+
+
+def _trial_worker_init(blob, fn):
+    _TRIAL_WORKER["blob"] = blob
+    _TRIAL_WORKER["fn"] = fn
+
+
+def _trial_worker_run(task):
+    trial, seed_seq = task
+    net = pickle.loads(_TRIAL_WORKER["blob"])
+    return _TRIAL_WORKER["fn"](net, trial, np.random.default_rng(seed_seq))
+
+
+class TrialRunner:
+    """
+    PHAM TrialRunner — snapshot 기반 독립 trial 병렬 실행기
+    -----------------------------------------------------------
+    • snapshot : 생성 시점에 pickle (이후 원본 변경과 무관)
+    • map(trials) : trial 별 fn(net, trial, rng) 결과 리스트 (제출 순서)
+    • max_workers=0 : 같은 프로세스에서 순차 실행 (디버깅, 결과 동일)
+    -----------------------------------------------------------
+
+    사용 예시
+    ----------
+    >>> def recall(net, cue, rng):
+    ...     rec = net.run(60.0, stimulus=cue_schedule(cue), probes=["ca3:spikes"],
+    ...                   plasticity=False)
+    ...     return decode(rec)
+    >>> runner = TrialRunner(net, recall, seed=42)
+    >>> results = runner.map(["C"] * 20)
+    """
+
+    def __init__(self, snapshot, fn, max_workers=None, seed=0, mp_context=None):
+        """
+        Parameters
+        ----------
+        snapshot : object
+            trial 시작 상태 (Network 등 pickle 가능한 객체)
+        fn : callable
+            fn(net, trial, rng) -> result (모듈 최상위 함수)
+        max_workers : int | None
+            worker 수 (None: CPU 수, 0: 순차 실행)
+        seed : int | None
+            RNG 루트 시드
+        mp_context : multiprocessing context | None
+            프로세스 시작 방식 (fork/spawn)
+        """
+        self.blob = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        self.fn = fn
+        self.max_workers = max_workers
+        self.seed = seed
+        self.mp_context = mp_context
+
+    def map(self, trials, chunksize=1):
+        """
+        trial 목록 실행 → 결과 리스트 (trials 순서)
+
+        trial i 는 SeedSequence(seed).spawn(len(trials))[i] 스트림을 받으므로
+        worker 수나 완료 순서와 관계없이 같은 결과를 낸다.
+        """
+        trials = list(trials)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(trials))
+        tasks = list(zip(trials, seeds))
+
+        if self.max_workers == 0:
+            _trial_worker_init(self.blob, self.fn)
+            try:
+                return [_trial_worker_run(task) for task in tasks]
+            finally:
+                _TRIAL_WORKER.clear()
+
+        with ProcessPoolExecutor(max_workers=self.max_workers,
+                                 mp_context=self.mp_context,
+                                 initializer=_trial_worker_init,
+                                 initargs=(self.blob, self.fn)) as pool:
+            return list(pool.map(_trial_worker_run, tasks, chunksize=chunksize))
+
+
+# =============================================================
+# 19. vocab_graph.py — 중복 제거 어휘 시냅스 그래프
+# =============================================================
+# 목적:
+#   • hippo_words 는 단어마다 STDPSynapse 묶음을 따로 만들어
+#     CAT/BAT/RAT 의 A→T 전이가 3번 존재 (각자 deliver/학습)
+#   • 어휘 + 글자→뉴런 그룹 매핑에서 고유 bigram(전이)마다 edge 블록을
+#     한 번만 만들고, 단어별 뷰(전이 id 목록)는 분석용으로만 유지
+#   • 시냅스 수/스텝당 전달 비용 ∝ 고유 bigram 수 (단어 길이 합이 아님)
+# =============================================================
+
+
+def iter_vocab(path, min_len=2, max_len=None, alphabet="ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+               limit=None, unique=True, encoding="utf-8"):
+    """
+    단어 목록 파일을 한 줄씩 스트리밍 (파일 전체를 메모리에 올리지 않음)
+
+    • 줄의 첫 토큰만 사용 ("word 1234" 빈도 목록 형식 허용), 대문자 변환
+    • alphabet 밖의 글자가 있거나 길이 조건을 벗어난 단어는 건너뜀
+
+    Parameters
+    ----------
+    path : str | PathLike
+        단어 목록 파일 (한 줄에 한 단어)
+    min_len, max_len : int | None
+        단어 길이 범위 (전이가 있으려면 min_len ≥ 2)
+    alphabet : str | None
+        허용 글자 (None 이면 제한 없음)
+    limit : int | None
+        최대 단어 수
+    unique : bool
+        True 면 중복 단어 제거 (첫 등장만)
+
+    Yields
+    ------
+    word : str
+    """
+    allowed = None if alphabet is None else frozenset(alphabet)
+    seen = set()
+    count = 0
+    with open(path, encoding=encoding) as f:
+        for line in f:
+            if limit is not None and count >= limit:
+                break
+            parts = line.split()
+            if not parts:
+                continue
+            word = parts[0].upper()
+            if len(word) < min_len or (max_len is not None and len(word) > max_len):
+                continue
+            if allowed is not None and not allowed.issuperset(word):
+                continue
+            if unique:
+                if word in seen:
+                    continue
+                seen.add(word)
+            count += 1
+            yield word
+
+
+def assign_groups(symbols, group_size=2, offset=0):
+    """
+    기호마다 연속 뉴런 그룹 할당 (hippo_words: 글자당 2개)
+
+    Returns
+    -------
+    groups : dict
+        {symbol: [neuron_idx, ...]}
+    """
+    return {sym: list(range(offset + i * group_size, offset + (i + 1) * group_size))
+            for i, sym in enumerate(symbols)}
+
+
+class VocabGraph:
+    """
+    PHAM VocabGraph — 어휘 → 고유 전이 edge 그래프
+    -----------------------------------------------------------
+    • bigrams      : 고유 전이 (a, b) 목록 (첫 등장 순서)
+    • pre, post    : 전이 블록을 이어붙인 edge 배열 (group[a] × group[b])
+    • word_bigrams : {word: [bigram id, ...]}  (단어별 뷰)
+    • connect(net, layer) → Projection 1개로 전체 어휘 연결
+    • 같은 기호가 연속되는 전이 (BOOK 의 O→O) 는 만들지 않음 — 그룹 자기
+      연결 (autapse) 이 되므로 건너뜀. 반복 기호는 한 번만 발화하는 것으로
+      취급 (SpikeDecoder.completed 와 같음); 구별하려면 위치 코딩 사용
+    -----------------------------------------------------------
+
+    사용 예시
+    ----------
+    >>> groups = assign_groups("ABCDEFGHIJKLMNOPQRSTUVWXYZ", 2)
+    >>> g = VocabGraph(["CAT", "DOG", "BAT", "RAT"], groups)
+    >>> len(g.bigrams)                     # C→A, A→T, D→O, O→G, B→A, R→A
+    6
+    >>> proj = g.connect(net, "letters", delay_ms=2.0, Q_max=50.0, tau_ms=2.0, stdp={...})
+    >>> g.word_weights("CAT")              # [w(C→A), w(A→T)]
+    """
+
+    def __init__(self, vocab, groups):
+        """
+        Parameters
+        ----------
+        vocab : iterable of str | dict
+            단어 목록, 또는 {word: [letter, ...]} (hippo_words 의 words 형식)
+        groups : dict
+            {letter: [neuron_idx, ...]}
+        """
+        items = vocab.items() if isinstance(vocab, dict) else ((w, w) for w in vocab)
+
+        self.groups = groups
+        self.words = {}
+        self.word_bigrams = {}
+        self.bigrams = []
+        self._bigram_id = {}
+        for word, letters in items:
+            letters = list(letters)
+            ids = []
+            for a, b in zip(letters[:-1], letters[1:]):
+                if a == b:
+                    continue                   # 자기 전이 → autapse, 건너뜀
+                key = (a, b)
+                if key not in self._bigram_id:
+                    self._bigram_id[key] = len(self.bigrams)
+                    self.bigrams.append(key)
+                ids.append(self._bigram_id[key])
+            self.words[word] = letters
+            self.word_bigrams[word] = ids
+
+        # 전이 블록 → edge 배열 (입력 순서)
+        pre, post, block = [], [], []
+        for i, (a, b) in enumerate(self.bigrams):
+            ga = np.asarray(groups[a], dtype=np.intp)
+            gb = np.asarray(groups[b], dtype=np.intp)
+            pre.append(np.repeat(ga, gb.size))
+            post.append(np.tile(gb, ga.size))
+            block.append(np.full(ga.size * gb.size, i, dtype=np.intp))
+        empty = np.zeros(0, dtype=np.intp)
+        self.pre = np.concatenate(pre) if pre else empty
+        self.post = np.concatenate(post) if post else empty
+        self.bigram_of_edge = np.concatenate(block) if block else empty
+        self.bigram_ptr = np.zeros(len(self.bigrams) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(self.bigram_of_edge, minlength=len(self.bigrams)),
+                  out=self.bigram_ptr[1:])
+
+        self.projection = None
+        self._pos = None
+
+    @property
+    def n_edges(self):
+        return self.pre.size
+
+    @property
+    def n_edges_naive(self):
+        """단어별로 따로 만들었을 때의 edge 수 (hippo_words 방식)"""
+        sizes = np.diff(self.bigram_ptr)
+        return int(sum(sizes[ids].sum() for ids in self.word_bigrams.values()))
+
+    # ------------------------------------------------------------
+    # 네트워크 연결
+    # ------------------------------------------------------------
+    def connect(self, net, layer, name=None, **kwargs):
+        """
+        layer → layer 재귀 projection 1개로 어휘 전체 연결
+
+        kwargs 는 Network.connect 로 전달 (weight, delay_ms, Q_max, tau_ms, stdp ...)
+        """
+        proj = net.connect(layer, layer, self.pre, self.post, name=name, **kwargs)
+        self.attach(proj)
+        return proj
+
+    def attach(self, proj):
+        """이미 만든 Projection 과 edge 위치 매핑 (입력 순서 → 행렬 정렬 위치)"""
+        self.projection = proj
+        self._pos = np.empty_like(proj.W.order)
+        self._pos[proj.W.order] = np.arange(proj.W.order.size)
+
+    # ------------------------------------------------------------
+    # 분석용 뷰
+    # ------------------------------------------------------------
+    def bigram_id(self, a, b):
+        return self._bigram_id[(a, b)]
+
+    def edges(self, a, b):
+        """전이 a→b 의 edge 위치 (SynapseMatrix 정렬 순서)"""
+        i = self._bigram_id[(a, b)]
+        return self._pos[self.bigram_ptr[i]:self.bigram_ptr[i + 1]]
+
+    def word_edges(self, word):
+        """단어의 모든 전이 edge 위치 (공유 전이는 다른 단어와 같은 edge)"""
+        ids = self.word_bigrams[word]
+        if not ids:
+            return np.zeros(0, dtype=np.intp)
+        return np.concatenate([self.edges(*self.bigrams[i]) for i in ids])
+
+    def transition_weight(self, a, b, reduce=np.mean):
+        """전이 a→b 가중치 요약 (배치면 (B,) 배열)"""
+        return reduce(self.projection.W.weight[..., self.edges(a, b)], axis=-1)
+
+    def bigram_weights(self, reduce=np.mean):
+        """전체 고유 전이별 가중치 요약 (len(bigrams),) | (B, len(bigrams))"""
+        w = self.projection.W.weight[..., self._pos]
+        return np.stack([reduce(w[..., self.bigram_ptr[i]:self.bigram_ptr[i + 1]], axis=-1)
+                         for i in range(len(self.bigrams))], axis=-1)
+
+    def word_weights(self, word, reduce=np.mean):
+        """단어의 전이별 가중치 요약 [w(l0→l1), w(l1→l2), ...] (자기 전이 제외)"""
+        return [self.transition_weight(*self.bigrams[i], reduce=reduce)
+                for i in self.word_bigrams[word]]
+
+
+# =============================================================
+# 20. theta_replay.py — Fast-forward 수면 replay / consolidation
+# =============================================================
+# 목적:
+#   • hippo_dream_final 의 수면 단계는 theta 사이클(6 Hz, ~166 ms)마다
+#     단어 하나를 약한 자극(150, 5 ms 폭, 10 ms 간격)으로 재생하며
+#     dt=0.1 로 전체 네트워크를 적분 (20 사이클 ≈ 33k 스텝)
+#   • 같은 단어의 replay 는 사이클마다 거의 같은 spike raster 를 만듦
+#     (자극 + 학습된 재귀 전이로 다음 글자가 먼저 발화하는 패턴 포함)
+#     → 단어별로 사이클 1회를 적분해 raster 와 방출량 Q 순서열을 저장하고,
+#       이후 replay 는 raster 이벤트로 STDP/S·PTP/방출량만 계산 (막전위 적분 없음)
+#   • 사이클 끝 consolidate(단어 edge) 는 벡터 연산 1회
+#
+# Raster 갱신 조건 (하나라도 해당하면 그 사이클은 전체 적분):
+#   • 재생 중 방출량 Q 가 저장값과 q_tol (상대 오차) 이상 차이 (가중치/S/PTP
+#     변화로 시냅스 구동이 달라짐) → 이번 사이클 STDP 변화를 되돌리고 적분
+#   • 저장 후 refresh 회 재사용
+#
+# 근사:
+#   rest 모드에서 m/h/n 은 이완하지 않으므로 사이클 시작 게이트 상태가
+#   매번 조금씩 달라 spike 시각이 ±수 스텝 흔들림. 재사용 raster 는 이
+#   흔들림을 무시 → validate() 가 같은 plan 의 전체 적분과 가중치 오차를 보고
+# =============================================================
+
+import time
+
+
+class ThetaReplay:
+    """
+    PHAM ThetaReplay — theta 사이클 replay 기반 수면 강화
+    -----------------------------------------------------------
+    • schedule(n)         : priority(빈도) 비례 단어 샘플링
+    • simulate(plan)      : 전체 Network 적분 (기준 경로)
+    • fast_forward(plan)  : 저장된 raster → STDP/방출량 검사 + consolidate
+    • validate(plan)      : 같은 plan 으로 두 경로의 가중치 비교
+    • sleep(scheduler, n) : ReplayScheduler 로 사이클마다 온라인 선택
+    • plan 항목 = 단어 또는 단어 tuple (한 사이클에 동시 재생)
+    -----------------------------------------------------------
+
+    사용 예시
+    ----------
+    >>> sleep = ThetaReplay(net, graph, priority={"CAT": 0.9, "CAR": 0.1})
+    >>> report = sleep.validate(sleep.schedule(20))   # 끝나면 fast 결과 상태
+    >>> sleep.fast_forward(sleep.schedule(2000))
+    >>> net.reset(traces=False)                        # recall 전 뉴런 초기화
+    >>> sleep.fast_forward([("CAT", "DOG"), ("BIRD",)])  # 겹치지 않는 단어 병렬 replay
+    """
+
+    def __init__(self, net, graph, priority=None,
+                 theta_hz=6.0, onset_ms=5.0, spacing_ms=10.0, width_ms=5.0,
+                 amplitude=150.0, factor=0.02, w_max=50.0, q_tol=0.05, refresh=None):
+        """
+        Parameters
+        ----------
+        net : Network
+            batch 없는 네트워크
+        graph : VocabGraph
+            layer → layer projection 에 연결된 어휘 그래프
+        priority : dict | None
+            {word: replay 가중치} (None 이면 균등)
+        theta_hz : float
+            theta 주파수 (사이클 길이 = 1000/theta_hz ms)
+        onset_ms, spacing_ms, width_ms, amplitude : float
+            글자 i 자극 구간 [onset + i·spacing, onset + i·spacing + width), 세기
+        factor, w_max : float
+            사이클 끝 consolidate 증가량/상한
+        q_tol : float
+            raster 재사용 허용 오차 (방출량 Q 의 상대 오차)
+        refresh : int | None
+            raster 최대 재사용 횟수 (1 이면 매 사이클 적분 = simulate 와 동일)
+        """
+        if net.batch is not None:
+            raise ValueError("ThetaReplay requires an unbatched Network")
+        proj = graph.projection
+        if proj is None or proj.pre is not proj.post:
+            raise ValueError("graph must be connected as a recurrent projection")
+        self.net = net
+        self.graph = graph
+        self.proj = proj
+        self.layer = proj.pre
+        self.priority = dict(priority) if priority is not None else {w: 1.0 for w in graph.words}
+        self.period = 1000.0 / float(theta_hz)
+        self.steps = int(self.period / net.dt)
+        self.onset = float(onset_ms)
+        self.spacing = float(spacing_ms)
+        self.width = float(width_ms)
+        self.amplitude = float(amplitude)
+        self.factor = float(factor)
+        self.w_max = float(w_max)
+        self.q_tol = float(q_tol)
+        self.refresh = None if refresh is None else int(refresh)
+        self.hits = 0
+        self.misses = 0
+        self._compiled = {}
+        self._cache = {}
+
+    # ------------------------------------------------------------
+    # replay 계획
+    # ------------------------------------------------------------
+    def schedule(self, n_cycles, rng=None):
+        """사이클별 replay 단어 목록 (priority 비례 샘플링, 기본 RNG: net.rng)"""
+        rng = self.net.rng if rng is None else rng
+        words = list(self.priority)
+        p = np.asarray([self.priority[w] for w in words], dtype=float)
+        pick = rng.choice(len(words), size=int(n_cycles), p=p / p.sum())
+        return [words[i] for i in pick]
+
+    @staticmethod
+    def _words(item):
+        """plan 항목 → 단어 tuple (단어 1개 또는 동시 재생 단어 묶음)"""
+        return (item,) if isinstance(item, str) else tuple(item)
+
+    def _stimulus(self, words):
+        """사이클 1회 자극 (t0=0 기준으로 컴파일 → 실험의 k·dt 구간 판정과 동일)"""
+        if words not in self._compiled:
+            sched = StimulusSchedule()
+            for word in words:
+                for i, sym in enumerate(self.graph.words[word]):
+                    start = self.onset + i * self.spacing
+                    sched.add(self.layer.name, self.graph.groups[sym], start, start + self.width,
+                              self.amplitude)
+            sizes = {name: L.shape for name, L in self.net.layers.items()}
+            self._compiled[words] = sched.compile(self.net.dt, self.steps, sizes, t0=0.0)
+        return self._compiled[words]
+
+    def _consolidate(self, words):
+        for word in words:
+            self.proj.W.consolidate(self.graph.word_edges(word), factor=self.factor,
+                                    w_max=self.w_max)
+
+    def _run_cycle(self, c, words, probes=None):
+        rec = self.net.run(self.period, stimulus=self._stimulus(words), probes=probes,
+                           t0=c * self.period, jump=True)
+        self._consolidate(words)
+        return rec
+
+    # ------------------------------------------------------------
+    # 기준 경로: 전체 적분
+    # ------------------------------------------------------------
+    def simulate(self, plan, start=0):
+        """
+        plan 의 사이클마다 Network.run(period) + consolidate (hippo_dream_final 수면 루프)
+
+        start 는 첫 사이클 번호 (사이클 c 의 시각 = c·period)
+
+        Returns
+        -------
+        weight : ndarray (E,)
+        """
+        for c, item in enumerate(plan, start=int(start)):
+            self._run_cycle(c, self._words(item))
+        return self.proj.W.weight.copy()
+
+    # ------------------------------------------------------------
+    # fast-forward 경로
+    # ------------------------------------------------------------
+    def _record(self, c, words):
+        """사이클을 전체 적분하고 raster + 방출량 순서열 저장"""
+        W = self.proj.W
+        key = f"{self.layer.name}:spikes"
+        W.release_log = []
+        try:
+            t_sp, idx = self._run_cycle(c, words, probes=[key])[key]
+            log = W.release_log
+        finally:
+            W.release_log = None
+
+        k_sp = np.rint((t_sp - c * self.period) / self.net.dt).astype(np.intp)
+        bounds = np.flatnonzero(np.diff(k_sp)) + 1
+        raster = [(int(k[0]), i) for k, i in zip(np.split(k_sp, bounds), np.split(idx, bounds))]
+        self._cache[words] = {"raster": raster, "release": [(e, Q) for _, e, Q in log], "uses": 0}
+
+    def _replay(self, c, words, entry):
+        """
+        저장된 raster 로 STDP/S·PTP/방출량 계산 (적분 없음)
+
+        방출량이 저장값과 다르면 이번 사이클 변화를 되돌리고 False 반환
+        """
+        if self.refresh is not None and entry["uses"] >= self.refresh - 1:
+            return False
+        L, W, stdp = self.layer, self.proj.W, self.proj.stdp
+        t0, dt = c * self.period, self.net.dt
+        L.sync()
+        w_saved = W.weight.copy()
+        stdp_saved = stdp.state_dict() if stdp is not None else None
+
+        S, P = L.S.copy(), L.PTP.copy()
+        mask = np.zeros(L.shape, dtype=bool)
+        release = iter(entry["release"])
+        k_prev = -1
+        for k, idx in entry["raster"]:
+            # 직전 이벤트 이후 비발화 스텝 감쇠 → 이번 스텝 S/PTP (NeuronLayer.step 규칙)
+            if L.decay and k - k_prev > 1:
+                S = np.maximum(0.0, S - (k - k_prev - 1) * L.S_decay)
+                P = np.maximum(1.0, P - (k - k_prev - 1) * L.PTP_decay)
+            mask[idx] = True
+            S[idx] = np.minimum(L.S_max, S[idx] + L.S_rise)
+            P[idx] = np.minimum(L.PTP_max, P[idx] + L.PTP_rise)
+            if L.decay:
+                S[~mask] = np.maximum(0.0, S[~mask] - L.S_decay)
+                P[~mask] = np.maximum(1.0, P[~mask] - L.PTP_decay)
+
+            if stdp is not None:
+                stdp.step(t0 + k * dt, mask, mask, pre_first=self.proj.pre_first)
+            edges, Q = W.release(mask, S, P, self.net.ATP, self.net.dphi)
+            mask[idx] = False
+            k_prev = k
+            if edges.size == 0:
+                continue
+
+            ref = next(release, None)
+            if (ref is None or not np.array_equal(edges, ref[0])
+                    or np.any(np.abs(Q - ref[1]) > self.q_tol * np.abs(ref[1]))):
+                W.weight[:] = w_saved
+                if stdp is not None:
+                    stdp.load_state_dict(stdp_saved)
+                return False
+
+        if L.decay and self.steps - 1 > k_prev:
+            S = np.maximum(0.0, S - (self.steps - 1 - k_prev) * L.S_decay)
+            P = np.maximum(1.0, P - (self.steps - 1 - k_prev) * L.PTP_decay)
+        L.S[:] = S
+        L.PTP[:] = P
+        self._consolidate(words)
+        self.net.t = t0 + self.steps * dt
+        entry["uses"] += 1
+        return True
+
+    def fast_forward(self, plan, start=0):
+        """
+        plan 의 replay 가중치 변화 적용 (raster 재사용 가능한 사이클은 적분 생략)
+
+        raster 이벤트마다 STDPRule.step 을 실제 시각 t = c·period + k·dt 로
+        호출하므로 trace/window/동시 발화 순서 규칙은 전체 시뮬레이션과 같음.
+        막전위/α-필터 상태는 마지막으로 적분한 사이클 끝 상태로 남음
+
+        Returns
+        -------
+        weight : ndarray (E,)
+        """
+        for c, item in enumerate(plan, start=int(start)):
+            words = self._words(item)
+            entry = self._cache.get(words)
+            if entry is not None and self._replay(c, words, entry):
+                self.hits += 1
+            else:
+                self._record(c, words)
+                self.misses += 1
+        return self.proj.W.weight.copy()
+
+    def sleep(self, scheduler, n_cycles, batch=1, fast=True, start=None):
+        """
+        ReplayScheduler 로 사이클마다 겹치지 않는 단어 최대 batch 개를 골라 replay
+
+        사이클이 끝날 때마다 scheduler.observe() → replay 횟수/가중치 항이
+        다음 사이클 선택에 바로 반영됨. start=None 이면 현재 net.t 다음
+        사이클부터 이어서 실행
+
+        Returns
+        -------
+        plan : list of tuple
+            실제 실행한 사이클별 단어 묶음
+        """
+        run = self.fast_forward if fast else self.simulate
+        if start is None:
+            start = int(np.ceil(self.net.t / self.period - 1e-9))
+        plan = []
+        for c in range(int(start), int(start) + int(n_cycles)):
+            words = tuple(scheduler.sample_disjoint(batch))
+            run([words], start=c)
+            scheduler.observe(words)
+            plan.append(words)
+        return plan
+
+    # ------------------------------------------------------------
+    # 검증
+    # ------------------------------------------------------------
+    def validate(self, plan, atol=1e-9):
+        """
+        같은 plan 으로 simulate / fast_forward 를 각각 실행해 가중치 비교
+
+        두 경로 모두 호출 시점 상태에서 시작하며, 끝나면 네트워크는
+        fast_forward 결과 상태로 남음
+
+        Returns
+        -------
+        report : dict
+            max_abs_err, mean_abs_err, n_mismatch (|Δw| > atol),
+            hits, misses (fast 경로 raster 재사용/적분 사이클 수),
+            t_full, t_fast [s], speedup, w_full, w_fast
+        """
+        state = self.net.state_dict()
+        t = time.perf_counter()
+        w_full = self.simulate(plan)
+        t_full = time.perf_counter() - t
+
+        self.net.load_state_dict(state)
+        self._cache.clear()
+        self.hits = self.misses = 0
+        t = time.perf_counter()
+        w_fast = self.fast_forward(plan)
+        t_fast = time.perf_counter() - t
+
+        err = np.abs(w_full - w_fast)
+        return {
+            "max_abs_err": float(err.max()) if err.size else 0.0,
+            "mean_abs_err": float(err.mean()) if err.size else 0.0,
+            "n_mismatch": int(np.count_nonzero(err > atol)),
+            "hits": self.hits,
+            "misses": self.misses,
+            "t_full": t_full,
+            "t_fast": t_fast,
+            "speedup": t_full / max(t_fast, 1e-12),
+            "w_full": w_full,
+            "w_fast": w_fast,
+        }
+
+
+# =============================================================
+# 21. replay_scheduler.py — 우선순위 replay 스케줄러 (sum-tree)
+# =============================================================
+# 목적:
+#   • hippo_dream_final / hippo_ultimate 의 수면 단계는
+#     "np.random.rand() < 0.9" 또는 train_count 누적합 선형 탐색으로
+#     사이클마다 단어 1개를 고름 → 기억 수 n 에 대해 O(n), 병렬 replay 없음
+#   • 기억별 우선순위를 sum-tree 에 보관: 샘플/갱신 O(log n)
+#   • sample_disjoint(k) : 뉴런 그룹이 겹치지 않는 기억 k 개를 한 theta
+#     사이클에 동시에 재생 (ThetaReplay 의 plan 항목 = 단어 tuple)
+#
+# 우선순위:
+#   p_i = f_i^α · (1 + g_nov·novelty_i) · (1 + replay_i)^(−β) · (1 − w̄_i/w_max)^γ
+#   f_i      : 학습 빈도 (train_count)
+#   replay_i : 지금까지 replay 횟수 (β > 0 이면 반복 재생 억제)
+#   w̄_i      : 단어 전이 평균 가중치 (γ > 0 이면 약한 기억 우선)
+#   novelty_i: 외부 novelty 신호 (CA1 novelty 등)
+# =============================================================
+
+
+class SumTree:
+    """
+    PHAM SumTree — 합 트리 (누적합 샘플링)
+    -----------------------------------------------------------
+    • 잎 = 항목별 우선순위, 내부 노드 = 자식 합 (tree[1] = 전체 합)
+    • update(idx, p) : 잎 갱신 후 부모만 다시 합산 (O(k log n), 누적 오차 없음)
+    • find(u)        : 누적합 u 에 해당하는 잎 (벡터화 하강, O(k log n))
+    -----------------------------------------------------------
+    """
+
+    def __init__(self, n):
+        self.n = int(n)
+        self.cap = 1 << max(0, int(np.ceil(np.log2(max(self.n, 1)))))
+        self.tree = np.zeros(2 * self.cap)
+
+    @property
+    def total(self):
+        return float(self.tree[1]) if self.cap > 1 else float(self.tree[1 if self.n else 0])
+
+    def __getitem__(self, idx):
+        return self.tree[self.cap + np.asarray(idx)]
+
+    def update(self, idx, p):
+        """잎 idx 의 우선순위를 p 로 설정 (p ≥ 0)"""
+        idx = np.atleast_1d(np.asarray(idx, dtype=np.intp))
+        p = np.broadcast_to(np.asarray(p, dtype=float), idx.shape)
+        if np.any(p < 0.0):
+            raise ValueError("priorities must be non-negative")
+        tree = self.tree
+        tree[self.cap + idx] = p
+        node = np.unique((self.cap + idx) >> 1)
+        while node.size and node[0] >= 1:
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+            if node[0] == 1:
+                break
+            node = np.unique(node >> 1)
+
+    def find(self, u):
+        """누적합 u (0 ≤ u < total) 위치의 잎 인덱스 (질량이 없는 subtree 로는 내려가지 않음)"""
+        u = np.array(u, dtype=float, ndmin=1)
+        tree = self.tree
+        node = np.ones(u.shape, dtype=np.intp)
+        while node[0] < self.cap:
+            left = tree[2 * node]
+            right = (u >= left) & (tree[2 * node + 1] > 0.0)
+            u = np.where(right, u - left, u)
+            node = 2 * node + right
+        return node - self.cap
+
+    def sample(self, k, rng):
+        """우선순위 비례 복원 추출 k 개"""
+        if not self.tree[1] > 0.0:
+            raise ValueError("cannot sample: all priorities are zero")
+        return self.find(rng.random(int(k)) * self.tree[1])
+
+
+class ReplayScheduler:
+    """
+    PHAM ReplayScheduler — 기억별 우선순위 replay 선택
+    -----------------------------------------------------------
+    • memories : {key: [symbol, ...]}  (symbol = 뉴런 그룹 → 겹침 판정)
+    • sample(k)          : 우선순위 비례 추출 (O(k log n))
+    • sample_disjoint(k) : 그룹이 겹치지 않는 서로 다른 기억 최대 k 개
+    • observe(keys)      : replay 횟수 증가 + 우선순위 갱신
+    • plan(n, batch)     : n 사이클 replay 계획 [(word, ...), ...]
+    -----------------------------------------------------------
+
+    사용 예시
+    ----------
+    >>> sched = ReplayScheduler.from_graph(graph, freq={"CAT": 20, "CAR": 1}, beta=0.5)
+    >>> sleep = ThetaReplay(net, graph)
+    >>> sleep.sleep(sched, n_cycles=200, batch=8)     # 사이클당 최대 8 단어 동시 재생
+    """
+
+    def __init__(self, memories, freq=None, novelty=None,
+                 alpha=1.0, beta=0.0, novelty_gain=1.0, weight_exp=0.0, w_max=50.0,
+                 graph=None, rng=None):
+        """
+        Parameters
+        ----------
+        memories : dict
+            {key: 기호 목록} — 기호가 겹치는 기억은 같은 사이클에 재생하지 않음
+        freq, novelty : dict | None
+            {key: 값} (없는 key 는 freq=1, novelty=0)
+        alpha, beta, novelty_gain, weight_exp : float
+            우선순위 지수/이득 (모듈 주석의 p_i 식)
+        w_max : float
+            가중치 항 정규화 상한
+        graph : VocabGraph | None
+            주면 refresh() 때 단어 전이 평균 가중치를 읽어 w̄_i 갱신
+        rng : np.random.Generator | None
+        """
+        self.keys = list(memories)
+        self._index = {k: i for i, k in enumerate(self.keys)}
+        self.symbols = [frozenset(memories[k]) for k in self.keys]
+        n = len(self.keys)
+        self.freq = np.ones(n)
+        self.novelty = np.zeros(n)
+        for k, v in (freq or {}).items():
+            self.freq[self._index[k]] = float(v)
+        for k, v in (novelty or {}).items():
+            self.novelty[self._index[k]] = float(v)
+        self.replay_count = np.zeros(n, dtype=np.int64)
+        self.weight = np.zeros(n)
+        self.alpha = float(alpha)
+        self.beta = float(beta)
+        self.novelty_gain = float(novelty_gain)
+        self.weight_exp = float(weight_exp)
+        self.w_max = float(w_max)
+        self.graph = graph
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.tree = SumTree(n)
+        self.refresh()
+
+    @classmethod
+    def from_graph(cls, graph, **kwargs):
+        """VocabGraph 의 단어/기호로 생성 (가중치 항은 graph 에서 읽음)"""
+        return cls(graph.words, graph=graph, **kwargs)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _idx(self, keys):
+        if isinstance(keys, str):
+            keys = [keys]
+        return np.fromiter((self._index[k] for k in keys), dtype=np.intp)
+
+    # ------------------------------------------------------------
+    # 우선순위
+    # ------------------------------------------------------------
+    def priority(self, idx=None):
+        """p_i (idx=None 이면 전체)"""
+        sel = slice(None) if idx is None else idx
+        p = self.freq[sel] ** self.alpha
+        p = p * (1.0 + self.novelty_gain * self.novelty[sel])
+        if self.beta:
+            p = p * (1.0 + self.replay_count[sel]) ** (-self.beta)
+        if self.weight_exp:
+            p = p * np.clip(1.0 - self.weight[sel] / self.w_max, 0.0, 1.0) ** self.weight_exp
+        return p
+
+    def refresh(self, keys=None):
+        """keys (None 이면 전체) 의 가중치 항을 다시 읽고 sum-tree 갱신"""
+        idx = np.arange(len(self.keys)) if keys is None else self._idx(keys)
+        if self.graph is not None and self.weight_exp and self.graph.projection is not None:
+            for i in idx:
+                self.weight[i] = np.mean(self.graph.word_weights(self.keys[i]))
+        if idx.size:
+            self.tree.update(idx, self.priority(idx))
+
+    def set_frequency(self, key, value):
+        self.freq[self._index[key]] = float(value)
+        self.refresh([key])
+
+    def set_novelty(self, key, value):
+        self.novelty[self._index[key]] = float(value)
+        self.refresh([key])
+
+    def observe(self, keys):
+        """replay 된 기억 기록 (replay_count += 1, 우선순위 갱신)"""
+        idx = self._idx(keys)
+        np.add.at(self.replay_count, idx, 1)
+        self.refresh([self.keys[i] for i in idx])
+
+    # ------------------------------------------------------------
+    # 샘플링
+    # ------------------------------------------------------------
+    def sample(self, k=1):
+        """우선순위 비례 복원 추출 (key 목록)"""
+        return [self.keys[i] for i in self.tree.sample(k, self.rng)]
+
+    def sample_disjoint(self, k, max_tries=None):
+        """
+        기호(뉴런 그룹)가 서로 겹치지 않는 서로 다른 기억 최대 k 개
+
+        우선순위 비례로 후보를 뽑아 이미 고른 기억과 겹치면 버림
+        (시도 횟수 max_tries, 기본 8·k)
+        """
+        k = int(k)
+        tries = 8 * k if max_tries is None else int(max_tries)
+        chosen, used = [], set()
+        while len(chosen) < k and tries > 0:
+            m = min(tries, 2 * (k - len(chosen)))
+            tries -= m
+            for i in self.tree.sample(m, self.rng):
+                sym = self.symbols[i]
+                if used.isdisjoint(sym):
+                    chosen.append(self.keys[i])
+                    used |= sym
+                    if len(chosen) == k:
+                        break
+        return chosen
+
+    def plan(self, n_cycles, batch=1):
+        """
+        n 사이클 replay 계획 (사이클마다 겹치지 않는 기억 최대 batch 개)
+
+        replay_count 는 계획하면서 갱신 (가중치 항은 실행 전 값 사용)
+        """
+        out = []
+        for _ in range(int(n_cycles)):
+            words = tuple(self.sample_disjoint(batch))
+            self.observe(words)
+            out.append(words)
+        return out
+
+
+# =============================================================
+# 22. ripple_replay.py — 시간 압축 sharp-wave ripple replay
+# =============================================================
+# 목적:
+#   • hippo_dream_final 수면은 깨어 있을 때와 같은 시간 척도로 재생
+#     (글자마다 10 ms 간격 5 ms 펄스, dt=0.1 로 166 ms theta 사이클 전체)
+#   • 생물학적 replay 는 κ 배 압축 (SWR) → 같은 서열을 κ 배 짧게 구동
+#   • 압축 시계에서 시간 척도를 κ 로 나눔:
+#       자극 onset/간격/폭, 사이클 길이, 시냅스 delay/τ, STDP τ±/window,
+#       S/PTP 스텝당 감쇠(×κ), soma time_scale = κ (스텝당 뉴런 시간 κ·dt)
+#   • active(HH 스파이크) 분기는 실제 dt 로 적분 — 스파이크 파형/불응기는
+#     압축하지 않음. 이 부분이 압축 오차의 원인 (hippo_ripple_replay.py 로 측정)
+#   • 속도 이득은 거의 없음: 압축 스텝마다 active 뉴런은 ceil(κ) 번 부분 스텝을
+#     돌고, replay 시간의 대부분이 이 soma 적분이라 κ=2/4/8 에서 κ=1 대비
+#     ~1.0–2x (실행마다 변동), Δw 상대 오차는 ~1%/3%/6%.
+#     큰 부분 스텝 (Rush–Larsen gate + 지수 Euler V) 은 3–8x 빨랐지만 연속 발화가
+#     dt=0.1 Euler 모델과 달라져 Δw 가 크게 틀어짐 → 쓰지 않음.
+#     RippleReplay 는 SWR 의 압축 시간 척도 (STDP 창/delay 1/κ) 를 재현하는 용도
+# =============================================================
+
+from contextlib import contextmanager
+
+
+class RippleReplay(ThetaReplay):
+    """
+    PHAM RippleReplay — κ 배 시간 압축 replay (ThetaReplay 확장)
+    -----------------------------------------------------------
+    • compression=κ : 사이클/자극/시냅스/STDP 시간 척도 1/κ
+    • simulate / fast_forward / sleep / validate 는 ThetaReplay 와 같음
+      (실행 동안만 압축 시간 척도로 바꾸고 끝나면 원래 값 복원)
+    • 시작/끝에 시냅스 delay 대기열이 비어 있어야 함 (아니면 RuntimeError)
+    • κ=1 이면 ThetaReplay 와 같은 결과
+    • 속도용 아님: soma 가 실제 dt 부분 스텝을 그대로 돌아 κ=8 에서도 κ=1 대비
+      ~1–2x (hippo_ripple_replay.py 측정), 압축 시간 척도 재현이 목적
+    -----------------------------------------------------------
+
+    사용 예시
+    ----------
+    >>> ripple = RippleReplay(net, graph, compression=4.0)
+    >>> ripple.simulate(["CAT"] * 18 + ["CAR"] * 2)   # 스텝 수 약 1/4, soma 부분 스텝은 그대로
+    """
+
+    def __init__(self, net, graph, priority=None, compression=4.0,
+                 theta_hz=6.0, onset_ms=5.0, spacing_ms=10.0, width_ms=5.0,
+                 amplitude=150.0, factor=0.02, w_max=50.0, q_tol=0.05, refresh=None):
+        """
+        Parameters
+        ----------
+        compression : float
+            시간 압축 배율 κ (≥ 1)
+        나머지 : ThetaReplay 와 같음 (생물학적 시간 기준 값, 내부에서 1/κ)
+        """
+        kappa = float(compression)
+        if kappa < 1.0:
+            raise ValueError("compression must be >= 1")
+        super().__init__(net, graph, priority=priority,
+                         theta_hz=theta_hz * kappa, onset_ms=onset_ms / kappa,
+                         spacing_ms=spacing_ms / kappa, width_ms=width_ms / kappa,
+                         amplitude=amplitude, factor=factor, w_max=w_max,
+                         q_tol=q_tol, refresh=refresh)
+        self.compression = kappa
+
+    @contextmanager
+    def compressed(self):
+        """
+        네트워크 전체를 압축 시간 척도로 바꾸고 끝나면 복원
+
+        delay 만 κ 배 줄이고 SynapseMatrix 대기열의 도착 시각은 바꾸지 않으므로
+        진입/종료 시 모든 projection 대기열이 비어 있어야 함 (wake 시각으로
+        예약된 spike 가 압축 시계로, 또는 압축 delay 로 예약된 spike 가 복원 후
+        전달되는 것을 막음). 비어 있지 않으면 RuntimeError — 진입 전
+        net.reset(traces=False) 또는 대기열이 빌 때까지 실행.
+        """
+        kappa = self.compression
+        layers = list(self.net.layers.values())
+        projs = list(self.net.projections.values())
+        self._check_queues(projs, "entering")
+        for L in layers:
+            L.sync()                      # lazy 이완/감쇠는 원래 척도로 먼저 반영
+        saved = ([(L.soma.time_scale, L.S_decay, L.PTP_decay) for L in layers],
+                 [(P.W.delay.copy(), P.W.tau.copy()) for P in projs],
+                 [None if P.stdp is None else
+                  (P.stdp.tau_plus, P.stdp.tau_minus, P.stdp.window) for P in projs])
+        try:
+            for L in layers:
+                L.soma.time_scale *= kappa
+                L.S_decay *= kappa
+                L.PTP_decay *= kappa
+            for P in projs:
+                P.W.delay /= kappa
+                P.W.tau /= kappa
+                if P.stdp is not None:
+                    P.stdp.tau_plus = P.stdp.tau_plus / kappa
+                    P.stdp.tau_minus = P.stdp.tau_minus / kappa
+                    P.stdp.window = P.stdp.window / kappa
+            yield self
+            self._check_queues(projs, "leaving")
+        finally:
+            for L in layers:
+                L.sync()
+            for L, (scale, S_decay, PTP_decay) in zip(layers, saved[0]):
+                L.soma.time_scale, L.S_decay, L.PTP_decay = scale, S_decay, PTP_decay
+            for P, (delay, tau), rule in zip(projs, saved[1], saved[2]):
+                P.W.delay[:] = delay
+                P.W.tau[:] = tau
+                if rule is not None:
+                    P.stdp.tau_plus, P.stdp.tau_minus, P.stdp.window = rule
+
+    @staticmethod
+    def _check_queues(projs, when):
+        busy = [P for P in projs if P.W._pending]
+        if busy:
+            n = sum(len(e) for P in busy for _, _, e, _ in P.W._pending)
+            raise RuntimeError(f"{n} synaptic arrivals pending when {when} compressed time; "
+                               "delays are rescaled but queued arrival times are not")
+
+    def simulate(self, plan, start=0):
+        with self.compressed():
+            return super().simulate(plan, start=start)
+
+    def fast_forward(self, plan, start=0):
+        with self.compressed():
+            return super().fast_forward(plan, start=start)
+
+
+# =============================================================
+# 23. spike_decoder.py — 스트리밍 spike → 기호 토큰 해독기
+# =============================================================
+# 목적:
+#   • 실험의 recall 분석은 실행 후 letter_neurons × spike 로그를 이중 루프로
+#     훑어 글자별 첫 발화 시각/횟수를 구함 (O(글자 × 로그 × 그룹))
+#   • neuron → 기호 id 배열을 미리 만들어 발화 이벤트를 바로 토큰으로 변환
+#     (O(spikes)), 처음 발화한 기호를 첫 발화 시각과 함께 즉시 방출
+#   • Network.run(stop=decoder.listener(layer)) 로 시뮬레이션과 동시에 해독
+#   • 분기 출력 (hippo_branching_v2 의 A → N/R/I 동시 발화) 은 waves() 로
+#     첫 발화 시각이 같은 토큰 묶음, completed() 로 동시에 완성된 단어 목록
+# =============================================================
+
+
+class SpikeDecoder:
+    """
+    PHAM SpikeDecoder — neuron→기호 인덱스 기반 스트리밍 해독
+    -----------------------------------------------------------
+    • feed(t, spikes)            : 한 스텝 발화 (bool 배열) → 새 토큰
+    • feed_events(t, idx, b)     : 발화 이벤트 배열 (raster 조각) → 새 토큰
+    • listener(layer)            : Network.run(stop=...) 용 콜백
+    • first_spikes / spike_counts / sequence / waves / completed : 조회
+    • spike_counts 는 기호 그룹이 발화한 스텝 수 (실험 코드의 집계와 같음)
+    -----------------------------------------------------------
+
+    사용 예시
+    ----------
+    >>> dec = SpikeDecoder(letter_neurons, N=52)
+    >>> net.run(60.0, stimulus=cue, stop=dec.listener(net.layers["letters"]))
+    >>> dec.sequence()                   # ['A', 'N', 'R', 'I', 'T', 'C', 'M']
+    >>> dec.waves(tol=0.5)               # [(1.1, ['A']), (3.7, ['N', 'R', 'I']), ...]
+    >>> dec.completed(["ANT", "ARC", "AIM"])
+    ['ANT', 'ARC', 'AIM']
+    """
+
+    def __init__(self, groups, N, batch=None):
+        """
+        Parameters
+        ----------
+        groups : dict
+            {symbol: [neuron_idx, ...]}  (겹치는 뉴런은 나중 기호가 차지)
+        N : int
+            레이어 뉴런 수
+        batch : int | None
+            배치 크기 B (None 이면 배치 축 없음)
+        """
+        self.symbols = list(groups)
+        self.index = {sym: k for k, sym in enumerate(self.symbols)}
+        self.N = int(N)
+        self.batch = None if batch is None else int(batch)
+        self.n_batch = 1 if batch is None else self.batch
+        self.symbol_of = np.full(self.N, -1, dtype=np.intp)
+        for sym, idx in groups.items():
+            self.symbol_of[np.asarray(idx, dtype=np.intp)] = self.index[sym]
+        self.reset()
+
+    @classmethod
+    def from_graph(cls, graph, layer=None):
+        """VocabGraph 의 기호 그룹으로 생성 (layer 기본: graph projection 의 레이어)"""
+        layer = graph.projection.pre if layer is None else layer
+        return cls(graph.groups, layer.N, layer.batch)
+
+    def reset(self):
+        """해독 상태 초기화"""
+        S = len(self.symbols)
+        self.first = np.full((self.n_batch, S), np.inf)
+        self.last = np.full((self.n_batch, S), -np.inf)     # 가장 최근 발화 시각
+        self.count = np.zeros((self.n_batch, S), dtype=np.int64)
+        self.tokens = [[] for _ in range(self.n_batch)]     # [(symbol, t), ...] 첫 발화 순
+
+    # ------------------------------------------------------------
+    # 입력
+    # ------------------------------------------------------------
+    def feed(self, t, spikes, where=None):
+        """
+        한 스텝의 발화 bool 배열 (N,) | (B, N) 해독
+
+        Parameters
+        ----------
+        where : ndarray[bool] (B,) | None
+            False 인 배치 원소는 무시 (이미 끝난 질의 고정 등)
+
+        Returns
+        -------
+        list of (b, symbol, t)
+            이번에 처음 발화한 기호 (시각, 기호 순)
+        """
+        b, idx = np.nonzero(np.asarray(spikes).reshape(-1, self.N))
+        if idx.size == 0:
+            return []
+        return self.feed_events(t, idx, b, where)
+
+    def feed_events(self, t, idx, b=None, where=None):
+        """
+        발화 이벤트 (시각, 뉴런, 배치) 배열 해독 — 순서 무관, O(spikes log spikes)
+
+        t 는 스칼라 또는 idx 와 같은 길이 배열. 반환값은 feed 와 같음
+        """
+        idx = np.asarray(idx, dtype=np.intp).ravel()
+        t = np.broadcast_to(np.asarray(t, dtype=float), idx.shape)
+        b = np.zeros(idx.shape, dtype=np.intp) if b is None else np.asarray(b, dtype=np.intp).ravel()
+        sym = self.symbol_of[idx]
+        keep = sym >= 0
+        if where is not None:
+            keep &= np.asarray(where, dtype=bool)[b]
+        if not keep.all():
+            t, b, sym = t[keep], b[keep], sym[keep]
+        if sym.size == 0:
+            return []
+
+        # (기호, 시각) 중복 제거 → 스텝 단위 발화 횟수
+        S = len(self.symbols)
+        key = b * S + sym
+        order = np.lexsort((t, key))
+        key, t = key[order], t[order]
+        step = np.ones(key.size, dtype=bool)
+        step[1:] = (key[1:] != key[:-1]) | (t[1:] != t[:-1])
+        np.add.at(self.count.ravel(), key[step], 1)
+
+        # 기호별 가장 늦은 시각 (key 묶음의 마지막 원소)
+        tail = np.ones(key.size, dtype=bool)
+        tail[:-1] = key[1:] != key[:-1]
+        last = self.last.ravel()
+        last[key[tail]] = np.maximum(last[key[tail]], t[tail])
+
+        # 기호별 가장 이른 시각 (key 정렬 안에서 t 오름차순 → 첫 원소)
+        head = np.ones(key.size, dtype=bool)
+        head[1:] = key[1:] != key[:-1]
+        key, t = key[head], t[head]
+        first = self.first.ravel()
+        new = np.isinf(first[key])
+        first[key] = np.minimum(first[key], t)
+        if not new.any():
+            return []
+        key, t = key[new], t[new]
+
+        out = []
+        for k in np.lexsort((key % S, t)):
+            bb, ss = divmod(int(key[k]), S)
+            self.tokens[bb].append((self.symbols[ss], float(t[k])))
+            out.append((bb, self.symbols[ss], float(t[k])))
+        return out
+
+    def listener(self, layer, stop=None, callback=None):
+        """
+        Network.run(stop=...) 용 콜백: 매 스텝 layer.spikes 해독
+
+        Parameters
+        ----------
+        stop : callable | None
+            함께 검사할 종료 조건 stop(net)
+        callback : callable | None
+            새 토큰이 있으면 callback(tokens) 호출 (대화형 출력 등)
+        """
+        def _listen(net):
+            tokens = self.feed(net.t - net.dt, layer.spikes)
+            if tokens and callback is not None:
+                callback(tokens)
+            return False if stop is None else stop(net)
+        return _listen
+
+    # ------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------
+    def first_spikes(self, b=0):
+        """{symbol: 첫 발화 시각} (발화한 기호만)"""
+        return {sym: t for sym, t in self.tokens[b]}
+
+    def spike_counts(self, b=0):
+        """{symbol: 그룹이 발화한 스텝 수} (모든 기호)"""
+        return dict(zip(self.symbols, self.count[b].tolist()))
+
+    def sequence(self, b=0):
+        """첫 발화 순서의 기호 목록"""
+        return [sym for sym, _ in self.tokens[b]]
+
+    def waves(self, b=0, tol=0.0):
+        """
+        첫 발화 시각이 tol 이내인 토큰 묶음 (병렬 분기 출력)
+
+        Returns
+        -------
+        list of (t, [symbol, ...])
+            묶음 첫 시각과 기호 목록
+        """
+        out = []
+        for sym, t in self.tokens[b]:
+            if out and t - out[-1][0] <= tol:
+                out[-1][1].append(sym)
+            else:
+                out.append((t, [sym]))
+        return out
+
+    def completed(self, words, b=0):
+        """
+        모든 기호가 첫 발화 시각 순서대로 발화한 단어 목록 (hippo_words 판정,
+        반복 기호는 in_order 참고)
+
+        words : dict {word: [symbol, ...]} 또는 기호 시퀀스 목록 (문자열 가능)
+        """
+        items = words.items() if isinstance(words, dict) else ((w, w) for w in words)
+        out = []
+        for word, letters in items:
+            ks = [self.index.get(sym) for sym in letters]
+            if None not in ks and self.in_order(ks, b):
+                out.append(word)
+        return out
+
+    def in_order(self, ks, b=0):
+        """
+        기호 id 시퀀스 ks 가 순서대로 발화했는지
+
+        연속 반복 (BOOK 의 O, O) 은 한 번으로 취급 (VocabGraph 도 자기 전이를
+        만들지 않음). 떨어진 반복 (ABA 의 두 번째 A) 은 앞 기호 이후 다시
+        발화해야 하므로 그 기호의 마지막 발화 시각으로 비교.
+        """
+        prev, seen, k_prev = -np.inf, set(), None
+        for k in ks:
+            if k == k_prev:
+                continue
+            t = self.last[b, k] if k in seen else self.first[b, k]
+            if not (np.isfinite(t) and t > prev):
+                return False
+            prev, k_prev = t, k
+            seen.add(k)
+        return True
+
+
+# =============================================================
+# 24. recall_query.py — 조기 종료 recall 질의 (settle 감지)
+# =============================================================
+# 목적:
+#   • 실험의 recall 은 cue 마다 고정 시간(T_test = 60 ms) 을 끝까지 적분한 뒤
+#     spike 기록을 훑어 완성된 단어를 판정 → 대부분이 죽은 시간
+#   • Network.run(stop=...) 으로 매 스텝 발화를 바로 기호로 해독하고
+#       - cue 로 시작하는 어휘 단어의 모든 기호가 순서대로 발화했고
+#         그 단어를 접두사로 갖는 더 긴 후보가 없으면 (완성)
+#       - silence_ms 동안 발화가 없으면 (settle)
+#     즉시 종료 → 해독 서열 + 완성 단어 + 지연 시간 반환
+#   • 배치 네트워크면 배치 원소마다 다른 cue 를 동시에 질의
+# =============================================================
+
+
+class RecallQuery:
+    """
+    PHAM RecallQuery — cue 기호 → 완성 서열 (온라인 해독 + 조기 종료)
+    -----------------------------------------------------------
+    • SpikeDecoder 로 매 스텝 발화를 O(spikes) 로 해독 (첫 발화 순서 = 해독 서열)
+    • 완성 = 후보 단어의 모든 기호 발화 + 첫 발화 시각 순서 일치 (hippo_words 기준)
+    • status : "complete" (단어 완성) | "silent" (settle) | "timeout" (max_ms)
+    -----------------------------------------------------------
+
+    사용 예시
+    ----------
+    >>> recall = RecallQuery(net, graph, max_ms=60.0, silence_ms=10.0)
+    >>> r = recall.query("C")
+    >>> r["word"], r["latency_ms"], r["status"]
+    ('CAT', 21.3, 'complete')
+    >>> [r["word"] for r in recall.query_batch(["C", "D", "B"])]   # batch 네트워크
+    """
+
+    def __init__(self, net, graph, layer=None, cue_start_ms=1.0, cue_width_ms=4.0,
+                 cue_spacing_ms=15.0, amplitude=300.0, max_ms=60.0, silence_ms=10.0,
+                 reset=True):
+        """
+        Parameters
+        ----------
+        net : Network
+        graph : VocabGraph
+            어휘/기호 그룹 (graph.groups 의 뉴런 인덱스는 layer 기준)
+        layer : str | None
+            해독할 레이어 (None 이면 graph 가 연결된 projection 의 레이어)
+        cue_start_ms, cue_width_ms, cue_spacing_ms, amplitude : float
+            cue 기호 i 자극 구간 [start + i·spacing, start + i·spacing + width), 세기
+            (기본: 실험의 1–5 ms, 300)
+        max_ms : float
+            질의당 최대 시뮬레이션 시간
+        silence_ms : float
+            마지막 발화 (또는 cue 끝) 이후 이 시간 동안 발화가 없으면 종료
+        reset : bool
+            질의마다 net.reset() (실험의 recall 전 Reset 블록)
+        """
+        if layer is None:
+            if graph.projection is None:
+                raise ValueError("graph is not connected; pass layer explicitly")
+            layer = graph.projection.pre.name
+        self.net = net
+        self.graph = graph
+        self.layer = net.layers[layer]
+        self.cue_start = float(cue_start_ms)
+        self.cue_width = float(cue_width_ms)
+        self.cue_spacing = float(cue_spacing_ms)
+        self.amplitude = float(amplitude)
+        self.max_ms = float(max_ms)
+        self.silence = float(silence_ms)
+        self.reset = bool(reset)
+
+        self.decoder = SpikeDecoder(graph.groups, self.layer.N, self.layer.batch)
+        sym_id = self.decoder.index
+
+        # 완성 판정: 어휘 단어 (기호 id tuple), 첫 기호별 후보, 더 긴 단어의 접두사
+        self.word_of = {}
+        self.by_first = {}
+        self.prefixes = set()
+        for word, letters in graph.words.items():
+            ids = tuple(sym_id[sym] for sym in letters)
+            if ids in self.word_of:
+                continue
+            self.word_of[ids] = word
+            self.by_first.setdefault(ids[0], []).append(ids)
+            self.prefixes.update(ids[:n] for n in range(1, len(ids)))
+
+    @staticmethod
+    def _cue(cue):
+        """cue → 기호 목록 (문자열이면 글자 단위)"""
+        return list(cue)
+
+    # ------------------------------------------------------------
+    # 질의
+    # ------------------------------------------------------------
+    def query(self, cue):
+        """cue 하나 질의 (배치 네트워크면 모든 배치 원소에 같은 cue)"""
+        if self.net.batch is None:
+            return self.query_batch([cue])[0]
+        return self.query_batch([cue] * self.net.batch)[0]
+
+    def query_batch(self, cues):
+        """
+        배치 원소 b 에 cues[b] 를 동시에 질의 (모두 끝나면 종료)
+
+        Returns
+        -------
+        list of dict
+            cue, sequence (해독 기호 목록, 첫 발화 순), times (기호별 첫 발화 시각 [ms]),
+            word (완성된 가장 긴 후보 단어 | None), complete,
+            latency_ms (cue 시작 → 종료 판정), status ("complete" | "silent" | "timeout")
+        """
+        net, L = self.net, self.layer
+        B = 1 if net.batch is None else net.batch
+        cues = [self._cue(c) for c in cues]
+        n = len(cues)
+        if n > B:
+            raise ValueError(f"{n} cues for batch size {B}")
+
+        if self.reset:
+            net.reset()
+        t0 = net.t
+        sched = StimulusSchedule()
+        last = np.full(n, t0)                 # 마지막 발화 (처음엔 cue 끝) 시각
+        for b, cue in enumerate(cues):
+            for i, sym in enumerate(cue):
+                start = t0 + self.cue_start + i * self.cue_spacing
+                sched.add(L.name, self.graph.groups[sym], start, start + self.cue_width,
+                          self.amplitude, batch=None if net.batch is None else b)
+                last[b] = max(last[b], start + self.cue_width)
+
+        # cue 로 시작하는 후보 단어 (기호 id tuple)
+        cands = []
+        for cue in cues:
+            ids = tuple(self.decoder.index[sym] for sym in cue)
+            cands.append([w for w in self.by_first.get(ids[0], ()) if w[:len(ids)] == ids]
+                         if ids else [])
+        dec = self.decoder
+        dec.reset()
+        running = np.zeros(B, dtype=bool)     # 끝난 배치 원소는 해독 고정
+        running[:n] = True
+        best = [None] * n                     # 완성된 가장 긴 후보
+        status = [None] * n
+        t_stop = np.full(n, np.nan)
+
+        def monitor(net):
+            t = net.t - net.dt                # 방금 적분한 스텝 시각
+            spikes = L.spikes.reshape(-1, L.N)
+            fired = running & spikes.any(axis=1)
+            if fired.any():
+                last[fired[:n]] = np.maximum(last[fired[:n]], t)
+                for b in {bb for bb, _, _ in dec.feed(t, spikes, where=running)}:
+                    for word in cands[b]:
+                        if (best[b] is None or len(word) > len(best[b])) and dec.in_order(word, b):
+                            best[b] = word
+                    if best[b] is not None and best[b] not in self.prefixes:
+                        status[b], t_stop[b] = "complete", t
+                        running[b] = False
+            for b in range(n):
+                if status[b] is None and net.t - last[b] >= self.silence:
+                    status[b], t_stop[b] = "silent", last[b] + self.silence
+                    running[b] = False
+            return not running.any()
+
+        net.run(self.max_ms, stimulus=sched, t0=t0, plasticity=False, jump=True, stop=monitor)
+
+        t_end = t0 + self.max_ms
+        out = []
+        for b in range(n):
+            st = status[b]
+            if st is None:
+                # 끝 구간을 점프로 건너뛴 경우 → 조용해진 시점으로 settle 판정
+                quiet_at = last[b] + self.silence
+                st = "silent" if quiet_at <= t_end + 1e-9 else "timeout"
+                t_stop[b] = min(quiet_at, t_end)
+            word = None if best[b] is None else self.word_of[best[b]]
+            out.append({
+                "cue": cues[b],
+                "sequence": dec.sequence(b),
+                "word": word,
+                "complete": word is not None,
+                "times": [t - t0 for _, t in dec.tokens[b]],
+                "latency_ms": float(t_stop[b] - t0 - self.cue_start),
+                "status": st,
+            })
+        return out
+
+
+# =============================================================
+# 25. lateral_inhibition.py — 측면 억제 / k-WTA 경쟁
+# =============================================================
+# 목적:
+#   • hippo_branching 은 뉴런 루프 안에서 T/R 그룹 평균 시냅스 전류를 비교해
+#     winner_group 을 정하고 패자 뉴런마다 -1000 을 더함 (뉴런별 Python 분기)
+#   • hippo_ultimate 의 DG 희소 코딩은 DGNeuron.step 의 스칼라 역치뿐이라
+#     활성 비율이 입력 세기에 따라 0% ~ 100% 로 흔들림
+#   • 레이어 전류/전압 배열 전체에서 한 번에 경쟁을 계산:
+#       - k-WTA   : 경쟁 단위 (뉴런 또는 뉴런 그룹) 점수 상위 k 만 통과
+#                   (np.argpartition → 단위 수에 O(U), 정렬 없음)
+#       - 억제 풀 : 직전 발화 수만큼 쌓이고 τ 로 감쇠하는 억제 전류
+#                   (global: 모든 뉴런, lateral: 발화하지 않은 다른 그룹)
+#   • NeuronLayer(inhibition=...) 로 붙이면 Network.step 이 매 스텝 적용
+#     (input_threshold 다음, soma step 직전). 객체 뉴런 루프에서는
+#     apply()/observe() 를 직접 호출해 같은 경쟁을 사용
+# =============================================================
+
+
+class LateralInhibition:
+    """
+    PHAM LateralInhibition — 배열 기반 측면 억제 (k-WTA + 억제 풀)
+    -----------------------------------------------------------
+    • apply(I, V)      : 이번 스텝 입력 전류에 경쟁 적용 (soma step 직전)
+    • observe(dt, sp)  : 발화 수로 억제 풀 갱신 (soma step 직후)
+    • 단위 점수 = 평균 입력 전류 (score="input") 또는 평균 막전위 ("V")
+    • 점수 > threshold 인 단위 중 상위 k 가 승자. 패자 뉴런은
+      inhibition=None 이면 입력 차단 (DG), 값이면 그 전류를 더함 (-1000)
+    • latch=True 면 처음 결정된 승자를 reset() 까지 유지 (hippo_branching)
+    -----------------------------------------------------------
+
+    사용 예시
+    ----------
+    >>> # DG 4000 개 중 입력이 가장 강한 2% 만 통과 (희소 코딩)
+    >>> net.add_layer("DG", 4000, inhibition=dict(k=80))
+    >>> # hippo_branching: C 다음 T/R 중 먼저 강해진 쪽만 남기고 다른 쪽 억제
+    >>> wta = LateralInhibition(N, groups=[t_neurons, r_neurons], k=1,
+    ...                         threshold=1.0, inhibition=-1000.0, latch=True)
+    >>> I = wta.apply(I_ext + I_syn)
+    """
+
+    STATE_FIELDS = ("win", "decided", "g")
+
+    def __init__(self, N, groups=None, k=None, threshold=0.0, score="input",
+                 inhibition=None, latch=False,
+                 pool_gain=0.0, pool_tau_ms=5.0, pool="global",
+                 batch=None):
+        """
+        Parameters
+        ----------
+        N : int
+            레이어 뉴런 수
+        groups : list of array-like | None
+            경쟁 단위 (서로 겹치지 않는 뉴런 인덱스 목록). None 이면
+            뉴런 하나가 한 단위. 어느 그룹에도 없는 뉴런은 경쟁 밖
+        k : int | None
+            단위별 승자 수 (None 이면 k-WTA 없이 억제 풀만)
+        threshold : float
+            점수가 이 값 이하인 단위는 승자가 될 수 없음
+            (이기는 단위가 하나도 없는 배치 원소는 경쟁 없음)
+        score : {"input", "V"}
+            단위 점수 — 평균 입력 전류 또는 평균 막전위
+        inhibition : float | None
+            패자 뉴런에 더할 전류. None 이면 패자 입력을 0 으로 차단
+        latch : bool
+            True 면 배치 원소별로 처음 정해진 승자를 reset() 까지 유지
+        pool_gain : float
+            억제 풀 이득 — 발화 1회당 쌓이는 억제 전류 (0 이면 풀 없음)
+        pool_tau_ms : float
+            억제 풀 감쇠 시상수 [ms]
+        pool : {"global", "lateral"}
+            global: 전체 발화 → 모든 뉴런 억제,
+            lateral: 단위별 풀 → 다른 단위만 억제 (자기 억제 없음)
+        batch : int | None
+            배치 크기 B (상태 배열이 (B, ...) 가 됨)
+        """
+        if score not in ("input", "V"):
+            raise ValueError(f"unknown score: {score!r}")
+        if pool not in ("global", "lateral"):
+            raise ValueError(f"unknown pool: {pool!r}")
+        self.N = int(N)
+        self.batch = None if batch is None else int(batch)
+        self.shape = (self.N,) if batch is None else (self.batch, self.N)
+        lead = self.shape[:-1]
+
+        # 뉴런 → 단위 (-1: 경쟁 밖)
+        if groups is None:
+            self.members = None
+            self.n_units = self.N
+            self.unit_of = np.arange(self.N)
+        else:
+            idx = [np.asarray(g, dtype=np.intp).ravel() for g in groups]
+            if any(g.size == 0 for g in idx):
+                raise ValueError("empty inhibition group")
+            self.members = np.concatenate(idx)
+            if np.unique(self.members).size != self.members.size:
+                raise ValueError("inhibition groups must not overlap")
+            self.sizes = np.array([g.size for g in idx], dtype=float)
+            self.starts = np.concatenate(([0], np.cumsum([g.size for g in idx])[:-1]))
+            self.n_units = len(idx)
+            self.unit_of = np.full(self.N, -1, dtype=np.intp)
+            self.unit_of[self.members] = np.repeat(np.arange(self.n_units), [g.size for g in idx])
+        self.grouped = self.unit_of >= 0
+        self._unit = np.maximum(self.unit_of, 0)
+
+        self.k = None if k is None else int(k)
+        if self.k is not None and self.k < 1:
+            raise ValueError(f"k must be >= 1, got {k}")
+        self.threshold = float(threshold)
+        self.score = score
+        self.inhibition = None if inhibition is None else float(inhibition)
+        self.latch = bool(latch)
+        self.pool_gain = float(pool_gain)
+        self.pool_tau = float(pool_tau_ms)
+        self.pool = pool
+
+        self.win = np.zeros(lead + (self.n_units,), dtype=bool)
+        self.decided = np.zeros(lead, dtype=bool)
+        self.g = np.zeros(lead + ((1,) if pool == "global" else (self.n_units,)))
+
+    def reset(self):
+        """승자/억제 풀 초기화 (trial 시작)"""
+        self.win[...] = False
+        self.decided[...] = False
+        self.g[...] = 0.0
+
+    def state_dict(self):
+        return {k: getattr(self, k).copy() for k in self.STATE_FIELDS}
+
+    def load_state_dict(self, state):
+        _load_fields(self, state, self.STATE_FIELDS)
+
+    # ------------------------------------------------------------
+    # 경쟁
+    # ------------------------------------------------------------
+    def _unit_mean(self, x):
+        """뉴런 배열 (..., N) → 단위 평균 (..., U)"""
+        if self.members is None:
+            return x
+        return np.add.reduceat(x[..., self.members], self.starts, axis=-1) / self.sizes
+
+    def select(self, I, V=None):
+        """
+        이번 스텝 승자 단위 (latch 와 무관한 순수 선택)
+
+        Returns
+        -------
+        win : ndarray[bool] (..., U)
+        active : ndarray[bool] (...)
+            승자가 하나라도 있는 배치 원소
+        """
+        if self.score == "V":
+            if V is None:
+                raise ValueError("score='V' needs the membrane potential")
+            x = V
+        else:
+            x = I
+        s = self._unit_mean(np.broadcast_to(np.asarray(x, dtype=float), self.shape))
+        win = s > self.threshold
+        if self.k is not None and self.k < self.n_units:
+            top = np.argpartition(-s, self.k - 1, axis=-1)[..., :self.k]
+            keep = np.zeros(s.shape, dtype=bool)
+            np.put_along_axis(keep, top, True, axis=-1)
+            win &= keep
+        return win, win.any(axis=-1)
+
+    def losers(self, I, V=None):
+        """억제할 뉴런 mask (..., N) (경쟁이 없거나 k=None 이면 None)"""
+        if self.k is None:
+            return None
+        if self.latch:
+            open_ = ~self.decided
+            if open_.any():
+                win, active = self.select(I, V)
+                new = open_ & active
+                self.win[new] = win[new]
+                self.decided |= new
+            active = self.decided
+        else:
+            self.win, active = self.select(I, V)
+        if not active.any():
+            return None
+        return self.grouped & ~self.win[..., self._unit] & active[..., None]
+
+    def pool_current(self):
+        """억제 풀 전류 (..., N) (양수 = 억제량)"""
+        if self.pool == "global":
+            return np.broadcast_to(self.g, self.shape)
+        inh = self.g.sum(axis=-1, keepdims=True) - self.g
+        return inh[..., self._unit] * self.grouped
+
+    def apply(self, I, V=None):
+        """
+        입력 전류에 k-WTA / 억제 풀 적용
+
+        Parameters
+        ----------
+        I : float | ndarray (N,) | (B, N)
+            soma 에 넘길 전류 (I_ext + I_syn)
+        V : ndarray | None
+            막전위 (score="V" 일 때)
+
+        Returns
+        -------
+        I : ndarray  (경쟁이 없으면 입력 그대로)
+        """
+        if self.k is not None:
+            lose = self.losers(I, V)
+            if lose is not None:
+                I = np.broadcast_to(np.asarray(I, dtype=float), self.shape)
+                I = np.where(lose, 0.0 if self.inhibition is None else I + self.inhibition, I)
+        if self.pool_gain > 0.0 and self.g.any():
+            I = I - self.pool_current()
+        return I
+
+    def observe(self, dt, spikes):
+        """이번 스텝 발화로 억제 풀 갱신: g ← g·e^(−dt/τ) + gain·(발화 수)"""
+        if self.pool_gain <= 0.0:
+            return
+        sp = np.asarray(spikes, dtype=float)
+        if self.pool == "global":
+            n = sp.sum(axis=-1, keepdims=True)
+        else:
+            n = self._unit_mean(sp) * (1.0 if self.members is None else self.sizes)
+        self.g *= np.exp(-dt / self.pool_tau)
+        self.g += self.pool_gain * n
+
+    # ------------------------------------------------------------
+    # next-event 점프 (Network._quiet / _skip)
+    # ------------------------------------------------------------
+    def quiet(self):
+        """이후 조용한 입력에 전류를 더하지 않는지 (시간 점프 가능 여부)"""
+        if self.k is not None and self.inhibition is not None:
+            if self.latch and self.decided.any():
+                return False
+            if not self.latch and self.threshold < 0.001:
+                return False
+        return self.pool_gain <= 0.0 or float(self.g.sum(axis=-1).max()) <= 0.001
+
+    def skip(self, n, dt):
+        """발화 없는 n 스텝 동안의 억제 풀 감쇠"""
+        if self.pool_gain > 0.0:
+            self.g *= np.exp(-n * dt / self.pool_tau)
+
+
+# =============================================================
+# 26. axon_bundle.py — 다중 축삭 다발 (A×N 벡터화 도약전도)
+# =============================================================
+# 목적:
+#   • MyelinatedAxon 은 120 구획 케이블 하나, run_pipeline 도 축삭 하나만 보유
+#     → DG→CA3 투사 전체의 전도를 보려면 축삭 수만큼 Python 객체 루프
+#   • V / m_node / h_node 를 (A, N) 배열로 두고 모든 축삭을 한 스텝에 진행
+#   • 축삭별 파라미터: node_period, D_node / D_internode, gNa, ATP_level
+#   • 노드 임계 통과 기록은 (A, K) 배열 mask 갱신 (_record_crossings 루프 제거),
+#     속도는 통과 시각 배열에서 축삭별로 한 번에 계산
+#
+# Solver (CONFIG["SOLVER"]["AXON"], MyelinatedAxon 과 같은 식):
+#   • "cfl_euler" : 전체 다발 공통 CFL 서브스텝 (가장 큰 D 기준)
+#   • "cn"        : node_period 가 같은 축삭 묶음마다 사전 분해 행렬을
+#                   (D 도 같으면 공유 → GEMM 한 번, 다르면 축삭별로 쌓아 배치 matvec),
+#                   노드 대각 Woodbury 보정은 축삭별 K×K 배치 solve.
+#                   Lambda ≠ 0 (c_t 가 매 스텝 바뀜) 이면 사전 분해 대신 축삭 축
+#                   벡터화 Thomas 삼중대각 solve. dt_elec ≤ cn_dt_max (MyelinatedAxon)
+# =============================================================
+
+
+class MyelinatedAxonBundle:
+    """
+    PHAM MyelinatedAxonBundle — A 개 유수축삭 다발 (벡터화)
+    -----------------------------------------------------------
+    • step(dt, t, I0, soma_V)  : 모든 축삭 한 스텝 (I0/soma_V 는 스칼라 또는 (A,))
+    • trigger_alpha(t, axons)  : 소마 spike → 해당 축삭 α-펄스
+    • first_cross_ms (A, K)    : 노드별 첫 임계 통과 시각 (NaN: 미통과/패딩)
+    • velocity()               : 축삭별 평균 전도속도 (MyelinatedAxon.velocity_last)
+    • 같은 파라미터/구동이면 축삭 a 는 MyelinatedAxon 한 개와 같은 결과
+    -----------------------------------------------------------
+
+    사용 예시
+    ----------
+    >>> bundle = MyelinatedAxonBundle(CONFIG["AXON"], 200,
+    ...                               node_period=rng.choice([4, 5, 6], 200),
+    ...                               ATP_level=rng.uniform(60, 120, 200))
+    >>> for k in range(steps):
+    ...     sp = somas.step(dt, I)                   # HHSomaQuickPopulation (200,)
+    ...     bundle.trigger_alpha(k * dt, np.flatnonzero(sp))
+    ...     I0 = CONFIG["AXON"]["stim_gain"] * (somas.V - bundle.V[:, 0])
+    ...     bundle.step(dt, k * dt, I0, somas.V)
+    >>> bundle.velocity()                            # (200,) m/s
+    """
+
+    def __init__(self, cfg, n_axons, node_period=None, D_node=None, D_internode=None,
+                 node_gNa=800.0, ATP_level=None, alpha=None):
+        """
+        Parameters
+        ----------
+        cfg : dict
+            CONFIG["AXON"] 형식 (N, dx, Cm/gL, 게이트, coupling ...)
+        n_axons : int
+            축삭 수 A
+        node_period, D_node, D_internode, node_gNa, ATP_level : scalar | array (A,)
+            축삭별 파라미터 (None 이면 cfg 값, ATP_level=None 이면 ATP 조절 없음).
+            node_gNa 기본 800 은 MyelinatedAxon 과 같음
+        alpha : dict | None
+            α-펄스 {I0, tau_r, tau_d} (None 이면 I0=0)
+        """
+        A = int(n_axons)
+        self.A = A
+        self.N = int(cfg["N"])
+
+        def per_axon(x, default, dtype=float):
+            return np.array(np.broadcast_to(np.asarray(default if x is None else x, dtype), (A,)))
+
+        self.node_period = per_axon(node_period, cfg["node_period"], int)
+        self.D_node = per_axon(D_node, cfg["D_node"])
+        self.D_internode = per_axon(D_internode, cfg["D_internode"])
+        self.node_gNa = per_axon(node_gNa, 800.0)
+        self.ATP_level = None if ATP_level is None else per_axon(ATP_level, 0.0)
+
+        self.Vrest = cfg["Vrest"]
+        self.dx = cfg["dx"]
+        self.cfl_safety = cfg["cfl_safety"]
+        self.Cm_node, self.Cm_myelin = cfg["Cm_node"], cfg["Cm_myelin"]
+        self.gL_node, self.gL_myelin = cfg["gL_node"], cfg["gL_myelin"]
+        self.EL = cfg["EL"]
+        self.thresh = cfg["thresh"]
+        self.coupling = cfg["coupling"]
+        self.node_ENa = cfg["node_ENa"]
+        self.m_tau, self.h_tau = cfg["node_m_tau"], cfg["node_h_tau"]
+        self.m_inf_k, self.m_inf_Vh = cfg["node_m_inf_k"], cfg["node_m_inf_Vh"]
+        self.h_inf_k, self.h_inf_Vh = cfg["node_h_inf_k"], cfg["node_h_inf_Vh"]
+        self.c0 = cfg.get("c0", 1.0)
+        self.Lambda = cfg.get("Lambda", 0.0)
+        self.gamma_extra = cfg.get("gamma_decay", 0.0)
+        self.cn_theta = cfg.get("cn_theta", 0.5)
+        self.cn_dt_max = cfg.get("cn_dt_max", 0.025)
+
+        alpha = {} if alpha is None else alpha
+        self.alpha_I0 = alpha.get("I0", 0.0)
+        self.alpha_tr = alpha.get("tau_r", 0.5)
+        self.alpha_td = alpha.get("tau_d", 3.0)
+
+        # 노드 배치: (A, N) mask + 축삭별 노드 열 (A, K) (K 보다 적으면 패딩)
+        cols = np.arange(self.N)
+        self.IS_NODE = cols[None, :] % self.node_period[:, None] == 0
+        K = int(np.max(-(-self.N // self.node_period)))
+        node_cols = self.node_period[:, None] * np.arange(K)[None, :]
+        self.node_valid = node_cols < self.N
+        self.node_cols = np.where(self.node_valid, node_cols, 0)
+
+        self.D_x = np.where(self.IS_NODE, self.D_node[:, None], self.D_internode[:, None])
+        self.Cm_x = np.where(self.IS_NODE, self.Cm_node, self.Cm_myelin)
+        self.gL_x = np.where(self.IS_NODE, self.gL_node, self.gL_myelin)
+
+        # CN: node_period 가 같은 축삭 묶음 (노드 수 K 가 같음)
+        self._groups = [(np.flatnonzero(self.node_period == period), np.arange(0, self.N, period))
+                        for period in np.unique(self.node_period).tolist()]
+        self._cn = None
+
+        self.reset()
+
+    def reset(self):
+        """막전위/게이트/통과 기록/α-펄스 초기화"""
+        self.V = np.full((self.A, self.N), self.Vrest, dtype=float)
+        self.m_node = np.where(self.IS_NODE, 0.05, 0.0)
+        self.h_node = np.where(self.IS_NODE, 0.60, 0.0)
+        self.first_cross_ms = np.full(self.node_cols.shape, np.nan)
+        # α-펄스 재귀 상태 (축삭별, MyelinatedAxon._alpha_kernel 과 같은 방식)
+        self.alpha_d = np.zeros(self.A)
+        self.alpha_r = np.zeros(self.A)
+        self.alpha_t = 0.0
+        self.alpha_pending = []                   # [(t, 순번, axons)] 시각순
+        self._n_pending = 0
+
+    # ---------------------------------------------------------
+    # 구동
+    # ---------------------------------------------------------
+    _sigmoid = staticmethod(MyelinatedAxon._sigmoid)
+
+    def _node_m_inf(self, V):
+        return self._sigmoid((V - self.m_inf_Vh) / self.m_inf_k)
+
+    def _node_h_inf(self, V):
+        return self._sigmoid((V - self.h_inf_Vh) / self.h_inf_k)
+
+    def _node_gNa_eff(self):
+        """축삭별 ATP-dependent Na+ 전도도 (A,) (MyelinatedAxon._node_gNa_eff)"""
+        if self.ATP_level is None:
+            return self.node_gNa
+        return self.node_gNa * (1.0 + 0.25 * np.tanh((self.ATP_level - 100.0) / 50.0))
+
+    def trigger_alpha(self, t_ms, axons=None):
+        """소마 spike → 재귀 α 상태에 합류 (axons=None 이면 모든 축삭)"""
+        axons = slice(None) if axons is None else np.asarray(axons, dtype=np.intp)
+        t0 = float(t_ms)
+        if t0 <= self.alpha_t:
+            np.add.at(self.alpha_d, axons, math.exp(-(self.alpha_t - t0) / self.alpha_td))
+            np.add.at(self.alpha_r, axons, math.exp(-(self.alpha_t - t0) / self.alpha_tr))
+        else:
+            self._n_pending += 1
+            bisect.insort(self.alpha_pending, (t0, self._n_pending, axons))
+
+    def _alpha_advance(self, t_ms):
+        dt = t_ms - self.alpha_t
+        if dt > 0.0:
+            self.alpha_d *= math.exp(-dt / self.alpha_td)
+            self.alpha_r *= math.exp(-dt / self.alpha_tr)
+            self.alpha_t = t_ms
+
+    def _alpha_drive(self, t_ms):
+        """축삭별 I_α(t) = I₀[Σ exp(−Δt/τ_d) − exp(−Δt/τ_r)]₊ (A,) — 재귀 O(A)"""
+        if self.alpha_I0 == 0.0:
+            return np.zeros(self.A)
+        while self.alpha_pending and self.alpha_pending[0][0] <= t_ms:
+            t0, _, axons = self.alpha_pending.pop(0)
+            self._alpha_advance(t0)
+            np.add.at(self.alpha_d, axons, 1.0)
+            np.add.at(self.alpha_r, axons, 1.0)
+        self._alpha_advance(t_ms)
+        back = self.alpha_t - t_ms
+        val = (self.alpha_d * math.exp(back / self.alpha_td)
+               - self.alpha_r * math.exp(back / self.alpha_tr))
+        return np.maximum(0.0, val) * self.alpha_I0
+
+    def _record_crossings(self, t_ms):
+        """아직 통과하지 않은 노드 중 V ≥ thresh 인 곳에 t_ms 기록"""
+        V_nodes = np.take_along_axis(self.V, self.node_cols, axis=1)
+        hit = np.isnan(self.first_cross_ms) & self.node_valid & (V_nodes >= self.thresh)
+        self.first_cross_ms[hit] = t_ms
+
+    # ---------------------------------------------------------
+    # 메인 전도 스텝
+    # ---------------------------------------------------------
+    def step(self, dt_elec, t_ms, I0_from_soma, soma_V):
+        """모든 축삭 한 시점 전도 계산 (I0_from_soma, soma_V: 스칼라 또는 (A,))"""
+        I0 = np.broadcast_to(np.asarray(I0_from_soma, dtype=float), (self.A,))
+        sV = np.broadcast_to(np.asarray(soma_V, dtype=float), (self.A,))
+        I_alpha = self._alpha_drive(t_ms)
+        if CONFIG["SOLVER"]["AXON"] == "cn":
+            self._step_cn(dt_elec, t_ms, I0, sV, I_alpha)
+            return
+
+        Dmax = max(self.D_node.max(), self.D_internode.max())
+        dt_cfl = self.cfl_safety * (self.dx ** 2) / (2.0 * Dmax)
+        n_sub = max(1, int(np.ceil(dt_elec / max(1e-12, dt_cfl))))
+        dt_sub = dt_elec / n_sub
+        nodes = self.IS_NODE
+        gNa = np.broadcast_to(self._node_gNa_eff(), (self.A,))[:, None]
+        D_eff = self.c0 * np.exp(-self.Lambda * t_ms) * self.D_x
+        Cm, gL = self.Cm_x, self.gL_x
+        dx2 = self.dx ** 2
+        lap = np.zeros_like(self.V)
+        I_ext = np.zeros_like(self.V)
+
+        for _ in range(n_sub):
+            Vi = self.V[nodes]
+            self.m_node[nodes] += dt_sub * (self._node_m_inf(Vi) - self.m_node[nodes]) / self.m_tau
+            self.h_node[nodes] += dt_sub * (self._node_h_inf(Vi) - self.h_node[nodes]) / self.h_tau
+            np.clip(self.m_node, 0.0, 1.0, out=self.m_node)
+            np.clip(self.h_node, 0.0, 1.0, out=self.h_node)
+
+            I_Na = gNa * (self.m_node ** 3) * self.h_node * (self.node_ENa - self.V)
+            I_ext[:, 0] = I0 + self.coupling * (sV - self.V[:, 0]) + I_alpha
+
+            V = self.V
+            lap[:, 1:-1] = (V[:, :-2] - 2 * V[:, 1:-1] + V[:, 2:]) / dx2
+            lap[:, 0] = 2.0 * (V[:, 1] - V[:, 0]) / dx2
+            lap[:, -1] = 2.0 * (V[:, -2] - V[:, -1]) / dx2
+
+            extra_decay = -self.gamma_extra * (V - self.Vrest)
+            dVdt = D_eff * lap - gL * (V - self.EL) / Cm + (I_ext + I_Na) / Cm + extra_decay
+            self.V = np.clip(V + dt_sub * dVdt, -90.0, 50.0)
+            self._record_crossings(t_ms)
+
+    def _cn_operators(self, dt, c_t):
+        """
+        노드 간격 묶음별 (P, q, MU, C) — (node_period, D) 가 같은 축삭은 한 번만 분해.
+        묶음 안 축삭이 모두 같은 D 이면 2-D 행렬, 아니면 축삭별로 쌓은 3-D 배열
+        """
+        key = (float(dt), float(c_t), self.cn_theta, self.gamma_extra)
+        if self._cn is not None and self._cn[0] == key:
+            return self._cn[1]
+        ops = []
+        for sel, idx in self._groups:
+            built, per_axon = {}, []
+            for a in sel:
+                kind = (self.D_node[a], self.D_internode[a])
+                if kind not in built:
+                    built[kind] = _cable_operator(
+                        self.D_x[a], self.Cm_x[a], self.gL_x[a], self.dx, self.EL, self.Vrest,
+                        self.gamma_extra, dt, c_t, self.cn_theta, idx)
+                per_axon.append(built[kind])
+            if all(op is per_axon[0] for op in per_axon):
+                ops.append(per_axon[0])
+            else:
+                ops.append(tuple(np.stack(parts) for parts in zip(*per_axon)))
+        self._cn = (key, ops)
+        return ops
+
+    def _step_cn(self, dt, t_ms, I0, soma_V, I_alpha):
+        """
+        MyelinatedAxon._step_cn 의 다발 버전 — 노드 간격 묶음마다 전파 행렬 곱
+        (공유: V @ Pᵀ, 축삭별: 배치 matvec), 노드 대각 보정은 축삭별 K×K 배치 solve.
+        Lambda ≠ 0 이면 c_t 가 매 스텝 바뀌어 사전 분해를 재사용할 수 없으므로
+        묶음마다 삼중대각 띠를 만들어 배치 Thomas solve (O(A·N), 재분해 없음)
+        """
+        if dt > self.cn_dt_max:
+            raise ValueError(f"cn axon solver validated for dt_elec <= {self.cn_dt_max} ms "
+                             f"(got {dt}); use cfl_euler or raise cfg['cn_dt_max']")
+        c_t = self.c0 * np.exp(-self.Lambda * t_ms)
+        th = self.cn_theta
+        gNa = np.broadcast_to(self._node_gNa_eff(), (self.A,))
+
+        def mul(M, x):
+            """M (R, C) 공유 또는 (a, R, C) 축삭별 · x (a, C) → (a, R)"""
+            return x @ M.T if M.ndim == 2 else np.matmul(M, x[:, :, None])[:, :, 0]
+
+        banded = self.Lambda != 0.0
+        ops = [None] * len(self._groups) if banded else self._cn_operators(dt, c_t)
+        for (sel, idx), op in zip(self._groups, ops):
+            V = self.V[sel]
+            Vi = V[:, idx]
+            m_inf = self._node_m_inf(Vi)
+            h_inf = self._node_h_inf(Vi)
+            m = m_inf + (self.m_node[np.ix_(sel, idx)] - m_inf) * np.exp(-dt / self.m_tau)
+            h = h_inf + (self.h_node[np.ix_(sel, idx)] - h_inf) * np.exp(-dt / self.h_tau)
+            self.m_node[np.ix_(sel, idx)] = m
+            self.h_node[np.ix_(sel, idx)] = h
+
+            G = gNa[sel, None] * m ** 3 * h
+            J = G * self.node_ENa
+            G[:, 0] += self.coupling
+            J[:, 0] += self.coupling * soma_V[sel] + I0[sel] + I_alpha[sel]
+
+            Cm = self.Cm_node
+            if banded:
+                sub, diag, sup, b = _cable_bands(self.D_x[sel], self.Cm_x[sel], self.gL_x[sel],
+                                                 self.dx, self.EL, self.Vrest, self.gamma_extra, c_t)
+                diag[:, idx] -= G / Cm
+                rhs = V + (1.0 - th) * dt * _tridiag_matvec(sub, diag, sup, V) + dt * b
+                rhs[:, idx] += dt * J / Cm
+                V = _tridiag_solve(-th * dt * sub, 1.0 - th * dt * diag, -th * dt * sup, rhs)
+                self.V[sel] = np.clip(V, -90.0, 50.0)
+                continue
+            P, q, MU, C = op
+            y = mul(P, V) + q + mul(MU, dt * (J - (1.0 - th) * G * Vi) / Cm)
+            delta = th * dt * G / Cm
+            lhs = np.eye(idx.size) + delta[:, :, None] * C
+            z = np.linalg.solve(lhs, (delta * y[:, idx])[:, :, None])[:, :, 0]
+            self.V[sel] = np.clip(y - mul(MU, z), -90.0, 50.0)
+        self._record_crossings(t_ms)
+
+    # ---------------------------------------------------------
+    # 도약전도 속도
+    # ---------------------------------------------------------
+    def velocity(self):
+        """
+        축삭별 평균 전도속도 [m/s] (A,) — MyelinatedAxon.velocity_last 와 같은 정의
+        (노드 순서대로 통과한 시각의 양의 차 평균, 통과 노드 < 2 이면 0)
+        """
+        t = self.first_cross_ms
+        miss = np.isnan(t)
+        order = np.argsort(miss, axis=1, kind="stable")      # 통과 노드를 앞으로 (순서 유지)
+        ts = np.take_along_axis(t, order, axis=1)
+        d = np.diff(ts, axis=1)
+        ok = np.isfinite(d) & (d > 0.0)
+        n = ok.sum(axis=1)
+        mean_dt = np.where(n > 0, np.where(ok, d, 0.0).sum(axis=1) / np.maximum(n, 1), np.nan)
+        dist_cm = self.node_period * self.dx
+        v = (dist_cm / (mean_dt * 1e-3)) * 0.01
+        return np.where(n > 0, v, 0.0)
+
+    def first_cross(self, a):
+        """축삭 a 의 {노드 인덱스: 첫 통과 시각 | None} (MyelinatedAxon.first_cross_ms 형식)"""
+        return {int(i): (None if np.isnan(t) else float(t))
+                for i, t, ok in zip(self.node_cols[a], self.first_cross_ms[a], self.node_valid[a]) if ok}
+
+
 # =============================================================
 # Entry Point
 # =============================================================